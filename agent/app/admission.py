@@ -0,0 +1,125 @@
+"""Admission control for chat turns.
+
+A turn must first take its conversation's lock (turns on one LangGraph thread never
+run concurrently, so they cannot race on the same checkpoint) and then one of
+``max_in_flight`` global slots. Waiting is bounded: a conversation with too many
+pending turns is rejected with 429, a full global queue with 503, and a turn that
+waited longer than ``queue_timeout`` for either with 503. Rejections are immediate,
+so under a burst callers get a fast "retry later" instead of a growing backlog.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict
+import logging
+from app.config import CHAT_MAX_IN_FLIGHT, CHAT_MAX_QUEUED, CHAT_MAX_PENDING_PER_CONVERSATION, CHAT_QUEUE_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: int = 1):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Conversation:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    pending: int = 0
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_in_flight: int = CHAT_MAX_IN_FLIGHT,
+        max_queued: int = CHAT_MAX_QUEUED,
+        max_pending_per_conversation: int = CHAT_MAX_PENDING_PER_CONVERSATION,
+        queue_timeout: float = CHAT_QUEUE_TIMEOUT_SECONDS,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.max_pending_per_conversation = max_pending_per_conversation
+        self.queue_timeout = queue_timeout
+
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._conversations: Dict[str, _Conversation] = {}
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected_conversation = 0
+        self.rejected_busy = 0
+        self.timed_out = 0
+
+    def check(self, thread_id: str) -> None:
+        """Raises ``AdmissionRejected`` if a turn for ``thread_id`` would be rejected right now."""
+        conversation = self._conversations.get(thread_id)
+        if conversation and conversation.pending >= self.max_pending_per_conversation:
+            self.rejected_conversation += 1
+            raise AdmissionRejected(429, "Too many pending messages for this conversation")
+        if self._slots.locked() and self.queued >= self.max_queued:
+            self.rejected_busy += 1
+            raise AdmissionRejected(503, "Server busy, retry shortly")
+
+    @asynccontextmanager
+    async def admit(self, thread_id: str) -> AsyncIterator[None]:
+        """Holds the conversation lock and a global slot for the duration of one turn."""
+        self.check(thread_id)
+        conversation = self._conversations.setdefault(thread_id, _Conversation())
+        conversation.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.queue_timeout
+
+            await self._wait(conversation.lock.acquire(), deadline)
+            try:
+                await self._acquire_slot(deadline)
+                self.in_flight += 1
+                self.admitted += 1
+                try:
+                    yield
+                finally:
+                    self.in_flight -= 1
+                    self._slots.release()
+            finally:
+                conversation.lock.release()
+        finally:
+            conversation.pending -= 1
+            if conversation.pending == 0:
+                self._conversations.pop(thread_id, None)
+
+    async def _acquire_slot(self, deadline: float) -> None:
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return
+        # Re-checked after the conversation lock: the queue may have filled meanwhile
+        if self.queued >= self.max_queued:
+            self.rejected_busy += 1
+            raise AdmissionRejected(503, "Server busy, retry shortly")
+        self.queued += 1
+        try:
+            await self._wait(self._slots.acquire(), deadline)
+        finally:
+            self.queued -= 1
+
+    async def _wait(self, acquire, deadline: float) -> None:
+        timeout = max(0.0, deadline - asyncio.get_running_loop().time())
+        try:
+            await asyncio.wait_for(acquire, timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            logger.warning(f"Chat turn waited {self.queue_timeout}s for admission, rejecting")
+            raise AdmissionRejected(503, "Server busy, retry shortly")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "conversations": len(self._conversations),
+            "admitted": self.admitted,
+            "rejected_conversation": self.rejected_conversation,
+            "rejected_busy": self.rejected_busy,
+            "timed_out": self.timed_out,
+        }
@@ -0,0 +1,42 @@
+"""Runs many chat turns from one request.
+
+Turns are grouped by conversation: a conversation's turns run one after another in
+the order they were submitted (they share a LangGraph thread), while different
+conversations run concurrently, at most ``concurrency`` at a time.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple, TypeVar
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+async def run_batch(
+    items: Sequence[T],
+    key: Callable[[T], str],
+    run: Callable[[T], Awaitable[Any]],
+    concurrency: int,
+) -> List[Tuple[Any, Exception]]:
+    """Returns ``(result, error)`` per item, in input order; exactly one of the two is ``None``."""
+    results: List[Tuple[Any, Exception]] = [(None, None)] * len(items)
+
+    groups: Dict[str, List[int]] = {}
+    for index, item in enumerate(items):
+        groups.setdefault(key(item), []).append(index)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_group(indexes: List[int]) -> None:
+        for index in indexes:
+            # Released between turns so one long conversation cannot hold a slot throughout
+            async with semaphore:
+                try:
+                    results[index] = (await run(items[index]), None)
+                except Exception as e:
+                    logger.warning(f"Batch item {index} failed: {e}")
+                    results[index] = (None, e)
+
+    await asyncio.gather(*(run_group(indexes) for indexes in groups.values()))
+    return results
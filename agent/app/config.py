@@ -9,6 +9,24 @@ TEMPERATURE = 0.74
 MAX_OUTPUT_TOKENS = 1008
 MAX_CONTEXT = 16
 
+# Model Routing (per-turn profile: "intent" may pick tools, "summary" words a tool result, "off_topic" is chit-chat)
+MODEL_ROUTING_ENABLED = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() == "true"
+MODEL_INTENT = os.getenv("MODEL_INTENT", GEMINI_MODEL)
+MODEL_INTENT_TEMPERATURE = float(os.getenv("MODEL_INTENT_TEMPERATURE", str(TEMPERATURE)))
+MODEL_INTENT_MAX_OUTPUT_TOKENS = int(os.getenv("MODEL_INTENT_MAX_OUTPUT_TOKENS", str(MAX_OUTPUT_TOKENS)))
+MODEL_SUMMARY = os.getenv("MODEL_SUMMARY", GEMINI_MODEL)
+MODEL_SUMMARY_TEMPERATURE = float(os.getenv("MODEL_SUMMARY_TEMPERATURE", "0.3"))
+MODEL_SUMMARY_MAX_OUTPUT_TOKENS = int(os.getenv("MODEL_SUMMARY_MAX_OUTPUT_TOKENS", "256"))
+MODEL_OFF_TOPIC = os.getenv("MODEL_OFF_TOPIC", GEMINI_MODEL)
+MODEL_OFF_TOPIC_TEMPERATURE = float(os.getenv("MODEL_OFF_TOPIC_TEMPERATURE", str(TEMPERATURE)))
+MODEL_OFF_TOPIC_MAX_OUTPUT_TOKENS = int(os.getenv("MODEL_OFF_TOPIC_MAX_OUTPUT_TOKENS", "256"))
+# USD per million (input, output) tokens, for the per-profile cost estimate
+MODEL_PRICES = {
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+}
+
 # API Keys
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
@@ -17,3 +35,108 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 UNISWAP_ROUTER_ADDRESS = os.getenv("UNISWAP_ROUTER_ADDRESS", "0x2626664c2603336E57B271c5C0b26F421741e481")
 BASE_CHAIN_ID = "base"
 
+# Price Cache
+PRICE_CACHE_TTL_SECONDS = float(os.getenv("PRICE_CACHE_TTL_SECONDS", "30"))
+PRICE_CACHE_MAX_ENTRIES = int(os.getenv("PRICE_CACHE_MAX_ENTRIES", "256"))
+
+# Price HTTP Client (connection pool shared by all price requests)
+PRICE_HTTP_TIMEOUT_SECONDS = float(os.getenv("PRICE_HTTP_TIMEOUT_SECONDS", "10"))
+PRICE_HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("PRICE_HTTP_CONNECT_TIMEOUT_SECONDS", "3"))
+PRICE_HTTP_MAX_CONNECTIONS = int(os.getenv("PRICE_HTTP_MAX_CONNECTIONS", "20"))
+PRICE_HTTP_MAX_KEEPALIVE = int(os.getenv("PRICE_HTTP_MAX_KEEPALIVE", "10"))
+PRICE_HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("PRICE_HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+
+# Price Sources (tried in order; each is rate limited and guarded by a circuit breaker)
+PRICE_PROVIDERS = os.getenv("PRICE_PROVIDERS", "coingecko,defillama")
+PRICE_RATE_LIMIT_PER_SECOND = float(os.getenv("PRICE_RATE_LIMIT_PER_SECOND", "0.5"))
+PRICE_RATE_LIMIT_BURST = float(os.getenv("PRICE_RATE_LIMIT_BURST", "5"))
+PRICE_RETRY_ATTEMPTS = int(os.getenv("PRICE_RETRY_ATTEMPTS", "2"))
+PRICE_RETRY_BASE_DELAY_SECONDS = float(os.getenv("PRICE_RETRY_BASE_DELAY_SECONDS", "0.25"))
+PRICE_BREAKER_FAILURE_THRESHOLD = int(os.getenv("PRICE_BREAKER_FAILURE_THRESHOLD", "3"))
+PRICE_BREAKER_RESET_SECONDS = float(os.getenv("PRICE_BREAKER_RESET_SECONDS", "30"))
+# When every source fails, cached prices up to this old are served (and flagged stale); older ones are not
+PRICE_LAST_KNOWN_GOOD_MAX_AGE_SECONDS = float(os.getenv("PRICE_LAST_KNOWN_GOOD_MAX_AGE_SECONDS", "300"))
+
+# Background Price Streamer (keeps every registry price hot in memory)
+PRICE_STREAM_ENABLED = os.getenv("PRICE_STREAM_ENABLED", "false").lower() == "true"
+PRICE_STREAM_INTERVAL_SECONDS = float(os.getenv("PRICE_STREAM_INTERVAL_SECONDS", "10"))
+# Streamed prices older than this are ignored and the request falls back to a live fetch
+PRICE_STREAM_MAX_STALENESS_SECONDS = float(os.getenv("PRICE_STREAM_MAX_STALENESS_SECONDS", "30"))
+
+# Conversation Checkpointer
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "memory")  # memory | sqlite | postgres
+CHECKPOINT_SQLITE_PATH = os.getenv("CHECKPOINT_SQLITE_PATH", "checkpoints.sqlite")
+CHECKPOINT_POSTGRES_URL = os.getenv("CHECKPOINT_POSTGRES_URL")
+CHECKPOINT_MAX_PER_THREAD = int(os.getenv("CHECKPOINT_MAX_PER_THREAD", "5"))
+CHECKPOINT_THREAD_TTL_SECONDS = float(os.getenv("CHECKPOINT_THREAD_TTL_SECONDS", "86400"))
+CHECKPOINT_SWEEP_INTERVAL_SECONDS = float(os.getenv("CHECKPOINT_SWEEP_INTERVAL_SECONDS", "300"))
+
+# Context Window
+# Fold messages that leave the MAX_CONTEXT window into a rolling summary and drop them from state
+CONTEXT_SUMMARY_ENABLED = os.getenv("CONTEXT_SUMMARY_ENABLED", "false").lower() == "true"
+CONTEXT_SUMMARY_MAX_CHARS = int(os.getenv("CONTEXT_SUMMARY_MAX_CHARS", "1500"))
+
+# Fast Path
+# Route literal swap/send/status commands to tools without an LLM call
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+
+# Tool Dispatch (several tool calls in one agent turn)
+TOOL_CONCURRENCY = int(os.getenv("TOOL_CONCURRENCY", "4"))
+TOOL_TIMEOUT_SECONDS = float(os.getenv("TOOL_TIMEOUT_SECONDS", "15"))
+
+# Admission Control (every chat turn: one at a time per conversation, bounded globally)
+CHAT_MAX_IN_FLIGHT = int(os.getenv("CHAT_MAX_IN_FLIGHT", "256"))
+# Turns waiting for a slot beyond this are rejected with 503
+CHAT_MAX_QUEUED = int(os.getenv("CHAT_MAX_QUEUED", "512"))
+# Turns waiting behind the same conversation beyond this are rejected with 429
+CHAT_MAX_PENDING_PER_CONVERSATION = int(os.getenv("CHAT_MAX_PENDING_PER_CONVERSATION", "4"))
+CHAT_QUEUE_TIMEOUT_SECONDS = float(os.getenv("CHAT_QUEUE_TIMEOUT_SECONDS", "10"))
+
+# Tracing (opt-in; OTLP/JSON spans to a file or an OTLP/HTTP collector)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "file")  # file | otlp
+TRACING_FILE_PATH = os.getenv("TRACING_FILE_PATH", "traces/spans.jsonl")
+TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318")
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "miye-agent")
+TRACING_QUEUE_SIZE = int(os.getenv("TRACING_QUEUE_SIZE", "10000"))
+TRACING_EXPORT_INTERVAL_SECONDS = float(os.getenv("TRACING_EXPORT_INTERVAL_SECONDS", "2"))
+
+# Batch Chat (POST /chat/batch)
+CHAT_BATCH_MAX_ITEMS = int(os.getenv("CHAT_BATCH_MAX_ITEMS", "100"))
+# Conversations run at the same time; turns within one conversation always run in order
+CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", "8"))
+
+# LLM Response Cache (exact match on the normalized prompt)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "600"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+
+# Prompt Prefix Cache (Gemini explicit context cache holding the system prompt and tool schemas)
+PROMPT_CACHE_ENABLED = os.getenv("PROMPT_CACHE_ENABLED", "false").lower() == "true"
+PROMPT_CACHE_TTL_SECONDS = int(os.getenv("PROMPT_CACHE_TTL_SECONDS", "3600"))
+# Gemini refuses explicit caches smaller than this
+PROMPT_CACHE_MIN_TOKENS = int(os.getenv("PROMPT_CACHE_MIN_TOKENS", "1024"))
+# After a failed create or a rejected cached request, send the prompt inline for this long
+PROMPT_CACHE_RETRY_SECONDS = float(os.getenv("PROMPT_CACHE_RETRY_SECONDS", "300"))
+
+# Quotes
+# How long a quote shown to the user can be turned into a proposal without refetching
+QUOTE_TTL_SECONDS = float(os.getenv("QUOTE_TTL_SECONDS", "60"))
+
+# Pool Quotes (simulate Uniswap V3 exactInputSingle on pool snapshots instead of multiplying USD prices)
+POOL_QUOTES_ENABLED = os.getenv("POOL_QUOTES_ENABLED", "false").lower() == "true"
+POOL_STATE_SOURCE = os.getenv("POOL_STATE_SOURCE", "fixture")  # fixture
+POOL_FIXTURE_PATH = os.getenv("POOL_FIXTURE_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "pools", "base.json"))
+
+# Multi-hop Routing (over the pools known to the pool quoter)
+ROUTE_MAX_HOPS = int(os.getenv("ROUTE_MAX_HOPS", "3"))
+# Shortest paths kept per pair; each is simulated on every quote
+ROUTE_MAX_CANDIDATES = int(os.getenv("ROUTE_MAX_CANDIDATES", "8"))
+ROUTE_CACHE_MAX_ENTRIES = int(os.getenv("ROUTE_CACHE_MAX_ENTRIES", "4096"))
+
+# Token Registry
+TOKEN_LIST_PATH = os.getenv("TOKEN_LIST_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "tokens", "base.json"))
+BASE_CHAIN_NUMERIC_ID = int(os.getenv("BASE_CHAIN_NUMERIC_ID", "8453"))
+# Fuzzy token matching: minimum score (0-1) and lead over the runner-up needed to accept a match
+TOKEN_MATCH_THRESHOLD = float(os.getenv("TOKEN_MATCH_THRESHOLD", "0.85"))
+TOKEN_MATCH_MARGIN = float(os.getenv("TOKEN_MATCH_MARGIN", "0.04"))
@@ -1,18 +1,109 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import threading
+import uuid
+from contextlib import asynccontextmanager
+import time
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
 from langchain_core.messages import HumanMessage
-from models.schemas import ChatRequest, ChatResponse
+from models.schemas import ChatRequest, ChatResponse, BatchChatRequest, BatchChatResponse, BatchChatItem
 import logging
-from graph import app as agent_app
+from graph.llm_cache import response_cache
+from app.price_client import price_client, async_price_client
+from app.price_streamer import PriceStreamer
+from app.streaming import stream_chat_events, format_sse
+from app.batch import run_batch
+from app.admission import AdmissionController, AdmissionRejected
+from app import metrics
+from app.tracing import tracer
+from app.config import PRICE_STREAM_ENABLED, PRICE_STREAM_INTERVAL_SECONDS, CHAT_BATCH_MAX_ITEMS, CHAT_BATCH_CONCURRENCY
 
 # 1. Setup Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# The compiled graph. Built by the startup warm-up (or the first turn, whichever comes
+# first) so that importing this module and answering /health stay fast.
+agent_app = None
+_agent_lock = threading.Lock()
+readiness = {"ready": False, "error": None, "warmup_seconds": None}
+
+def _agent():
+    global agent_app
+    if agent_app is None:
+        with _agent_lock:
+            if agent_app is None:
+                from graph import app as compiled_graph
+                agent_app = compiled_graph
+    return agent_app
+
+async def _aagent():
+    """``_agent`` for request handlers: an early request builds the graph on a worker
+    thread, so /health and /ready keep answering while it waits."""
+    if agent_app is not None:
+        return agent_app
+    return await asyncio.to_thread(_agent)
+
+def _register_graph_gauges() -> None:
+    from graph.prompt_cache import prompt_cache
+    metrics.registry.gauge(
+        "miye_prompt_tokens", "Estimated tokens in the static prompt prefix.", ("part",),
+        lambda: {("system",): prompt_cache.system_tokens, ("prefix",): prompt_cache.prefix_tokens},
+    )
+
+def _warm_up() -> None:
+    """Compiles the graph and builds the default model client; runs on a worker thread."""
+    _agent()
+    from graph import nodes
+    from graph.prompt_cache import prompt_cache
+    nodes.model_router.clients(nodes.model_router.profiles["intent"])
+    _register_graph_gauges()
+    logger.info(f"System prompt ~{prompt_cache.system_tokens} tokens, ~{prompt_cache.prefix_tokens} with tool schemas")
+
+async def _start() -> None:
+    """Background warm-up; /ready answers 200 once it has finished."""
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(_warm_up)
+        from graph.prompt_cache import prompt_cache
+        if prompt_cache.enabled:
+            # Create the prefix cache before the first turn pays for it
+            await prompt_cache.name()
+    except Exception as e:
+        readiness["error"] = str(e)
+        logger.error(f"Warm-up failed: {e}")
+        return
+    readiness.update(ready=True, warmup_seconds=round(time.perf_counter() - started, 3))
+    logger.info(f"Ready after a {readiness['warmup_seconds']}s warm-up")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Not awaited: the server starts answering /health while the graph is built
+    warmup = asyncio.create_task(_start())
+
+    streamer = None
+    if PRICE_STREAM_ENABLED:
+        streamer = PriceStreamer(async_price_client, async_price_client.snapshot, PRICE_STREAM_INTERVAL_SECONDS)
+        streamer.start()
+
+    yield
+
+    warmup.cancel()
+    if streamer:
+        await streamer.stop()
+    # Release pooled price connections
+    await async_price_client.aclose()
+    # Export spans still queued
+    tracer.shutdown()
+
 app = FastAPI(
     title="Miye Swap Agent API",
     description="Conversational AI Agent for Token Swaps and Sends on Base Network.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -23,6 +114,86 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Serializes turns per conversation and bounds how many run at once
+admission = AdmissionController()
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # The route template keeps label cardinality bounded; unmatched paths share one label
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, method=request.method, route=route, status=str(response.status_code))
+    return response
+
+# Counters owned by other components are read when /metrics is scraped
+metrics.registry.gauge(
+    "miye_price_cache", "Price cache counters.", ("stat",),
+    lambda: {(stat,): value for stat, value in price_client.cache.stats().items()},
+)
+metrics.registry.gauge(
+    "miye_llm_cache", "LLM response cache counters.", ("stat",),
+    lambda: {(stat,): value for stat, value in response_cache.stats().items()} if response_cache else {},
+)
+metrics.registry.gauge(
+    "miye_admission", "Chat admission counters.", ("stat",),
+    lambda: {(stat,): value for stat, value in admission.stats().items()},
+)
+metrics.registry.gauge(
+    "miye_price_source_circuit_open", "1 while a price source's circuit breaker is open.", ("provider",),
+    lambda: {(source["name"],): int(source["circuit"] == "open") for source in price_client.sources.stats()["providers"]},
+)
+
+def _with_thread_id(request: ChatRequest, default: str = None) -> ChatRequest:
+    """Gives an anonymous request its own thread instead of a shared one."""
+    if request.conversation_id:
+        return request
+    return request.model_copy(update={"conversation_id": default or uuid.uuid4().hex})
+
+def _rejection(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
+
+def _with_trace_id(event: dict, span) -> dict:
+    """Adds the trace id to the final streamed event, like ChatResponse.trace_id."""
+    if event.get("event") == "done" and span.trace_id:
+        return {**event, "trace_id": span.trace_id}
+    return event
+
+def _prepare_run(request: ChatRequest):
+    """Builds the thread id, LangGraph config and input state for one chat turn."""
+    # Use conversation_id as thread_id for state persistence
+    conv_id = request.conversation_id
+    config = {"configurable": {"thread_id": conv_id}}
+
+    # Input only needs the NEW message
+    input_state = {"messages": [HumanMessage(content=request.message)]}
+    return conv_id, config, input_state
+
+async def _run_chat(request: ChatRequest) -> ChatResponse:
+    """Runs one chat turn through the graph once admitted."""
+    # 3. LangGraph Config for Memory + 4. the new message
+    conv_id, config, input_state = _prepare_run(request)
+
+    # 5. ASYNC Execution (ainvoke)
+    with tracer.span("chat", conversation_id=conv_id, message_chars=len(request.message)) as span:
+        async with admission.admit(conv_id):
+            agent = await _aagent()
+            final_state = await agent.ainvoke(input_state, config=config)
+
+    # Extract the last message content
+    last_msg = final_state["messages"][-1]
+    response_text = last_msg.content
+
+    # Extract transaction if it exists in state
+    transaction = final_state.get("proposed_transaction")
+
+    return ChatResponse(
+        message=response_text,
+        proposed_transaction=transaction,
+        conversation_id=conv_id,
+        trace_id=span.trace_id
+    )
+
 @app.post("/chat", response_model=ChatResponse, summary="Send a message to the Miye Agent")
 async def chat(request: ChatRequest):
     """
@@ -34,35 +205,151 @@ async def chat(request: ChatRequest):
     if not request.message.strip():
         raise HTTPException(status_code=400, detail="Empty message")
 
-    # 3. LangGraph Config for Memory
-    # Use conversation_id as thread_id for state persistence
-    conv_id = request.conversation_id or "default_user"
-    config = {"configurable": {"thread_id": conv_id}}
-    
-    # 4. Input only needs the NEW message
-    input_state = {"messages": [HumanMessage(content=request.message)]}
-
     try:
-        # 5. ASYNC Execution (ainvoke)
-        final_state = await agent_app.ainvoke(input_state, config=config)
-        
-        # Extract the last message content
-        last_msg = final_state["messages"][-1]
-        response_text = last_msg.content
-        
-        # Extract transaction if it exists in state
-        transaction = final_state.get("proposed_transaction")
-
-        return ChatResponse(
-            message=response_text,
-            proposed_transaction=transaction,
-            conversation_id=conv_id
-        )
-
+        return await _run_chat(_with_thread_id(request))
+    except AdmissionRejected as e:
+        raise _rejection(e)
     except Exception as e:
+        metrics.ERRORS.inc(kind="chat")
         logger.exception("Agent execution failed")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/chat/batch", response_model=BatchChatResponse, summary="Send many messages in one request")
+async def chat_batch(batch: BatchChatRequest):
+    """
+    Runs every turn through the agent and returns one result per turn, in request order.
+    Turns for the same conversation run in list order; different conversations run concurrently.
+    A failed turn is reported in its `error` field and does not fail the batch.
+    """
+    if len(batch.requests) > CHAT_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch too large (max {CHAT_BATCH_MAX_ITEMS} requests)")
+
+    logger.info(f"Incoming batch: {len(batch.requests)} requests")
+
+    async def run_one(request: ChatRequest) -> ChatResponse:
+        if not request.message.strip():
+            raise ValueError("Empty message")
+        return await _run_chat(request)
+
+    requests = [_with_thread_id(request) for request in batch.requests]
+    outcomes = await run_batch(requests, lambda request: request.conversation_id, run_one, CHAT_BATCH_CONCURRENCY)
+    return BatchChatResponse(results=[
+        BatchChatItem(index=index, response=response, error=str(error) if error else None)
+        for index, (response, error) in enumerate(outcomes)
+    ])
+
+@app.post("/chat/stream", summary="Stream the Miye Agent's reply as Server-Sent Events")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming variant of /chat.
+    Emits `node_start`, `token`, `tool_result` and `proposal` events as the graph runs, then a final `done` event.
+    """
+    logger.info(f"Incoming stream: {request.message} (ID: {request.conversation_id})")
+
+    if not request.message.strip():
+        raise HTTPException(status_code=400, detail="Empty message")
+
+    conv_id, config, input_state = _prepare_run(_with_thread_id(request))
+    # Reject before the stream starts while a status code can still be sent
+    try:
+        admission.check(conv_id)
+    except AdmissionRejected as e:
+        raise _rejection(e)
+
+    async def event_source():
+        try:
+            with tracer.span("chat.stream", conversation_id=conv_id) as span:
+                async with admission.admit(conv_id):
+                    async for event in stream_chat_events(await _aagent(), input_state, config):
+                        yield format_sse(_with_trace_id(event, span))
+        except AdmissionRejected as e:
+            yield format_sse({"event": "error", "status": e.status_code, "detail": e.detail})
+        except Exception as e:
+            metrics.ERRORS.inc(kind="stream")
+            logger.exception("Agent streaming failed")
+            yield format_sse({"event": "error", "detail": str(e)})
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.websocket("/ws/chat")
+async def chat_websocket(websocket: WebSocket):
+    """
+    WebSocket variant of /chat/stream.
+    Each incoming JSON `ChatRequest` is answered with the same events, one JSON frame per event.
+    """
+    await websocket.accept()
+    # Anonymous messages on one socket continue one conversation
+    connection_thread_id = uuid.uuid4().hex
+    try:
+        while True:
+            payload = await websocket.receive_json()
+            try:
+                request = ChatRequest(**payload)
+            except ValidationError as e:
+                await websocket.send_json({"event": "error", "detail": jsonable_encoder(e.errors())})
+                continue
+
+            if not request.message.strip():
+                await websocket.send_json({"event": "error", "detail": "Empty message"})
+                continue
+
+            logger.info(f"Incoming ws: {request.message} (ID: {request.conversation_id})")
+            conv_id, config, input_state = _prepare_run(_with_thread_id(request, connection_thread_id))
+            try:
+                with tracer.span("chat.ws", conversation_id=conv_id) as span:
+                    async with admission.admit(conv_id):
+                        async for event in stream_chat_events(await _aagent(), input_state, config):
+                            await websocket.send_json(jsonable_encoder(_with_trace_id(event, span)))
+            except WebSocketDisconnect:
+                raise
+            except AdmissionRejected as e:
+                await websocket.send_json({"event": "error", "status": e.status_code, "detail": e.detail})
+            except Exception as e:
+                metrics.ERRORS.inc(kind="stream")
+                logger.exception("Agent streaming failed")
+                await websocket.send_json({"event": "error", "detail": str(e)})
+    except WebSocketDisconnect:
+        logger.info("WebSocket client disconnected")
+
 @app.get("/health", summary="API Health Check")
 async def health():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/ready", summary="Readiness Check")
+async def ready():
+    if not readiness["ready"]:
+        raise HTTPException(status_code=503, detail=readiness["error"] or "starting")
+    return {"status": "ready", "warmup_seconds": readiness["warmup_seconds"]}
+
+@app.get("/stats/prices", summary="Price cache counters")
+async def price_stats():
+    stats = {**price_client.cache.stats(), "snapshot": price_client.snapshot.stats(), "sources": price_client.sources.stats()}
+    if price_client.pool_quoter:
+        stats["routes"] = price_client.pool_quoter.router.stats()
+    return stats
+
+@app.get("/metrics", summary="Prometheus metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/stats/admission", summary="Chat admission counters")
+async def admission_stats():
+    return admission.stats()
+
+@app.get("/stats/llm-cache", summary="LLM response cache counters")
+async def llm_cache_stats():
+    return response_cache.stats() if response_cache else {"enabled": False}
+
+@app.get("/stats/prompt", summary="System prompt size and prefix cache state")
+async def prompt_stats():
+    from graph.prompt_cache import prompt_cache
+    return prompt_cache.stats()
+
+@app.get("/stats/models", summary="Per-profile model settings, latency, tokens and cost")
+async def model_stats():
+    from graph import nodes
+    return nodes.model_router.stats()
@@ -0,0 +1,146 @@
+"""Quotes swaps by simulating Uniswap V3 pools instead of multiplying USD prices.
+
+Pool state comes from a ``PoolStateSource``; the bundled ``FixturePoolSource`` reads
+snapshots from JSON so quoting works offline. Direct and multi-hop routes across every
+fee tier are simulated by ``RouteFinder`` and the one returning the most output wins.
+"""
+import json
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional
+import logging
+from app.config import POOL_QUOTES_ENABLED, POOL_STATE_SOURCE, POOL_FIXTURE_PATH
+from app.tokens import BASE_TOKENS
+from app.router import Route, RouteFinder
+from app.uniswap_v3 import Q96, PoolState
+
+logger = logging.getLogger(__name__)
+
+# Pools hold WETH; native ETH is wrapped by the router
+NATIVE_WRAPPED = {"ETH": "WETH"}
+
+
+class PoolStateSource:
+    """Provides pool snapshots, in any fee tier."""
+
+    def all_pools(self) -> List[PoolState]:
+        raise NotImplementedError
+
+    def get_pools(self, token_a: str, token_b: str) -> List[PoolState]:
+        raise NotImplementedError
+
+
+class StaticPoolSource(PoolStateSource):
+    """A fixed, in-memory set of pools."""
+
+    def __init__(self, pools: List[PoolState]):
+        self._all = list(pools)
+        self._pools: Dict[frozenset, List[PoolState]] = {}
+        for pool in self._all:
+            self._pools.setdefault(frozenset((pool.token0.lower(), pool.token1.lower())), []).append(pool)
+
+    def all_pools(self) -> List[PoolState]:
+        return list(self._all)
+
+    def get_pools(self, token_a: str, token_b: str) -> List[PoolState]:
+        return self._pools.get(frozenset((token_a.lower(), token_b.lower())), [])
+
+
+class FixturePoolSource(StaticPoolSource):
+    """Pool snapshots loaded once from a JSON file (see ``data/pools/base.json``)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path) as f:
+            data = json.load(f)
+        super().__init__([self.parse_pool(raw) for raw in data["pools"]])
+        logger.info(f"Loaded {len(data['pools'])} pool snapshots from {path}")
+
+    @staticmethod
+    def parse_pool(raw: Dict[str, Any]) -> PoolState:
+        return PoolState(
+            token0=raw["token0"],
+            token1=raw["token1"],
+            fee=int(raw["fee"]),
+            tick_spacing=int(raw["tick_spacing"]),
+            sqrt_price_x96=int(raw["sqrt_price_x96"]),
+            liquidity=int(raw["liquidity"]),
+            tick=int(raw["tick"]),
+            ticks={int(tick): int(net) for tick, net in raw.get("ticks", {}).items()},
+        )
+
+
+class PoolQuoter:
+    """Exact-input quotes over direct and multi-hop routes, in the same shape as ``estimate_swap_output``."""
+
+    def __init__(self, source: PoolStateSource, tokens: Optional[Dict[str, dict]] = None):
+        self.source = source
+        self.tokens = tokens or BASE_TOKENS
+        # Routes only go through tokens whose decimals we know
+        self._by_address = {token["address"].lower(): {**token, "symbol": symbol} for symbol, token in self.tokens.items()}
+        pools = [pool for pool in source.all_pools() if pool.token0.lower() in self._by_address and pool.token1.lower() in self._by_address]
+        self.router = RouteFinder(pools)
+
+    def _token(self, symbol: str) -> Optional[dict]:
+        symbol = symbol.upper()
+        return self.tokens.get(NATIVE_WRAPPED.get(symbol, symbol))
+
+    def _price_impact(self, route: Route, amount_in: Decimal, amount_out: Decimal) -> Decimal:
+        """Shortfall of the execution price against the mid price along the route, fees excluded."""
+        mid = Decimal(1)
+        for hop in route.hops:
+            decimals_in = self._by_address[hop.token_in]["decimals"]
+            decimals_out = self._by_address[hop.token_out]["decimals"]
+            pool = hop.pool
+            price = Decimal(pool.sqrt_price_x96 * pool.sqrt_price_x96) / Decimal(Q96 * Q96)
+            if not hop.zero_for_one:
+                price = 1 / price
+            mid *= price.scaleb(decimals_in - decimals_out) * (1 - Decimal(pool.fee) / Decimal(1_000_000))
+        return max(Decimal(0), 1 - (amount_out / amount_in) / mid)
+
+    def quote(self, from_token: str, to_token: str, amount_in: float) -> Dict[str, Any]:
+        token_in, token_out = self._token(from_token), self._token(to_token)
+        if not token_in or not token_out or token_in["address"] == token_out["address"]:
+            return {"success": False, "error": "No pool for this pair"}
+
+        try:
+            raw_in = int(Decimal(str(amount_in)).scaleb(token_in["decimals"]))
+        except InvalidOperation:
+            return {"success": False, "error": f"Invalid amount: {amount_in}"}
+        if raw_in <= 0:
+            return {"success": False, "error": "Amount too small"}
+
+        route = self.router.best_route(token_in["address"], token_out["address"], raw_in)
+        if route is None:
+            return {"success": False, "error": "No route can fill this amount"}
+
+        amount_out = Decimal(route.amount_out).scaleb(-token_out["decimals"])
+        execution_price = amount_out / Decimal(str(amount_in))
+        price_impact = self._price_impact(route, Decimal(str(amount_in)), amount_out)
+        # Show the tokens the user asked for at the ends (ETH rather than WETH)
+        symbols = [from_token.upper()] + [self._by_address[token]["symbol"] for token in route.tokens[1:-1]] + [to_token.upper()]
+
+        quote = {
+            "success": True,
+            "estimated_output": float(amount_out),
+            "price": float(execution_price),
+            "from_token": from_token,
+            "to_token": to_token,
+            "source": "uniswap_v3",
+            "route": symbols,
+            "route_fee_tiers": route.fee_tiers,
+            # Percent, excluding pool fees
+            "price_impact": float(price_impact * 100),
+            "amount_out_raw": route.amount_out,
+            "ticks_crossed": route.ticks_crossed,
+        }
+        if len(route.hops) == 1:
+            quote["fee_tier"] = route.fee_tiers[0]
+        return quote
+
+
+def build_pool_quoter(source: str = POOL_STATE_SOURCE) -> Optional[PoolQuoter]:
+    if not POOL_QUOTES_ENABLED:
+        return None
+    if source == "fixture":
+        return PoolQuoter(FixturePoolSource(POOL_FIXTURE_PATH))
+    raise ValueError(f"Unknown pool state source: {source}")
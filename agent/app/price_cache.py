@@ -0,0 +1,221 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class _Entry:
+    __slots__ = ("value", "fetched_at")
+
+    def __init__(self, value: float, fetched_at: float):
+        self.value = value
+        self.fetched_at = fetched_at
+
+
+class _Flight:
+    """An in-progress fetch that other callers for the same key wait on."""
+    __slots__ = ("event", "value")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Optional[float] = None
+
+
+class PriceCache:
+    """Thread-safe TTL + LRU cache for token prices with single-flight loading.
+
+    Keys are ``(symbol, vs_currency)`` tuples. Concurrent misses for the same key
+    share one loader call instead of each hitting the upstream API.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 256, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._in_flight: Dict[Hashable, _Flight] = {}
+        self._async_in_flight: Dict[Hashable, "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+
+        # Counters (exposed via stats())
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(symbol: str, vs_currency: str = "usd") -> Tuple[str, str]:
+        return (symbol.upper(), vs_currency.lower())
+
+    def _lookup(self, key: Hashable, now: float) -> Optional[float]:
+        """Returns a fresh value and records a hit, or records a miss/stale. Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is not None and now - entry.fetched_at < self.ttl_seconds:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+        if entry is not None:
+            self.stale += 1
+        else:
+            self.misses += 1
+        return None
+
+    def _store(self, key: Hashable, value: float, now: float) -> None:
+        """Caller holds the lock."""
+        self._entries[key] = _Entry(value, now)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Optional[float]]) -> Optional[float]:
+        """Returns the cached value for ``key`` or loads it, coalescing concurrent loads.
+
+        Failed loads (``None``) are not cached so the next caller retries.
+        """
+        return self.get_many_or_load([key], lambda keys: {key: loader()})[key]
+
+    def get_many_or_load(
+        self,
+        keys: Iterable[Hashable],
+        loader: Callable[[List[Hashable]], Dict[Hashable, Optional[float]]],
+    ) -> Dict[Hashable, Optional[float]]:
+        """Bulk variant of ``get_or_load``.
+
+        ``loader`` is called at most once, with only the keys that are neither fresh
+        in the cache nor already being fetched by another caller.
+        """
+        results: Dict[Hashable, Optional[float]] = {}
+        owned: Dict[Hashable, _Flight] = {}
+        waiting: Dict[Hashable, _Flight] = {}
+
+        with self._lock:
+            now = self._clock()
+            for key in dict.fromkeys(keys):
+                value = self._lookup(key, now)
+                if value is not None:
+                    results[key] = value
+                    continue
+
+                flight = self._in_flight.get(key)
+                if flight is None:
+                    flight = _Flight()
+                    self._in_flight[key] = flight
+                    owned[key] = flight
+                else:
+                    self.coalesced += 1
+                    waiting[key] = flight
+
+        if owned:
+            loaded: Dict[Hashable, Optional[float]] = {}
+            try:
+                loaded = loader(list(owned)) or {}
+            finally:
+                with self._lock:
+                    now = self._clock()
+                    for key in owned:
+                        value = loaded.get(key)
+                        if value is not None:
+                            self._store(key, value, now)
+                        self._in_flight.pop(key, None)
+                for key, flight in owned.items():
+                    flight.value = loaded.get(key)
+                    flight.event.set()
+            for key in owned:
+                results[key] = loaded.get(key)
+
+        for key, flight in waiting.items():
+            flight.event.wait()
+            results[key] = flight.value
+
+        return results
+
+    async def aget_many_or_load(
+        self,
+        keys: Iterable[Hashable],
+        loader: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Optional[float]]]],
+    ) -> Dict[Hashable, Optional[float]]:
+        """Async variant of ``get_many_or_load`` for callers on the event loop.
+
+        Waiters await a shared future instead of blocking the loop on a thread event.
+        """
+        loop = asyncio.get_running_loop()
+        results: Dict[Hashable, Optional[float]] = {}
+        owned: Dict[Hashable, "asyncio.Future"] = {}
+        waiting: Dict[Hashable, "asyncio.Future"] = {}
+
+        with self._lock:
+            now = self._clock()
+            for key in dict.fromkeys(keys):
+                value = self._lookup(key, now)
+                if value is not None:
+                    results[key] = value
+                    continue
+
+                future = self._async_in_flight.get(key)
+                if future is None or future.get_loop() is not loop:
+                    future = loop.create_future()
+                    self._async_in_flight[key] = future
+                    owned[key] = future
+                else:
+                    self.coalesced += 1
+                    waiting[key] = future
+
+        if owned:
+            loaded: Dict[Hashable, Optional[float]] = {}
+            try:
+                loaded = await loader(list(owned)) or {}
+            finally:
+                with self._lock:
+                    now = self._clock()
+                    for key, future in owned.items():
+                        value = loaded.get(key)
+                        if value is not None:
+                            self._store(key, value, now)
+                        if self._async_in_flight.get(key) is future:
+                            del self._async_in_flight[key]
+                for key, future in owned.items():
+                    if not future.done():
+                        future.set_result(loaded.get(key))
+            for key in owned:
+                results[key] = loaded.get(key)
+
+        for key, future in waiting.items():
+            results[key] = await asyncio.shield(future)
+
+        return results
+
+    def put_many(self, values: Dict[Hashable, Optional[float]]) -> None:
+        """Stores freshly fetched values directly, e.g. from a background refresh."""
+        with self._lock:
+            now = self._clock()
+            for key, value in values.items():
+                if value is not None:
+                    self._store(key, value, now)
+
+    def peek(self, key: Hashable) -> Optional[Tuple[float, float]]:
+        """Returns the last stored value for ``key`` and its age in seconds, fresh or not, without touching counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return (entry.value, self._clock() - entry.fetched_at) if entry is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.stale
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
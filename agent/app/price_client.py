@@ -1,85 +1,291 @@
 import requests
-from typing import Dict, Optional
+import httpx
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
 import logging
+from app.config import (
+    PRICE_CACHE_TTL_SECONDS,
+    PRICE_CACHE_MAX_ENTRIES,
+    PRICE_HTTP_TIMEOUT_SECONDS,
+    PRICE_HTTP_CONNECT_TIMEOUT_SECONDS,
+    PRICE_HTTP_MAX_CONNECTIONS,
+    PRICE_HTTP_MAX_KEEPALIVE,
+    PRICE_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    PRICE_STREAM_MAX_STALENESS_SECONDS,
+    PRICE_LAST_KNOWN_GOOD_MAX_AGE_SECONDS,
+)
+from app.price_cache import PriceCache
+from app.pool_quoter import PoolQuoter, build_pool_quoter
+from app.price_providers import PriceSourceChain, build_price_chain
+from app.price_streamer import PriceSnapshot
+from app.tokens import COINGECKO_IDS
 
 logger = logging.getLogger(__name__)
 
-COINGECKO_IDS: Dict[str, str] = {
-    "ETH": "ethereum",
-    "WETH": "weth",
-    "USDC": "usd-coin",
-    "DAI": "dai",
-    "USDT": "tether",
-}
+ETH_SYMBOLS = ("ETH", "WETH")
+STABLE_SYMBOLS = ("USDC", "DAI", "USDT")
 
-class PriceClient:
-    BASE_URL = "https://api.coingecko.com/api/v3"
+PriceKey = Tuple[str, str]
 
-    def get_token_price(self, token_symbol: str, vs_currency: str = "usd") -> Optional[float]:
-        token_id = COINGECKO_IDS.get(token_symbol.upper())
-        if not token_id:
-            logger.warning(f"Token {token_symbol} not in CoinGecko mapping")
-            return None
 
-        try:
-            resp = requests.get(
-                f"{self.BASE_URL}/simple/price",
-                params={"ids": token_id, "vs_currencies": vs_currency},
-                timeout=10,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            price = data.get(token_id, {}).get(vs_currency)
-            logger.info(f"Fetched price for {token_symbol}: {price}")
-            return price
-        except Exception as e:
-            logger.error(f"Error fetching price for {token_symbol}: {e}")
+class PriceOrigin(NamedTuple):
+    """Where a price came from: the provider name, or ``last_known_good`` with the price's age."""
+    source: str
+    age_seconds: Optional[float] = None
+
+
+class BasePriceClient:
+    """Shared cache handling and swap math for the sync and async clients.
+
+    Prices come from a ``PriceSourceChain``. When every source fails, the last price
+    cached for a symbol is served instead of ``None`` if it is at most
+    ``last_known_good_max_age_seconds`` old; quotes built on it are marked stale.
+    """
+
+    def __init__(self, cache: Optional[PriceCache] = None, snapshot: Optional[PriceSnapshot] = None, sources: Optional[PriceSourceChain] = None, pool_quoter: Optional[PoolQuoter] = None, last_known_good_max_age_seconds: float = PRICE_LAST_KNOWN_GOOD_MAX_AGE_SECONDS):
+        self.cache = cache or PriceCache(ttl_seconds=PRICE_CACHE_TTL_SECONDS, max_entries=PRICE_CACHE_MAX_ENTRIES)
+        # Filled by the background PriceStreamer when enabled; consulted before the cache
+        self.snapshot = snapshot or PriceSnapshot(max_staleness_seconds=PRICE_STREAM_MAX_STALENESS_SECONDS)
+        self.sources = sources or build_price_chain()
+        # When set, swaps are quoted from simulated pools and market prices are only the fallback
+        self.pool_quoter = pool_quoter
+        self.last_known_good_max_age_seconds = last_known_good_max_age_seconds
+
+    def _pool_quote(self, from_token: str, to_token: str, amount_in: float) -> Optional[Dict[str, Any]]:
+        if self.pool_quoter is None:
             return None
+        quote = self.pool_quoter.quote(from_token, to_token, amount_in)
+        if quote["success"]:
+            return quote
+        logger.info(f"Pool quote unavailable for {from_token}->{to_token}: {quote['error']}; using market prices")
+        return None
+
+    def _from_snapshot(self, token_symbols: Iterable[str], vs_currency: str, origins: Optional[Dict[str, PriceOrigin]]) -> Optional[Dict[str, float]]:
+        streamed = self.snapshot.get_many(dict.fromkeys(symbol.upper() for symbol in token_symbols), vs_currency)
+        if streamed is not None and origins is not None:
+            for symbol in streamed:
+                origins[symbol] = PriceOrigin(self.sources.origin(symbol, vs_currency) or "stream")
+        return streamed
+
+    @staticmethod
+    def _split_symbols(token_symbols: Iterable[str], vs_currency: str) -> Tuple[List[PriceKey], Dict[str, Optional[float]]]:
+        """Returns cache keys for known symbols and a ``None`` price for unknown ones."""
+        keys: List[PriceKey] = []
+        unknown: Dict[str, Optional[float]] = {}
+        for symbol in dict.fromkeys(symbol.upper() for symbol in token_symbols):
+            if symbol in COINGECKO_IDS:
+                keys.append(PriceCache.key(symbol, vs_currency))
+            else:
+                logger.warning(f"Token {symbol} has no price source mapping")
+                unknown[symbol] = None
+        return keys, unknown
+
+    def _merge_prices(self, cached: Dict[PriceKey, Optional[float]], unknown: Dict[str, Optional[float]], origins: Optional[Dict[str, PriceOrigin]]) -> Dict[str, Optional[float]]:
+        prices = dict(unknown)
+        for key, price in cached.items():
+            if price is not None:
+                origin = PriceOrigin(self.sources.origin(*key) or "cache")
+            else:
+                price, origin = self._last_known_good(key)
+            prices[key[0]] = price
+            if origins is not None and price is not None:
+                origins[key[0]] = origin
+        return prices
+
+    def _last_known_good(self, key: PriceKey) -> Tuple[Optional[float], Optional[PriceOrigin]]:
+        entry = self.cache.peek(key)
+        if entry is None:
+            return None, None
+        price, age = entry
+        if age > self.last_known_good_max_age_seconds:
+            logger.warning(f"All price sources failed for {key[0]}; last known price is {age:.0f}s old, not serving it")
+            return None, None
+        self.sources.last_known_good += 1
+        logger.warning(f"All price sources failed for {key[0]}; serving last known price {price} from {age:.0f}s ago")
+        return price, PriceOrigin("last_known_good", age)
+
+    @staticmethod
+    def _keyed(found: Dict[str, float], keys: List[PriceKey]) -> Dict[PriceKey, Optional[float]]:
+        prices = {key: found.get(key[0]) for key in keys}
+        logger.info(f"Fetched prices: {', '.join(f'{symbol}={price}' for (symbol, _), price in prices.items())}")
+        return prices
+
+    @staticmethod
+    def _pair_symbols(from_token: str, to_token: str) -> List[str]:
+        """Symbols that need a price to estimate this pair. ETH/WETH <-> stable only needs ETH."""
+        from_symbol, to_symbol = from_token.upper(), to_token.upper()
+        if (from_symbol in ETH_SYMBOLS and to_symbol in STABLE_SYMBOLS) or (from_symbol in STABLE_SYMBOLS and to_symbol in ETH_SYMBOLS):
+            return ["ETH"]
+        return [from_symbol, to_symbol]
+
+    @staticmethod
+    def _provenance(symbols: List[str], origins: Dict[str, PriceOrigin]) -> Dict[str, Any]:
+        """``source`` (providers joined by "+"), ``stale`` and, when stale, the oldest price's age."""
+        used = [origins[symbol] for symbol in symbols if symbol in origins]
+        ages = [origin.age_seconds for origin in used if origin.age_seconds is not None]
+        fields = {"source": "+".join(dict.fromkeys(origin.source for origin in used)) or "unknown", "stale": bool(ages)}
+        if ages:
+            fields["price_age_seconds"] = round(max(ages), 1)
+        return fields
+
+    @classmethod
+    def _estimate_from_prices(cls, from_token: str, to_token: str, amount_in: float, prices: Dict[str, Optional[float]], origins: Dict[str, PriceOrigin]) -> Dict[str, Any]:
+        from_symbol, to_symbol = from_token.upper(), to_token.upper()
+        estimate = None
 
-    def estimate_swap_output(self, from_token: str, to_token: str, amount_in: float) -> Dict[str, any]:
         # ETH/WETH -> stable
-        if from_token.upper() in ["ETH", "WETH"] and to_token.upper() in ["USDC", "DAI", "USDT"]:
-            eth_price = self.get_token_price("ETH", "usd")
+        if from_symbol in ETH_SYMBOLS and to_symbol in STABLE_SYMBOLS:
+            eth_price = prices.get("ETH")
             if eth_price:
-                estimated_output = amount_in * eth_price
-                return {
-                    "success": True,
-                    "estimated_output": estimated_output,
-                    "price": eth_price,
-                    "from_token": from_token,
-                    "to_token": to_token,
-                    "source": "coingecko",
-                }
+                estimate = (amount_in * eth_price, eth_price, ["ETH"])
 
         # stable -> ETH/WETH
-        if from_token.upper() in ["USDC", "DAI", "USDT"] and to_token.upper() in ["ETH", "WETH"]:
-            eth_price = self.get_token_price("ETH", "usd")
+        elif from_symbol in STABLE_SYMBOLS and to_symbol in ETH_SYMBOLS:
+            eth_price = prices.get("ETH")
             if eth_price:
-                estimated_output = amount_in / eth_price
-                return {
-                    "success": True,
-                    "estimated_output": estimated_output,
-                    "price": eth_price,
-                    "from_token": from_token,
-                    "to_token": to_token,
-                    "source": "coingecko",
-                }
+                estimate = (amount_in / eth_price, eth_price, ["ETH"])
 
         # general case
-        from_price = self.get_token_price(from_token, "usd")
-        to_price = self.get_token_price(to_token, "usd")
-        if from_price and to_price:
-            from_value_usd = amount_in * from_price
-            estimated_output = from_value_usd / to_price
-            return {
-                "success": True,
-                "estimated_output": estimated_output,
-                "price": from_price / to_price,
-                "from_token": from_token,
-                "to_token": to_token,
-                "source": "coingecko",
-            }
-
-        return {"success": False, "error": "Unable to fetch prices"}
-
-price_client = PriceClient()
+        else:
+            from_price = prices.get(from_symbol)
+            to_price = prices.get(to_symbol)
+            if from_price and to_price:
+                from_value_usd = amount_in * from_price
+                estimate = (from_value_usd / to_price, from_price / to_price, [from_symbol, to_symbol])
+
+        if estimate is None:
+            return {"success": False, "error": "Unable to fetch prices"}
+        estimated_output, price, symbols = estimate
+        return {
+            "success": True,
+            "estimated_output": estimated_output,
+            "price": price,
+            "from_token": from_token,
+            "to_token": to_token,
+            **cls._provenance(symbols, origins),
+        }
+
+
+class PriceClient(BasePriceClient):
+    """Blocking client. Reuses pooled keep-alive connections through a ``requests.Session``."""
+
+    def __init__(self, cache: Optional[PriceCache] = None, snapshot: Optional[PriceSnapshot] = None, sources: Optional[PriceSourceChain] = None, pool_quoter: Optional[PoolQuoter] = None, last_known_good_max_age_seconds: float = PRICE_LAST_KNOWN_GOOD_MAX_AGE_SECONDS):
+        super().__init__(cache, snapshot, sources, pool_quoter, last_known_good_max_age_seconds)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=PRICE_HTTP_MAX_CONNECTIONS)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get_token_price(self, token_symbol: str, vs_currency: str = "usd") -> Optional[float]:
+        return self.get_token_prices([token_symbol], vs_currency).get(token_symbol.upper())
+
+    def get_token_prices(self, token_symbols: Iterable[str], vs_currency: str = "usd", origins: Optional[Dict[str, PriceOrigin]] = None) -> Dict[str, Optional[float]]:
+        """Returns prices keyed by upper-cased symbol, fetching all cache misses in one request.
+
+        ``origins``, when given, is filled with where each returned price came from.
+        """
+        token_symbols = list(token_symbols)
+        streamed = self._from_snapshot(token_symbols, vs_currency, origins)
+        if streamed is not None:
+            return streamed
+
+        keys, unknown = self._split_symbols(token_symbols, vs_currency)
+        cached = self.cache.get_many_or_load(keys, lambda missing: self._fetch_prices(missing, vs_currency)) if keys else {}
+        return self._merge_prices(cached, unknown, origins)
+
+    def prefetch_all(self, vs_currency: str = "usd") -> Dict[str, Optional[float]]:
+        """Warms the cache for every token in COINGECKO_IDS with a single request."""
+        return self.get_token_prices(COINGECKO_IDS.keys(), vs_currency)
+
+    def _fetch_prices(self, keys: List[PriceKey], vs_currency: str) -> Dict[PriceKey, Optional[float]]:
+        found = self.sources.fetch(
+            [symbol for symbol, _ in keys],
+            vs_currency,
+            self.session,
+            timeout=(PRICE_HTTP_CONNECT_TIMEOUT_SECONDS, PRICE_HTTP_TIMEOUT_SECONDS),
+        )
+        return self._keyed(found, keys)
+
+    def estimate_swap_output(self, from_token: str, to_token: str, amount_in: float) -> Dict[str, Any]:
+        quote = self._pool_quote(from_token, to_token, amount_in)
+        if quote:
+            return quote
+        origins: Dict[str, PriceOrigin] = {}
+        prices = self.get_token_prices(self._pair_symbols(from_token, to_token), "usd", origins)
+        return self._estimate_from_prices(from_token, to_token, amount_in, prices, origins)
+
+
+class AsyncPriceClient(BasePriceClient):
+    """Non-blocking client for the event loop, backed by one pooled ``httpx.AsyncClient``.
+
+    The HTTP client is created lazily and must be closed with ``aclose()`` on shutdown.
+    """
+
+    def __init__(self, cache: Optional[PriceCache] = None, snapshot: Optional[PriceSnapshot] = None, sources: Optional[PriceSourceChain] = None, pool_quoter: Optional[PoolQuoter] = None, last_known_good_max_age_seconds: float = PRICE_LAST_KNOWN_GOOD_MAX_AGE_SECONDS):
+        super().__init__(cache, snapshot, sources, pool_quoter, last_known_good_max_age_seconds)
+        self._http: Optional[httpx.AsyncClient] = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=PRICE_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=PRICE_HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=PRICE_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+                timeout=httpx.Timeout(PRICE_HTTP_TIMEOUT_SECONDS, connect=PRICE_HTTP_CONNECT_TIMEOUT_SECONDS),
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def get_token_price(self, token_symbol: str, vs_currency: str = "usd") -> Optional[float]:
+        prices = await self.get_token_prices([token_symbol], vs_currency)
+        return prices.get(token_symbol.upper())
+
+    async def get_token_prices(self, token_symbols: Iterable[str], vs_currency: str = "usd", origins: Optional[Dict[str, PriceOrigin]] = None) -> Dict[str, Optional[float]]:
+        token_symbols = list(token_symbols)
+        streamed = self._from_snapshot(token_symbols, vs_currency, origins)
+        if streamed is not None:
+            return streamed
+
+        keys, unknown = self._split_symbols(token_symbols, vs_currency)
+        cached = await self.cache.aget_many_or_load(keys, lambda missing: self._fetch_prices(missing, vs_currency)) if keys else {}
+        return self._merge_prices(cached, unknown, origins)
+
+    async def prefetch_all(self, vs_currency: str = "usd") -> Dict[str, Optional[float]]:
+        return await self.get_token_prices(COINGECKO_IDS.keys(), vs_currency)
+
+    async def refresh_all(self, vs_currency: str = "usd") -> Dict[str, Optional[float]]:
+        """Fetches every COINGECKO_IDS price in one request, bypassing and then updating the cache."""
+        keys, _ = self._split_symbols(COINGECKO_IDS.keys(), vs_currency)
+        fetched = await self._fetch_prices(keys, vs_currency)
+        self.cache.put_many(fetched)
+        # No last-known-good fill here: the snapshot must only ever hold fresh prices
+        return {symbol: price for (symbol, _), price in fetched.items()}
+
+    async def _fetch_prices(self, keys: List[PriceKey], vs_currency: str) -> Dict[PriceKey, Optional[float]]:
+        found = await self.sources.afetch([symbol for symbol, _ in keys], vs_currency, self.http)
+        return self._keyed(found, keys)
+
+    async def estimate_swap_output(self, from_token: str, to_token: str, amount_in: float) -> Dict[str, Any]:
+        quote = self._pool_quote(from_token, to_token, amount_in)
+        if quote:
+            return quote
+        origins: Dict[str, PriceOrigin] = {}
+        prices = await self.get_token_prices(self._pair_symbols(from_token, to_token), "usd", origins)
+        return self._estimate_from_prices(from_token, to_token, amount_in, prices, origins)
+
+
+price_client = PriceClient(pool_quoter=build_pool_quoter())
+# Shares the cache, snapshot, sources and pools so sync and async callers see the same prices, limits and breakers
+async_price_client = AsyncPriceClient(
+    cache=price_client.cache,
+    snapshot=price_client.snapshot,
+    sources=price_client.sources,
+    pool_quoter=price_client.pool_quoter,
+)
@@ -0,0 +1,384 @@
+"""Price sources behind PriceClient.
+
+Each ``PriceProvider`` knows how to price a list of symbols. ``PriceSourceChain`` tries
+them in order, guarding every provider with a token-bucket rate limiter, retries with
+exponential backoff and a circuit breaker, so a throttled source is skipped instead of
+hammered.
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+import httpx
+import requests
+from app.config import (
+    PRICE_PROVIDERS,
+    PRICE_RATE_LIMIT_PER_SECOND,
+    PRICE_RATE_LIMIT_BURST,
+    PRICE_RETRY_ATTEMPTS,
+    PRICE_RETRY_BASE_DELAY_SECONDS,
+    PRICE_BREAKER_FAILURE_THRESHOLD,
+    PRICE_BREAKER_RESET_SECONDS,
+)
+from app.tokens import COINGECKO_IDS
+from app.metrics import PRICE_FETCH_SECONDS, ERRORS
+from app.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class PriceProviderError(Exception):
+    """Raised when a provider cannot return any usable price."""
+
+
+class PriceProvider:
+    """Base class. Subclasses implement ``build_request`` and ``parse``, or override the fetch methods."""
+
+    name = "base"
+
+    def supports(self, symbol: str, vs_currency: str) -> bool:
+        return symbol.upper() in COINGECKO_IDS
+
+    def build_request(self, symbols: List[str], vs_currency: str) -> Tuple[str, Dict[str, str]]:
+        raise NotImplementedError
+
+    def parse(self, data: Any, symbols: List[str], vs_currency: str) -> Dict[str, Optional[float]]:
+        raise NotImplementedError
+
+    def fetch(self, symbols: List[str], vs_currency: str, session: requests.Session, timeout) -> Dict[str, Optional[float]]:
+        url, params = self.build_request(symbols, vs_currency)
+        resp = session.get(url, params=params, timeout=timeout)
+        resp.raise_for_status()
+        return self.parse(resp.json(), symbols, vs_currency)
+
+    async def afetch(self, symbols: List[str], vs_currency: str, http: httpx.AsyncClient) -> Dict[str, Optional[float]]:
+        url, params = self.build_request(symbols, vs_currency)
+        resp = await http.get(url, params=params)
+        resp.raise_for_status()
+        return self.parse(resp.json(), symbols, vs_currency)
+
+
+class CoinGeckoProvider(PriceProvider):
+    name = "coingecko"
+    BASE_URL = "https://api.coingecko.com/api/v3"
+
+    def build_request(self, symbols, vs_currency):
+        ids = ",".join(dict.fromkeys(COINGECKO_IDS[symbol] for symbol in symbols))
+        return f"{self.BASE_URL}/simple/price", {"ids": ids, "vs_currencies": vs_currency}
+
+    def parse(self, data, symbols, vs_currency):
+        return {symbol: data.get(COINGECKO_IDS[symbol], {}).get(vs_currency) for symbol in symbols}
+
+
+class DefiLlamaProvider(PriceProvider):
+    """DefiLlama's free price API. Keyed by CoinGecko ids, USD only."""
+
+    name = "defillama"
+    BASE_URL = "https://coins.llama.fi"
+
+    def supports(self, symbol, vs_currency):
+        return vs_currency.lower() == "usd" and super().supports(symbol, vs_currency)
+
+    def build_request(self, symbols, vs_currency):
+        coins = ",".join(dict.fromkeys(f"coingecko:{COINGECKO_IDS[symbol]}" for symbol in symbols))
+        return f"{self.BASE_URL}/prices/current/{coins}", {}
+
+    def parse(self, data, symbols, vs_currency):
+        coins = data.get("coins", {})
+        return {symbol: coins.get(f"coingecko:{COINGECKO_IDS[symbol]}", {}).get("price") for symbol in symbols}
+
+
+class StubPriceProvider(PriceProvider):
+    """Offline provider with fixed prices, for tests and benchmarks.
+
+    ``fail_times`` makes the next N calls raise; ``calls`` counts every fetch.
+    """
+
+    def __init__(self, prices: Dict[str, float], name: str = "stub", fail_times: int = 0, latency_seconds: float = 0.0):
+        self.prices = {symbol.upper(): price for symbol, price in prices.items()}
+        self.name = name
+        self.fail_times = fail_times
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+
+    def supports(self, symbol, vs_currency):
+        return symbol.upper() in self.prices
+
+    def _respond(self, symbols):
+        self.calls += 1
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise PriceProviderError(f"{self.name} unavailable")
+        return {symbol: self.prices.get(symbol) for symbol in symbols}
+
+    def fetch(self, symbols, vs_currency, session=None, timeout=None):
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return self._respond(symbols)
+
+    async def afetch(self, symbols, vs_currency, http=None):
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return self._respond(symbols)
+
+
+class TokenBucket:
+    """Non-blocking token bucket: ``try_acquire`` returns False instead of waiting."""
+
+    def __init__(self, rate_per_second: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+            self._updated = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures; lets one trial call through after ``reset_seconds``."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def accepting(self) -> bool:
+        """Whether ``allow`` would pass right now, without claiming the half-open trial."""
+        with self._lock:
+            state = self.state
+            return state == self.CLOSED or (state == self.HALF_OPEN and not self._trial_in_flight)
+
+    def allow(self) -> bool:
+        """Admits a call; in HALF_OPEN this claims the single trial until an outcome or ``release``."""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """Gives back a trial that ended without an outcome (e.g. the caller was cancelled)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+
+
+class _GuardedProvider:
+    __slots__ = ("provider", "bucket", "breaker")
+
+    def __init__(self, provider: PriceProvider, bucket: TokenBucket, breaker: CircuitBreaker):
+        self.provider = provider
+        self.bucket = bucket
+        self.breaker = breaker
+
+
+class PriceSourceChain:
+    """Tries each provider in order for the symbols still unpriced.
+
+    A provider is skipped while its breaker is open or its bucket is empty. Transient
+    errors are retried with exponential backoff, each retry taking another token.
+    Returns whatever prices were found; symbols no provider could price are absent
+    from the result. ``origin()`` tells which provider supplied a symbol's last price.
+    """
+
+    def __init__(
+        self,
+        providers: Iterable[PriceProvider],
+        rate_per_second: float = PRICE_RATE_LIMIT_PER_SECOND,
+        burst: float = PRICE_RATE_LIMIT_BURST,
+        retry_attempts: int = PRICE_RETRY_ATTEMPTS,
+        retry_base_delay: float = PRICE_RETRY_BASE_DELAY_SECONDS,
+        failure_threshold: int = PRICE_BREAKER_FAILURE_THRESHOLD,
+        reset_seconds: float = PRICE_BREAKER_RESET_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.sources = [
+            _GuardedProvider(
+                provider,
+                TokenBucket(rate_per_second, burst, clock=clock),
+                CircuitBreaker(failure_threshold, reset_seconds, clock=clock),
+            )
+            for provider in providers
+        ]
+        self.retry_attempts = max(1, retry_attempts)
+        self.retry_base_delay = retry_base_delay
+        # Incremented by the price client each time it serves a cached price because every source failed
+        self.last_known_good = 0
+        self._origins: Dict[Tuple[str, str], str] = {}
+
+    def _backoff(self, attempt: int) -> float:
+        delay = self.retry_base_delay * (2 ** attempt)
+        return delay + random.uniform(0, delay / 2)
+
+    def _candidates(self, remaining: List[str], vs_currency: str):
+        """Yields (source, symbols it can price) for sources currently accepting calls."""
+        for source in self.sources:
+            symbols = [symbol for symbol in remaining if source.provider.supports(symbol, vs_currency)]
+            if not symbols:
+                continue
+            if not source.breaker.accepting():
+                logger.info(f"Price source {source.provider.name} skipped: circuit open")
+                continue
+            # Rate limit first: a half-open trial claimed for a throttled source would never resolve
+            if not source.bucket.try_acquire():
+                logger.info(f"Price source {source.provider.name} skipped: rate limited")
+                continue
+            if not source.breaker.allow():
+                logger.info(f"Price source {source.provider.name} skipped: trial call already in flight")
+                continue
+            yield source, symbols
+
+    def origin(self, symbol: str, vs_currency: str = "usd") -> Optional[str]:
+        """Name of the provider that supplied the last price fetched for ``symbol``."""
+        return self._origins.get((symbol.upper(), vs_currency.lower()))
+
+    def _accept(self, source: _GuardedProvider, prices: Dict[str, Optional[float]], vs_currency: str, found: Dict[str, float]) -> None:
+        usable = {symbol: price for symbol, price in prices.items() if price is not None}
+        if not usable:
+            raise PriceProviderError(f"{source.provider.name} returned no prices")
+        found.update(usable)
+        for symbol in usable:
+            self._origins[(symbol.upper(), vs_currency.lower())] = source.provider.name
+
+    @staticmethod
+    def _may_retry(source: _GuardedProvider, attempt: int) -> bool:
+        """The first call is charged in ``_candidates``; every retry is another upstream call."""
+        if attempt == 0 or source.bucket.try_acquire():
+            return True
+        logger.info(f"Price source {source.provider.name} not retried: rate limited")
+        return False
+
+    def fetch(self, symbols: List[str], vs_currency: str, session: requests.Session, timeout=None) -> Dict[str, float]:
+        found: Dict[str, float] = {}
+        remaining = list(symbols)
+        for source, wanted in self._candidates(remaining, vs_currency):
+            try:
+                ok = False
+                for attempt in range(self.retry_attempts):
+                    if not self._may_retry(source, attempt):
+                        break
+                    started = time.perf_counter()
+                    try:
+                        with tracer.span(f"price_fetch {source.provider.name}", provider=source.provider.name, symbols=wanted, attempt=attempt + 1):
+                            self._accept(source, source.provider.fetch(wanted, vs_currency, session, timeout), vs_currency, found)
+                        PRICE_FETCH_SECONDS.observe(time.perf_counter() - started, provider=source.provider.name, outcome="ok")
+                        ok = True
+                        break
+                    except Exception as e:
+                        PRICE_FETCH_SECONDS.observe(time.perf_counter() - started, provider=source.provider.name, outcome="error")
+                        ERRORS.inc(kind="price_fetch")
+                        logger.warning(f"Price source {source.provider.name} failed (attempt {attempt + 1}): {e}")
+                        if attempt + 1 < self.retry_attempts:
+                            time.sleep(self._backoff(attempt))
+                if ok:
+                    source.breaker.record_success()
+                else:
+                    source.breaker.record_failure()
+            except BaseException:
+                # Cancelled mid-call (e.g. a tool timeout): free a half-open trial for the next caller
+                source.breaker.release()
+                raise
+            remaining[:] = [symbol for symbol in remaining if symbol not in found]
+            if not remaining:
+                break
+        return found
+
+    async def afetch(self, symbols: List[str], vs_currency: str, http: httpx.AsyncClient) -> Dict[str, float]:
+        found: Dict[str, float] = {}
+        remaining = list(symbols)
+        for source, wanted in self._candidates(remaining, vs_currency):
+            try:
+                ok = False
+                for attempt in range(self.retry_attempts):
+                    if not self._may_retry(source, attempt):
+                        break
+                    started = time.perf_counter()
+                    try:
+                        with tracer.span(f"price_fetch {source.provider.name}", provider=source.provider.name, symbols=wanted, attempt=attempt + 1):
+                            self._accept(source, await source.provider.afetch(wanted, vs_currency, http), vs_currency, found)
+                        PRICE_FETCH_SECONDS.observe(time.perf_counter() - started, provider=source.provider.name, outcome="ok")
+                        ok = True
+                        break
+                    except Exception as e:
+                        PRICE_FETCH_SECONDS.observe(time.perf_counter() - started, provider=source.provider.name, outcome="error")
+                        ERRORS.inc(kind="price_fetch")
+                        logger.warning(f"Price source {source.provider.name} failed (attempt {attempt + 1}): {e}")
+                        if attempt + 1 < self.retry_attempts:
+                            await asyncio.sleep(self._backoff(attempt))
+                if ok:
+                    source.breaker.record_success()
+                else:
+                    source.breaker.record_failure()
+            except BaseException:
+                # Cancelled mid-call (e.g. a tool timeout): free a half-open trial for the next caller
+                source.breaker.release()
+                raise
+            remaining[:] = [symbol for symbol in remaining if symbol not in found]
+            if not remaining:
+                break
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "providers": [{"name": source.provider.name, "circuit": source.breaker.state} for source in self.sources],
+            "last_known_good": self.last_known_good,
+        }
+
+
+PROVIDERS: Dict[str, Callable[[], PriceProvider]] = {
+    "coingecko": CoinGeckoProvider,
+    "defillama": DefiLlamaProvider,
+}
+
+
+def build_price_chain(names: str = PRICE_PROVIDERS) -> PriceSourceChain:
+    """Creates the chain from a comma-separated provider list, e.g. ``"coingecko,defillama"``."""
+    providers = []
+    for name in (part.strip().lower() for part in names.split(",")):
+        if not name:
+            continue
+        if name not in PROVIDERS:
+            raise ValueError(f"Unknown price provider: {name}")
+        providers.append(PROVIDERS[name]())
+    return PriceSourceChain(providers)
@@ -0,0 +1,113 @@
+import asyncio
+import time
+from typing import Callable, Dict, Iterable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PriceSnapshot:
+    """Latest streamed prices, readable without I/O or locks.
+
+    ``publish`` swaps in a new immutable view in one assignment, so readers always
+    see a consistent set of prices from a single refresh.
+    """
+
+    def __init__(self, max_staleness_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_staleness_seconds = max_staleness_seconds
+        self._clock = clock
+        self._view: Optional[tuple] = None  # (published_at, vs_currency, {symbol: price})
+
+        self.hits = 0
+        self.fallbacks = 0
+
+    def publish(self, prices: Dict[str, float], vs_currency: str = "usd") -> None:
+        fresh = {symbol.upper(): price for symbol, price in prices.items() if price is not None}
+        self._view = (self._clock(), vs_currency.lower(), fresh)
+
+    def get_many(self, token_symbols: Iterable[str], vs_currency: str = "usd") -> Optional[Dict[str, float]]:
+        """Returns prices for every symbol, or ``None`` if any is missing or the snapshot is too old."""
+        view = self._view
+        if view is None:
+            return None
+
+        published_at, view_currency, prices = view
+        if view_currency == vs_currency.lower() and self._clock() - published_at <= self.max_staleness_seconds:
+            try:
+                result = {symbol: prices[symbol] for symbol in token_symbols}
+                self.hits += 1
+                return result
+            except KeyError:
+                pass
+
+        self.fallbacks += 1
+        return None
+
+    def age(self) -> Optional[float]:
+        view = self._view
+        return None if view is None else self._clock() - view[0]
+
+    def stats(self) -> Dict[str, float]:
+        view = self._view
+        return {
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "size": 0 if view is None else len(view[2]),
+            "age_seconds": self.age(),
+            "max_staleness_seconds": self.max_staleness_seconds,
+        }
+
+
+class PriceStreamer:
+    """Background task that refreshes every registry price on a fixed interval.
+
+    Each refresh is one batched request; results go into the shared cache and the
+    snapshot so request-path quotes become in-memory lookups.
+    """
+
+    def __init__(self, client, snapshot: PriceSnapshot, interval_seconds: float, vs_currency: str = "usd"):
+        self.client = client
+        self.snapshot = snapshot
+        self.interval_seconds = interval_seconds
+        self.vs_currency = vs_currency
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run(), name="price-streamer")
+            logger.info(f"Price streamer started (interval {self.interval_seconds}s)")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Price streamer stopped")
+
+    async def refresh(self) -> Dict[str, Optional[float]]:
+        prices = await self.client.refresh_all(self.vs_currency)
+        if any(price is not None for price in prices.values()):
+            self.snapshot.publish(prices, self.vs_currency)
+        else:
+            logger.warning("Price refresh returned no prices; keeping previous snapshot")
+        return prices
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Price refresh failed: {e}")
+            await asyncio.sleep(max(0.0, self.interval_seconds - (loop.time() - started)))
@@ -0,0 +1,47 @@
+"""Quote identity and expiry.
+
+Quotes shown to the user are stamped with an id and an expiry and kept in the agent
+state, so a later swap proposal can reuse the exact number the user agreed to instead
+of fetching a new price.
+"""
+import time
+import uuid
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Optional
+from app.config import QUOTE_TTL_SECONDS
+
+
+def stamp_quote(quote: Dict[str, Any], ttl_seconds: float = QUOTE_TTL_SECONDS) -> Dict[str, Any]:
+    """Adds ``quote_id`` and ``expires_at`` (unix seconds) to a successful quote payload."""
+    return {**quote, "quote_id": f"q_{uuid.uuid4().hex[:16]}", "expires_at": round(time.time() + ttl_seconds, 3)}
+
+
+def is_fresh(quote: Dict[str, Any], now: Optional[float] = None) -> bool:
+    return quote.get("expires_at", 0) > (time.time() if now is None else now)
+
+
+def merge_quotes(existing: Optional[Dict[str, dict]], new: Optional[Dict[str, dict]]) -> Dict[str, dict]:
+    """State reducer: adds new quotes by id and drops expired ones."""
+    now = time.time()
+    merged = {**(existing or {}), **(new or {})}
+    return {quote_id: quote for quote_id, quote in merged.items() if is_fresh(quote, now)}
+
+
+def _same_amount(a: Any, b: Any) -> bool:
+    try:
+        return Decimal(str(a)) == Decimal(str(b))
+    except InvalidOperation:
+        return False
+
+
+def find_quote(quotes: Optional[Dict[str, dict]], from_token: str, to_token: str, amount: Any) -> Optional[Dict[str, Any]]:
+    """Returns the newest fresh quote for exactly this pair and amount, if any."""
+    now = time.time()
+    matches = [
+        quote for quote in (quotes or {}).values()
+        if quote.get("from_token", "").upper() == from_token.upper()
+        and quote.get("to_token", "").upper() == to_token.upper()
+        and _same_amount(quote.get("amount_in"), amount)
+        and is_fresh(quote, now)
+    ]
+    return max(matches, key=lambda quote: quote["expires_at"]) if matches else None
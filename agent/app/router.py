@@ -0,0 +1,156 @@
+"""Multi-hop route search over Uniswap V3 pools.
+
+``RouteFinder`` builds a token adjacency map once from the pool set. Candidate paths
+for a pair (bounded by ``max_hops``, shortest first) are computed on first use and
+kept in an LRU, so repeated pairs only pay for simulating the swaps along each path.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.config import ROUTE_MAX_HOPS, ROUTE_MAX_CANDIDATES, ROUTE_CACHE_MAX_ENTRIES
+from app.uniswap_v3 import PoolState, SwapResult, simulate_exact_input
+
+Path = Tuple[str, ...]
+
+
+@dataclass
+class Hop:
+    pool: PoolState
+    token_in: str
+    token_out: str
+    zero_for_one: bool
+    result: SwapResult
+
+
+@dataclass
+class Route:
+    """Best path found for an exact-input amount. Token addresses are lower-cased."""
+
+    tokens: List[str]
+    hops: List[Hop]
+    amount_in: int
+    amount_out: int
+
+    @property
+    def fee_tiers(self) -> List[int]:
+        return [hop.pool.fee for hop in self.hops]
+
+    @property
+    def ticks_crossed(self) -> int:
+        return sum(hop.result.ticks_crossed for hop in self.hops)
+
+
+class RouteFinder:
+    def __init__(
+        self,
+        pools: Iterable[PoolState],
+        max_hops: int = ROUTE_MAX_HOPS,
+        max_candidates: int = ROUTE_MAX_CANDIDATES,
+        cache_max_entries: int = ROUTE_CACHE_MAX_ENTRIES,
+    ):
+        self.max_hops = max_hops
+        self.max_candidates = max_candidates
+        self.cache_max_entries = cache_max_entries
+
+        # token -> neighbour -> every pool (fee tier) between them
+        self._adjacency: Dict[str, Dict[str, List[PoolState]]] = {}
+        for pool in pools:
+            token0, token1 = pool.token0.lower(), pool.token1.lower()
+            self._adjacency.setdefault(token0, {}).setdefault(token1, []).append(pool)
+            self._adjacency.setdefault(token1, {}).setdefault(token0, []).append(pool)
+
+        self._paths: "OrderedDict[Tuple[str, str], Tuple[Path, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def candidate_paths(self, token_in: str, token_out: str) -> Tuple[Path, ...]:
+        """Simple paths from ``token_in`` to ``token_out``, at most ``max_hops`` long, shortest first."""
+        key = (token_in.lower(), token_out.lower())
+        with self._lock:
+            paths = self._paths.get(key)
+            if paths is not None:
+                self._paths.move_to_end(key)
+                self.hits += 1
+                return paths
+            self.misses += 1
+
+        paths = self._search(*key)
+        with self._lock:
+            self._paths[key] = paths
+            while len(self._paths) > self.cache_max_entries:
+                self._paths.popitem(last=False)
+        return paths
+
+    def _search(self, source: str, target: str) -> Tuple[Path, ...]:
+        if source == target or source not in self._adjacency or target not in self._adjacency:
+            return ()
+
+        found: List[Path] = []
+        # Iterative deepening keeps the result ordered by hop count
+        for hops in range(1, self.max_hops + 1):
+            self._extend((source,), target, hops, found)
+            if len(found) >= self.max_candidates:
+                break
+        return tuple(found[: self.max_candidates])
+
+    def _extend(self, path: Path, target: str, hops_left: int, found: List[Path]) -> None:
+        neighbours = self._adjacency[path[-1]]
+        if hops_left == 1:
+            # Last hop: a membership test instead of walking every neighbour
+            if target in neighbours:
+                found.append(path + (target,))
+            return
+        for token in neighbours:
+            if token == target or token in path:
+                continue
+            self._extend(path + (token,), target, hops_left - 1, found)
+            if len(found) >= self.max_candidates:
+                return
+
+    def best_route(self, token_in: str, token_out: str, amount_in: int) -> Optional[Route]:
+        """Simulates every candidate path and returns the one with the largest output, or ``None``."""
+        best: Optional[Route] = None
+        # Paths sharing a prefix reuse the simulated hops
+        memo: Dict[Tuple[str, str, int], Optional[Hop]] = {}
+
+        for path in self.candidate_paths(token_in, token_out):
+            hops: List[Hop] = []
+            amount = amount_in
+            for token_a, token_b in zip(path, path[1:]):
+                hop_key = (token_a, token_b, amount)
+                if hop_key not in memo:
+                    memo[hop_key] = self._best_hop(token_a, token_b, amount)
+                hop = memo[hop_key]
+                if hop is None:
+                    break
+                hops.append(hop)
+                amount = hop.result.amount_out
+            else:
+                if best is None or amount > best.amount_out:
+                    best = Route(tokens=list(path), hops=hops, amount_in=amount_in, amount_out=amount)
+        return best
+
+    def _best_hop(self, token_in: str, token_out: str, amount_in: int) -> Optional[Hop]:
+        """Best fee tier for one hop. Pools that cannot spend the whole input are skipped."""
+        best: Optional[Hop] = None
+        for pool in self._adjacency[token_in][token_out]:
+            zero_for_one = pool.token0.lower() == token_in
+            result = simulate_exact_input(pool, zero_for_one, amount_in)
+            if result.amount_in < amount_in or result.amount_out == 0:
+                continue
+            if best is None or result.amount_out > best.result.amount_out:
+                best = Hop(pool=pool, token_in=token_in, token_out=token_out, zero_for_one=zero_for_one, result=result)
+        return best
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "tokens": len(self._adjacency),
+                "cached_pairs": len(self._paths),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
@@ -0,0 +1,54 @@
+import json
+from typing import Any, AsyncIterator, Dict
+import logging
+from langchain_core.messages import AIMessageChunk, ToolMessage
+
+logger = logging.getLogger(__name__)
+
+
+async def stream_chat_events(agent_app, input_state: Dict[str, Any], config: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """Runs the graph and yields events as they are produced.
+
+    Event types:
+        node_start  - a graph node began executing
+        token       - a chunk of LLM output
+        tool_result - a tool returned data to the agent
+        proposal    - a swap/send proposal is ready for the frontend
+        done        - final message and proposal for the turn
+    """
+    async for mode, chunk in agent_app.astream(input_state, config=config, stream_mode=["messages", "tasks"]):
+        if mode == "messages":
+            message, metadata = chunk
+            # Only stream LLM deltas; whole messages returned by nodes arrive with "done"
+            if isinstance(message, AIMessageChunk) and message.content:
+                yield {"event": "token", "node": metadata.get("langgraph_node"), "content": message.content}
+            continue
+
+        # "tasks" emits once when a node starts and once with its result
+        if "result" not in chunk:
+            yield {"event": "node_start", "node": chunk["name"]}
+            continue
+
+        if chunk.get("error"):
+            continue
+
+        result = chunk.get("result") or {}
+        for message in result.get("messages", []):
+            if isinstance(message, ToolMessage):
+                yield {"event": "tool_result", "node": chunk["name"], "tool": message.name, "content": message.content}
+
+        if result.get("proposed_transaction"):
+            yield {"event": "proposal", "node": chunk["name"], "proposed_transaction": result["proposed_transaction"]}
+
+    final_state = (await agent_app.aget_state(config)).values
+    yield {
+        "event": "done",
+        "message": final_state["messages"][-1].content,
+        "proposed_transaction": final_state.get("proposed_transaction"),
+        "conversation_id": config["configurable"]["thread_id"],
+    }
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encodes an event as a Server-Sent Events frame."""
+    return f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
@@ -0,0 +1,110 @@
+"""Token registry loaded from a token list file.
+
+Accepts the Uniswap token list format (``tokens`` entries with ``chainId``, ``address``,
+``symbol``, ``name``, ``decimals`` and optional ``extensions.coingeckoId`` /
+``extensions.aliases``). Entries under ``priceOnly`` have a price id but no address on
+this chain; they can be priced but not swapped or sent.
+
+All indexes are built once at load time, so every lookup is a single dict access.
+"""
+import json
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import logging
+from eth_utils import to_checksum_address
+
+logger = logging.getLogger(__name__)
+
+
+class Token(NamedTuple):
+    symbol: str
+    name: str
+    address: Optional[str]  # checksummed; None for price-only entries
+    decimals: Optional[int]
+    price_id: Optional[str]
+    aliases: Tuple[str, ...] = ()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The legacy ``BASE_TOKENS`` entry shape."""
+        return {"address": self.address, "decimals": self.decimals, "name": self.name}
+
+
+class TokenRegistry:
+    def __init__(self, tokens: Iterable[Token]):
+        self._tokens: List[Token] = []
+        self._by_symbol: Dict[str, Token] = {}
+        self._by_address: Dict[str, Token] = {}
+        self._by_alias: Dict[str, Token] = {}
+        self._by_price_id: Dict[str, Token] = {}
+
+        for token in tokens:
+            self._tokens.append(token)
+            # Earlier entries win on collisions, so list order is priority order
+            self._by_symbol.setdefault(token.symbol.upper(), token)
+            if token.address:
+                self._by_address.setdefault(token.address.lower(), token)
+            if token.price_id:
+                self._by_price_id.setdefault(token.price_id, token)
+            for alias in token.aliases:
+                self._by_alias.setdefault(alias.lower(), token)
+
+    @classmethod
+    def from_file(cls, path: str, chain_id: Optional[int] = None) -> "TokenRegistry":
+        with open(path) as f:
+            data = json.load(f)
+        registry = cls(cls.parse(data, chain_id))
+        logger.info(f"Loaded {len(registry)} tokens from {path}")
+        return registry
+
+    @staticmethod
+    def parse(data: Dict[str, Any], chain_id: Optional[int] = None) -> Iterator[Token]:
+        for entry in data.get("tokens", []):
+            if chain_id is not None and entry.get("chainId", chain_id) != chain_id:
+                continue
+            yield TokenRegistry._parse_entry(entry, to_checksum_address(entry["address"]), int(entry["decimals"]))
+        for entry in data.get("priceOnly", []):
+            yield TokenRegistry._parse_entry(entry, None, entry.get("decimals"))
+
+    @staticmethod
+    def _parse_entry(entry: Dict[str, Any], address: Optional[str], decimals: Optional[int]) -> Token:
+        extensions = entry.get("extensions") or {}
+        return Token(
+            symbol=entry["symbol"].upper(),
+            name=entry.get("name", entry["symbol"]),
+            address=address,
+            decimals=decimals,
+            price_id=extensions.get("coingeckoId"),
+            aliases=tuple(alias.lower() for alias in extensions.get("aliases", ())),
+        )
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def __iter__(self) -> Iterator[Token]:
+        return iter(self._tokens)
+
+    def by_symbol(self, symbol: str) -> Optional[Token]:
+        return self._by_symbol.get(symbol.upper())
+
+    def by_address(self, address: str) -> Optional[Token]:
+        return self._by_address.get(address.lower())
+
+    def by_alias(self, alias: str) -> Optional[Token]:
+        return self._by_alias.get(alias.lower())
+
+    def by_price_id(self, price_id: str) -> Optional[Token]:
+        return self._by_price_id.get(price_id)
+
+    def get(self, identifier: str) -> Optional[Token]:
+        """Exact lookup by symbol, then address, then alias."""
+        identifier = identifier.strip()
+        if identifier[:2].lower() == "0x" and len(identifier) == 42:
+            return self.by_address(identifier)
+        return self.by_symbol(identifier) or self.by_alias(identifier)
+
+    def tradable(self) -> Dict[str, Dict[str, Any]]:
+        """Symbol -> legacy entry for every token with an address on this chain."""
+        return {symbol: token.as_dict() for symbol, token in self._by_symbol.items() if token.address}
+
+    def price_ids(self) -> Dict[str, str]:
+        """Symbol -> price-source id for every token that can be priced."""
+        return {symbol: token.price_id for symbol, token in self._by_symbol.items() if token.price_id}
@@ -0,0 +1,160 @@
+"""Fuzzy token resolution ("usdc.e" -> USDC, "dai stable" -> DAI).
+
+Every symbol, alias and name in the registry is normalized and indexed once: an exact
+dict for the common case and a trigram inverted index for typos. Known bridge
+decorations are stripped before matching; any other extra suffix is a different token. A
+match is only returned when it clears the confidence threshold and no other token
+scores close to it, so ambiguous input ("usd") still goes back to the user.
+"""
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from app.config import TOKEN_MATCH_THRESHOLD, TOKEN_MATCH_MARGIN
+from app.token_registry import Token, TokenRegistry
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Bridged-token decorations that still name the underlying token ("usdc.e", "usdc.axl")
+_DECORATION_RE = re.compile(r"(?:\.(?:e|b|axl)|\s*\(bridged\))$")
+# Score for a known token plus one of those decorations
+DECORATED_SCORE = 0.95
+# Score for a query that shortens a name at a word boundary ("tether" / "Tether USD",
+# "wrapped eth" / "Wrapped Ether")
+PREFIX_SCORE = 0.9
+# Any other prefix relation ("usdcc" / "usdc", "ethe" / "ether"). Kept below the default
+# threshold: "ethx" or "ethfi" are other tokens, so a bare prefix is only a suggestion.
+PARTIAL_PREFIX_SCORE = 0.8
+# Score for one word of a multi-word query naming a token exactly ("dai stable")
+WORD_SCORE = 0.85
+# Fuzzy candidates re-ranked by edit distance per query
+_MAX_CANDIDATES = 12
+
+
+def normalize(text: str) -> str:
+    return _NON_ALNUM_RE.sub("", text.lower())
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"^{key}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a: str, b: str) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def _word_ends(text: str) -> Tuple[int, ...]:
+    """Offsets in ``normalize(text)`` where each word of ``text`` ends."""
+    ends, offset = [], 0
+    for word in _WORD_RE.findall(text.lower()):
+        offset += len(word)
+        ends.append(offset)
+    return tuple(ends)
+
+
+def similarity(query: str, key: str, key_word_ends: Tuple[int, ...] = ()) -> float:
+    """Normalized edit similarity, raised when one string prefixes the other.
+
+    Only a query of 4+ characters that covers at least one whole word of ``key`` gets
+    PREFIX_SCORE; extra characters after a known key make it a different token.
+    """
+    if query == key:
+        return 1.0
+    score = 1 - _edit_distance(query, key) / max(len(query), len(key))
+    shorter, longer = sorted((query, key), key=len)
+    if len(shorter) >= 3 and longer.startswith(shorter):
+        covers_word = shorter is query and len(query) >= 4 and any(end <= len(query) for end in key_word_ends)
+        score = max(score, PREFIX_SCORE if covers_word else PARTIAL_PREFIX_SCORE)
+    return score
+
+
+class Resolution(NamedTuple):
+    token: Optional[Token]
+    score: float
+    candidates: Tuple[Tuple[str, float], ...]  # (symbol, score), best first
+
+
+class TokenResolver:
+    def __init__(self, registry: TokenRegistry, threshold: float = TOKEN_MATCH_THRESHOLD, margin: float = TOKEN_MATCH_MARGIN, cache_size: int = 4096):
+        self.registry = registry
+        self.threshold = threshold
+        self.margin = margin
+
+        self._exact: Dict[str, Token] = {}
+        self._keys: List[str] = []
+        self._key_tokens: List[Token] = []
+        self._key_word_ends: List[Tuple[int, ...]] = []
+        self._postings: Dict[str, List[int]] = {}
+        for token in registry:
+            for raw in (token.symbol, *token.aliases, token.name):
+                key = normalize(raw)
+                if not key or key in self._exact:
+                    continue
+                self._exact[key] = token
+                key_id = len(self._keys)
+                self._keys.append(key)
+                self._key_tokens.append(token)
+                self._key_word_ends.append(_word_ends(raw))
+                for gram in _trigrams(key):
+                    self._postings.setdefault(gram, []).append(key_id)
+
+        self._resolve_cached = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def resolve(self, text: str) -> Resolution:
+        return self._resolve_cached(text.strip().lower())
+
+    def lookup(self, text: str) -> Optional[Token]:
+        """The confidently matched token, or ``None``."""
+        return self.resolve(text).token
+
+    def suggest(self, text: str, limit: int = 3) -> List[str]:
+        """Near misses worth offering back to the user ("did you mean ...")."""
+        floor = self.threshold - 0.1
+        return [symbol for symbol, score in self.resolve(text).candidates[:limit] if score >= floor]
+
+    def _resolve(self, text: str) -> Resolution:
+        query = normalize(text)
+        if not query:
+            return Resolution(None, 0.0, ())
+
+        exact = self._exact.get(query)
+        if exact is not None:
+            return Resolution(exact, 1.0, ((exact.symbol, 1.0),))
+
+        undecorated = self._exact.get(normalize(_DECORATION_RE.sub("", text)))
+        if undecorated is not None:
+            return Resolution(undecorated, DECORATED_SCORE, ((undecorated.symbol, DECORATED_SCORE),))
+
+        scores: Dict[Token, float] = {}
+
+        # Keys sharing the most trigrams with the query, re-ranked by edit similarity
+        shared = Counter(key_id for gram in _trigrams(query) for key_id in self._postings.get(gram, ()))
+        for key_id, _ in shared.most_common(_MAX_CANDIDATES):
+            token = self._key_tokens[key_id]
+            scores[token] = max(scores.get(token, 0.0), similarity(query, self._keys[key_id], self._key_word_ends[key_id]))
+
+        words = _WORD_RE.findall(text)
+        if len(words) > 1:
+            for word in words:
+                token = self._exact.get(word)
+                if token is not None:
+                    scores[token] = max(scores.get(token, 0.0), WORD_SCORE)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        candidates = tuple((token.symbol, round(score, 3)) for token, score in ranked[:5])
+        if not ranked or ranked[0][1] < self.threshold:
+            return Resolution(None, ranked[0][1] if ranked else 0.0, candidates)
+        if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < self.margin:
+            # Two tokens match about equally well: let the user pick
+            return Resolution(None, ranked[0][1], candidates)
+        return Resolution(ranked[0][0], ranked[0][1], candidates)
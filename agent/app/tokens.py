@@ -1,30 +1,31 @@
-# Base network token registry
-BASE_TOKENS = {
-    "ETH": {
-        "address": "0x0000000000000000000000000000000000000000",
-        "decimals": 18,
-        "name": "Ethereum"
-    },
-    "USDC": {
-        "address": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
-        "decimals": 6,
-        "name": "USD Coin"
-    },
-    "WETH": {
-        "address": "0x4200000000000000000000000000000000000006",
-        "decimals": 18,
-        "name": "Wrapped Ether"
-    },
-    "DAI": {
-        "address": "0x50c5725949A6F0c72E6C4a641F24049A917DB0Cb",
-        "decimals": 18,
-        "name": "Dai Stablecoin"
-    }
-}
+from typing import Optional
+from app.config import TOKEN_LIST_PATH, BASE_CHAIN_NUMERIC_ID
+from app.token_registry import Token, TokenRegistry
+from app.token_resolver import TokenResolver
 
-def get_token_address(symbol: str) -> str:
+# Base network token registry, loaded once from the token list
+token_registry = TokenRegistry.from_file(TOKEN_LIST_PATH, chain_id=BASE_CHAIN_NUMERIC_ID)
+
+token_resolver = TokenResolver(token_registry)
+
+# Read-only views kept for older call sites
+BASE_TOKENS = token_registry.tradable()
+COINGECKO_IDS = token_registry.price_ids()
+
+def get_token_address(symbol: str) -> Optional[str]:
     """Helper to get token address by symbol."""
-    token = BASE_TOKENS.get(symbol.upper())
+    token = token_registry.by_symbol(symbol)
     if token:
-        return token["address"]
-    return None
\ No newline at end of file
+        return token.address
+    return None
+
+def resolve_tradable_token(text: str) -> Optional[Token]:
+    """Resolves what the user typed ("usdc.e", "ether", a contract address) to a token with a Base address, or None."""
+    # Exact symbol, alias or address first; the fuzzy resolver knows nothing about addresses
+    token = token_registry.get(text) or token_resolver.lookup(text)
+    return token if token and token.address else None
+
+def describe_unknown_token(text: str) -> str:
+    """The unresolved input, with suggestions when there are close matches."""
+    suggestions = token_resolver.suggest(text)
+    return f"{text} (did you mean {' or '.join(suggestions)}?)" if suggestions else text
@@ -0,0 +1,271 @@
+"""Opt-in tracing of chat turns (``TRACING_ENABLED=true``).
+
+Spans follow the OpenTelemetry data model (128-bit trace id, 64-bit span ids, parent
+links, nanosecond timestamps, attributes, status) and are exported as OTLP/JSON,
+either appended to a file (one ``ExportTraceServiceRequest`` per line, readable by
+the collector's ``otlpjsonfile`` receiver) or posted to a collector's
+``/v1/traces`` endpoint. The current span lives in a ``ContextVar``, so it follows
+the request across ``await`` points and into LangGraph's worker threads.
+
+Export runs on a background thread; a full queue drops spans instead of slowing the
+request. With tracing disabled, ``span()`` hands back a shared no-op span.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import logging
+import requests
+from app.config import (
+    TRACING_ENABLED,
+    TRACING_EXPORTER,
+    TRACING_FILE_PATH,
+    TRACING_OTLP_ENDPOINT,
+    TRACING_SERVICE_NAME,
+    TRACING_QUEUE_SIZE,
+    TRACING_EXPORT_INTERVAL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# OTLP status codes
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_span_id", "start_ns", "end_ns", "attributes", "status", "status_message")
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status = STATUS_OK
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = str(error)
+        self.attributes["exception.type"] = type(error).__name__
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": self.status, "message": self.status_message},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+class _NoopSpan:
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, error: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    elif isinstance(value, str):
+        typed = {"stringValue": value}
+    else:
+        typed = {"stringValue": json.dumps(value, default=str)}
+    return {"key": key, "value": typed}
+
+
+def otlp_request(spans: List[Span], service_name: str) -> Dict[str, Any]:
+    """Wraps spans in an OTLP ``ExportTraceServiceRequest``."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", service_name)]},
+            "scopeSpans": [{"scope": {"name": "miye.agent"}, "spans": [span.to_otlp() for span in spans]}],
+        }]
+    }
+
+
+class SpanExporter:
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+
+class FileSpanExporter(SpanExporter):
+    def __init__(self, path: str, service_name: str = TRACING_SERVICE_NAME):
+        self.path = path
+        self.service_name = service_name
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, spans: List[Span]) -> None:
+        with open(self.path, "a") as f:
+            f.write(json.dumps(otlp_request(spans, self.service_name)) + "\n")
+
+
+class OtlpHttpExporter(SpanExporter):
+    def __init__(self, endpoint: str, service_name: str = TRACING_SERVICE_NAME, timeout: float = 5.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def export(self, spans: List[Span]) -> None:
+        response = self.session.post(self.url, json=otlp_request(spans, self.service_name), timeout=self.timeout)
+        response.raise_for_status()
+
+
+class Tracer:
+    def __init__(self, exporter: Optional[SpanExporter] = None, queue_size: int = TRACING_QUEUE_SIZE, export_interval: float = TRACING_EXPORT_INTERVAL_SECONDS):
+        self.exporter = exporter
+        self.export_interval = export_interval
+        self.dropped = 0
+        self._current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=queue_size)
+        self._stopped = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def current_span(self) -> Optional[Span]:
+        return self._current.get()
+
+    def current_trace_id(self) -> Optional[str]:
+        span = self._current.get()
+        return span.trace_id if span else None
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Any]:
+        """Times the block as a child of the current span (a new trace if there is none)."""
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+
+        parent = self._current.get()
+        span = Span(name, parent.trace_id if parent else secrets.token_hex(16), parent.span_id if parent else None, attributes)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            try:
+                self._current.reset(token)
+            except ValueError:
+                # Exited from another context (e.g. a generator finalized elsewhere)
+                self._current.set(parent)
+            self._enqueue(span)
+
+    def _enqueue(self, span: Span) -> None:
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._export_loop, name="span-exporter", daemon=True)
+            self._worker.start()
+
+    def _drain(self) -> List[Span]:
+        spans = []
+        while True:
+            try:
+                spans.append(self._queue.get_nowait())
+            except queue.Empty:
+                return spans
+
+    def _export(self, spans: List[Span]) -> None:
+        if not spans:
+            return
+        try:
+            self.exporter.export(spans)
+        except Exception as e:
+            logger.warning(f"Span export failed, dropped {len(spans)} spans: {e}")
+
+    def _export_loop(self) -> None:
+        while not self._stopped.wait(self.export_interval):
+            self._export(self._drain())
+
+    def flush(self) -> None:
+        """Exports every queued span now."""
+        if self.enabled:
+            self._export(self._drain())
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        self.flush()
+
+
+def traced(name: str) -> Callable:
+    """Decorator running a sync or async function inside ``tracer.span(name)``."""
+    def decorate(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def build_tracer() -> Tracer:
+    if not TRACING_ENABLED:
+        return Tracer()
+    exporter = TRACING_EXPORTER.lower()
+    if exporter == "file":
+        logger.info(f"Tracing to {TRACING_FILE_PATH}")
+        return Tracer(FileSpanExporter(TRACING_FILE_PATH))
+    if exporter == "otlp":
+        logger.info(f"Tracing to {TRACING_OTLP_ENDPOINT}")
+        return Tracer(OtlpHttpExporter(TRACING_OTLP_ENDPOINT))
+    raise ValueError(f"Unknown TRACING_EXPORTER: {TRACING_EXPORTER}")
+
+
+tracer = build_tracer()
@@ -0,0 +1,291 @@
+"""Uniswap V3 swap math, ported from v3-core with exact integer semantics.
+
+Mirrors TickMath, SqrtPriceMath, SwapMath and the exact-input loop of
+``UniswapV3Pool.swap``, so a simulated ``exactInputSingle`` on a pool snapshot
+returns the same ``amountOut`` the QuoterV2 contract would, without an RPC call.
+"""
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+Q96 = 1 << 96
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+FEE_DENOMINATOR = 1_000_000
+_UINT256 = 1 << 256
+
+
+# --- FullMath ---
+
+def mul_div(a: int, b: int, denominator: int) -> int:
+    return a * b // denominator
+
+
+def mul_div_rounding_up(a: int, b: int, denominator: int) -> int:
+    return -(-a * b // denominator)
+
+
+def div_rounding_up(a: int, b: int) -> int:
+    return -(-a // b)
+
+
+# --- TickMath ---
+
+_TICK_FACTORS = (
+    (0x2, 0xfff97272373d413259a46990580e213a),
+    (0x4, 0xfff2e50f5f656932ef12357cf3c7fdcc),
+    (0x8, 0xffe5caca7e10e4e61c3624eaa0941cd0),
+    (0x10, 0xffcb9843d60f6159c9db58835c926644),
+    (0x20, 0xff973b41fa98c081472e6896dfb254c0),
+    (0x40, 0xff2ea16466c96a3843ec78b326b52861),
+    (0x80, 0xfe5dee046a99a2a811c461f1969c3053),
+    (0x100, 0xfcbe86c7900a88aedcffc83b479aa3a4),
+    (0x200, 0xf987a7253ac413176f2b074cf7815e54),
+    (0x400, 0xf3392b0822b70005940c7a398e4b70f3),
+    (0x800, 0xe7159475a2c29b7443b29c7fa6e889d9),
+    (0x1000, 0xd097f3bdfd2022b8845ad8f792aa5825),
+    (0x2000, 0xa9f746462d870fdf8a65dc1f90e061e5),
+    (0x4000, 0x70d869a156d2a1b890bb3df62baf32f7),
+    (0x8000, 0x31be135f97d08fd981231505542fcfa6),
+    (0x10000, 0x9aa508b5b7a84e1c677de54f3e99bc9),
+    (0x20000, 0x5d6af8dedb81196699c329225ee604),
+    (0x40000, 0x2216e584f5fa1ea926041bedfe98),
+    (0x80000, 0x48a170391f7dc42444e8fa2),
+)
+
+
+def get_sqrt_ratio_at_tick(tick: int) -> int:
+    """sqrt(1.0001^tick) as a Q64.96, rounded up like the contract."""
+    abs_tick = abs(tick)
+    if abs_tick > MAX_TICK:
+        raise ValueError(f"Tick out of range: {tick}")
+
+    ratio = 0xfffcb933bd6fad37aa2d162d1a594001 if abs_tick & 0x1 else 0x100000000000000000000000000000000
+    for mask, factor in _TICK_FACTORS:
+        if abs_tick & mask:
+            ratio = (ratio * factor) >> 128
+    if tick > 0:
+        ratio = (_UINT256 - 1) // ratio
+
+    return (ratio >> 32) + (0 if ratio % (1 << 32) == 0 else 1)
+
+
+def get_tick_at_sqrt_ratio(sqrt_price_x96: int) -> int:
+    """Greatest tick whose sqrt ratio is <= ``sqrt_price_x96``."""
+    if not MIN_SQRT_RATIO <= sqrt_price_x96 < MAX_SQRT_RATIO:
+        raise ValueError(f"Sqrt price out of range: {sqrt_price_x96}")
+
+    ratio = sqrt_price_x96 << 32
+    msb = ratio.bit_length() - 1
+    r = ratio >> (msb - 127) if msb >= 128 else ratio << (127 - msb)
+
+    log_2 = (msb - 128) << 64
+    for bit in range(63, 49, -1):
+        r = (r * r) >> 127
+        f = r >> 128
+        log_2 |= f << bit
+        r >>= f
+
+    log_sqrt10001 = log_2 * 255738958999603826347141
+    tick_low = (log_sqrt10001 - 3402992956809132418596140100660247210) >> 128
+    tick_high = (log_sqrt10001 + 291339464771989622907027621153398088495) >> 128
+    if tick_low == tick_high:
+        return tick_low
+    return tick_high if get_sqrt_ratio_at_tick(tick_high) <= sqrt_price_x96 else tick_low
+
+
+# --- SqrtPriceMath ---
+
+def get_next_sqrt_price_from_amount0_rounding_up(sqrt_price_x96: int, liquidity: int, amount: int, add: bool) -> int:
+    if amount == 0:
+        return sqrt_price_x96
+    numerator1 = liquidity << 96
+    product = amount * sqrt_price_x96
+
+    if add:
+        # The contract only uses the precise form when neither product nor denominator overflows uint256
+        if product < _UINT256 and numerator1 + product < _UINT256:
+            return mul_div_rounding_up(numerator1, sqrt_price_x96, numerator1 + product)
+        return div_rounding_up(numerator1, numerator1 // sqrt_price_x96 + amount)
+
+    if product >= _UINT256 or numerator1 <= product:
+        raise ValueError("Insufficient liquidity for amount0")
+    return mul_div_rounding_up(numerator1, sqrt_price_x96, numerator1 - product)
+
+
+def get_next_sqrt_price_from_amount1_rounding_down(sqrt_price_x96: int, liquidity: int, amount: int, add: bool) -> int:
+    if add:
+        return sqrt_price_x96 + mul_div(amount, Q96, liquidity)
+
+    quotient = mul_div_rounding_up(amount, Q96, liquidity)
+    if sqrt_price_x96 <= quotient:
+        raise ValueError("Insufficient liquidity for amount1")
+    return sqrt_price_x96 - quotient
+
+
+def get_next_sqrt_price_from_input(sqrt_price_x96: int, liquidity: int, amount_in: int, zero_for_one: bool) -> int:
+    if zero_for_one:
+        return get_next_sqrt_price_from_amount0_rounding_up(sqrt_price_x96, liquidity, amount_in, True)
+    return get_next_sqrt_price_from_amount1_rounding_down(sqrt_price_x96, liquidity, amount_in, True)
+
+
+def get_amount0_delta(sqrt_a: int, sqrt_b: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    numerator1 = liquidity << 96
+    numerator2 = sqrt_b - sqrt_a
+    if round_up:
+        return div_rounding_up(mul_div_rounding_up(numerator1, numerator2, sqrt_b), sqrt_a)
+    return mul_div(numerator1, numerator2, sqrt_b) // sqrt_a
+
+
+def get_amount1_delta(sqrt_a: int, sqrt_b: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    if round_up:
+        return mul_div_rounding_up(liquidity, sqrt_b - sqrt_a, Q96)
+    return mul_div(liquidity, sqrt_b - sqrt_a, Q96)
+
+
+# --- SwapMath (exact input only) ---
+
+def compute_swap_step(sqrt_current: int, sqrt_target: int, liquidity: int, amount_remaining: int, fee_pips: int) -> Tuple[int, int, int, int]:
+    """Returns ``(sqrt_next, amount_in, amount_out, fee_amount)`` for one step towards ``sqrt_target``."""
+    zero_for_one = sqrt_current >= sqrt_target
+
+    amount_remaining_less_fee = mul_div(amount_remaining, FEE_DENOMINATOR - fee_pips, FEE_DENOMINATOR)
+    if zero_for_one:
+        amount_in = get_amount0_delta(sqrt_target, sqrt_current, liquidity, True)
+    else:
+        amount_in = get_amount1_delta(sqrt_current, sqrt_target, liquidity, True)
+
+    if amount_remaining_less_fee >= amount_in:
+        sqrt_next = sqrt_target
+    else:
+        sqrt_next = get_next_sqrt_price_from_input(sqrt_current, liquidity, amount_remaining_less_fee, zero_for_one)
+
+    reached_target = sqrt_next == sqrt_target
+    if zero_for_one:
+        if not reached_target:
+            amount_in = get_amount0_delta(sqrt_next, sqrt_current, liquidity, True)
+        amount_out = get_amount1_delta(sqrt_next, sqrt_current, liquidity, False)
+    else:
+        if not reached_target:
+            amount_in = get_amount1_delta(sqrt_current, sqrt_next, liquidity, True)
+        amount_out = get_amount0_delta(sqrt_current, sqrt_next, liquidity, False)
+
+    if not reached_target:
+        # Everything left over is taken as fee
+        fee_amount = amount_remaining - amount_in
+    else:
+        fee_amount = mul_div_rounding_up(amount_in, fee_pips, FEE_DENOMINATOR - fee_pips)
+    return sqrt_next, amount_in, amount_out, fee_amount
+
+
+# --- Pool ---
+
+@dataclass
+class PoolState:
+    """Snapshot of one pool: ``slot0``, active liquidity and every initialized tick's ``liquidityNet``."""
+
+    token0: str
+    token1: str
+    fee: int
+    tick_spacing: int
+    sqrt_price_x96: int
+    liquidity: int
+    tick: int
+    ticks: Dict[int, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        # Initialized ticks as compressed indexes, sorted for the bitmap-style search
+        self._compressed: List[int] = sorted(tick // self.tick_spacing for tick in self.ticks)
+
+    def next_initialized_tick_within_one_word(self, tick: int, lte: bool) -> Tuple[int, bool]:
+        """Same result as ``TickBitmap.nextInitializedTickWithinOneWord``, including word boundaries."""
+        compressed = tick // self.tick_spacing
+        if lte:
+            word_start = compressed - (compressed & 0xff)
+            i = bisect_right(self._compressed, compressed) - 1
+            if i >= 0 and self._compressed[i] >= word_start:
+                return self._compressed[i] * self.tick_spacing, True
+            return word_start * self.tick_spacing, False
+
+        compressed += 1
+        word_end = compressed + (255 - (compressed & 0xff))
+        i = bisect_left(self._compressed, compressed)
+        if i < len(self._compressed) and self._compressed[i] <= word_end:
+            return self._compressed[i] * self.tick_spacing, True
+        return word_end * self.tick_spacing, False
+
+    def has_ticks_beyond(self, tick: int, lte: bool) -> bool:
+        """Whether any initialized tick remains in the swap direction."""
+        compressed = tick // self.tick_spacing
+        if lte:
+            return bool(self._compressed) and self._compressed[0] <= compressed
+        return bool(self._compressed) and self._compressed[-1] > compressed
+
+
+@dataclass
+class SwapResult:
+    amount_in: int
+    amount_out: int
+    fee_paid: int
+    sqrt_price_after: int
+    tick_after: int
+    ticks_crossed: int
+
+
+def simulate_exact_input(pool: PoolState, zero_for_one: bool, amount_in: int, sqrt_price_limit_x96: Optional[int] = None) -> SwapResult:
+    """Runs the ``UniswapV3Pool.swap`` loop for a positive (exact input) amount without mutating ``pool``."""
+    if amount_in <= 0:
+        raise ValueError("amount_in must be positive")
+    if sqrt_price_limit_x96 is None:
+        sqrt_price_limit_x96 = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+
+    remaining = amount_in
+    amount_out = 0
+    fee_paid = 0
+    sqrt_price = pool.sqrt_price_x96
+    tick = pool.tick
+    liquidity = pool.liquidity
+    crossed = 0
+
+    while remaining != 0 and sqrt_price != sqrt_price_limit_x96:
+        if liquidity == 0 and not pool.has_ticks_beyond(tick, zero_for_one):
+            # Nothing left to trade against; the contract would only walk the price to the limit
+            break
+        sqrt_start = sqrt_price
+        tick_next, initialized = pool.next_initialized_tick_within_one_word(tick, zero_for_one)
+        tick_next = max(MIN_TICK, min(MAX_TICK, tick_next))
+        sqrt_next = get_sqrt_ratio_at_tick(tick_next)
+
+        beyond_limit = sqrt_next < sqrt_price_limit_x96 if zero_for_one else sqrt_next > sqrt_price_limit_x96
+        sqrt_target = sqrt_price_limit_x96 if beyond_limit else sqrt_next
+        sqrt_price, step_in, step_out, step_fee = compute_swap_step(sqrt_price, sqrt_target, liquidity, remaining, pool.fee)
+
+        remaining -= step_in + step_fee
+        amount_out += step_out
+        fee_paid += step_fee
+
+        if sqrt_price == sqrt_next:
+            if initialized:
+                liquidity_net = pool.ticks[tick_next]
+                liquidity += -liquidity_net if zero_for_one else liquidity_net
+                if liquidity < 0:
+                    raise ValueError(f"Inconsistent pool state: negative liquidity after crossing tick {tick_next}")
+                crossed += 1
+            tick = tick_next - 1 if zero_for_one else tick_next
+        elif sqrt_price != sqrt_start:
+            tick = get_tick_at_sqrt_ratio(sqrt_price)
+
+    return SwapResult(
+        amount_in=amount_in - remaining,
+        amount_out=amount_out,
+        fee_paid=fee_paid,
+        sqrt_price_after=sqrt_price,
+        tick_after=tick,
+        ticks_crossed=crossed,
+    )
@@ -0,0 +1,68 @@
+"""Offline stand-ins for Gemini and the price sources."""
+import asyncio
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from app.price_client import AsyncPriceClient, PriceClient
+from app.price_providers import PriceSourceChain, StubPriceProvider
+
+BENCH_PRICES = {"ETH": 3000.0, "WETH": 3000.0, "USDC": 1.0, "DAI": 1.0, "USDT": 1.0}
+
+
+class ScriptedChatModel:
+    """Deterministic chat model with the same ``invoke`` contract as the bound Gemini model.
+
+    ``script`` maps a user message to the tool call the model should make for it (or
+    ``None`` for a plain reply). After tool results it replies with a short summary.
+    ``latency_seconds`` simulates the network round trip of each call.
+    """
+
+    def __init__(self, script: Dict[str, Optional[Dict[str, Any]]], latency_seconds: float = 0.0):
+        self.script = script
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+
+    def bind_tools(self, tools: Sequence[Any]) -> "ScriptedChatModel":
+        return self
+
+    def invoke(self, messages: List[BaseMessage], *args, **kwargs) -> AIMessage:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return self._respond(messages)
+
+    async def ainvoke(self, messages: List[BaseMessage], *args, **kwargs) -> AIMessage:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return self._respond(messages)
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        self.calls += 1
+        prompt_tokens = sum(len(str(message.content)) for message in messages) // 4
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            return self._reply(f"Here is what I found: {str(last.content)[:80]}", prompt_tokens)
+
+        planned = self.script.get(last.content) if isinstance(last, HumanMessage) else None
+        if planned is None:
+            return self._reply("I can help you swap or send tokens on Base.", prompt_tokens)
+
+        call = {"name": planned["name"], "args": dict(planned["args"]), "id": f"call_{uuid.uuid4().hex[:12]}", "type": "tool_call"}
+        return AIMessage(content="", tool_calls=[call], usage_metadata=_usage(prompt_tokens, 12))
+
+    @staticmethod
+    def _reply(text: str, prompt_tokens: int) -> AIMessage:
+        return AIMessage(content=text, usage_metadata=_usage(prompt_tokens, len(text) // 4))
+
+
+def _usage(input_tokens: int, output_tokens: int) -> Dict[str, int]:
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+
+def stub_price_clients(latency_seconds: float = 0.0):
+    """A sync/async ``PriceClient`` pair backed only by fixed prices, with no rate limit."""
+    provider = StubPriceProvider(BENCH_PRICES, name="bench", latency_seconds=latency_seconds)
+    sources = PriceSourceChain([provider], rate_per_second=1e9, burst=1e9)
+    client = PriceClient(sources=sources)
+    async_client = AsyncPriceClient(cache=client.cache, snapshot=client.snapshot, sources=sources)
+    return client, async_client, provider
@@ -0,0 +1,293 @@
+"""Offline load test of the /chat app.
+
+Drives the FastAPI app in-process (no sockets) with the scripted chat model and stub
+price sources, replays the scenarios at the given concurrency and reports throughput,
+latency percentiles, per-node time and memory growth per conversation.
+
+    cd agent
+    python -m bench.run --conversations 400 --concurrency 16
+    python -m bench.run --save bench/baselines/default.json       # refresh the baseline
+    python -m bench.run --compare bench/baselines/default.json    # exit 1 on regression
+
+Absolute numbers depend on the machine; compare baselines taken on the same one.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import math
+import platform
+import sys
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+import graph.nodes as nodes
+import tools.get_swap_quote as get_swap_quote_module
+import tools.propose_swap as propose_swap_module
+from app import main
+from app.metrics import LLM_SECONDS, NODE_SECONDS
+from bench.fakes import ScriptedChatModel, stub_price_clients
+from bench.scenarios import SCENARIOS, Scenario, build_script
+from graph.model_router import ModelRouter
+from tools import tools
+
+# Metric -> True when higher is better. p99 is reported but too noisy at these sample sizes to gate on.
+COMPARED = {
+    ("latency_ms", "p50"): False,
+    ("latency_ms", "p95"): False,
+    ("throughput_turns_per_second",): True,
+    ("memory", "python_heap_bytes_per_conversation"): False,
+}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _summary(latencies_ms: List[float]) -> Dict[str, float]:
+    return {
+        "p50": round(percentile(latencies_ms, 0.50), 3),
+        "p95": round(percentile(latencies_ms, 0.95), 3),
+        "p99": round(percentile(latencies_ms, 0.99), 3),
+        "max": round(max(latencies_ms, default=0.0), 3),
+        "mean": round(sum(latencies_ms) / len(latencies_ms), 3) if latencies_ms else 0.0,
+    }
+
+
+@contextmanager
+def offline_app(llm_latency_seconds: float = 0.0, price_latency_seconds: float = 0.0, llm_cache: bool = False) -> Iterator[ScriptedChatModel]:
+    """Swaps Gemini and the price sources for offline fakes for the duration of the block."""
+    model = ScriptedChatModel(build_script(), latency_seconds=llm_latency_seconds)
+    client, async_client, _ = stub_price_clients(price_latency_seconds)
+    patches = [
+        # Every profile is served by the scripted model, so routing still runs as in production
+        (nodes, "model_router", ModelRouter(lambda profile: model, tools)),
+        (get_swap_quote_module, "price_client", client),
+        (get_swap_quote_module, "async_price_client", async_client),
+        (propose_swap_module, "price_client", client),
+        (propose_swap_module, "async_price_client", async_client),
+    ]
+    if not llm_cache:
+        patches.append((nodes, "response_cache", None))
+
+    originals = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    for module, name, value in patches:
+        setattr(module, name, value)
+    try:
+        yield model
+    finally:
+        for module, name, value in originals:
+            setattr(module, name, value)
+
+
+async def _conversation(http: httpx.AsyncClient, scenario: Scenario, conversation_id: str) -> Tuple[List[float], int]:
+    latencies_ms, errors = [], 0
+    for turn in scenario.turns:
+        started = time.perf_counter()
+        response = await http.post("/chat", json={"message": turn.message, "conversation_id": conversation_id})
+        latencies_ms.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            errors += 1
+    return latencies_ms, errors
+
+
+async def _replay(http: httpx.AsyncClient, conversations: int, concurrency: int, scenarios: List[Scenario]) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    run_id = uuid.uuid4().hex[:8]
+    by_scenario: Dict[str, List[float]] = {scenario.name: [] for scenario in scenarios}
+    errors = 0
+
+    async def one(index: int) -> None:
+        nonlocal errors
+        scenario = scenarios[index % len(scenarios)]
+        async with semaphore:
+            latencies, failed = await _conversation(http, scenario, f"bench-{run_id}-{index}")
+        by_scenario[scenario.name].extend(latencies)
+        errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(conversations)))
+    elapsed = time.perf_counter() - started
+    return {"elapsed": elapsed, "by_scenario": by_scenario, "errors": errors}
+
+
+def _node_deltas(before: Dict, after: Dict) -> Dict[str, Dict[str, float]]:
+    deltas = {}
+    for key, (count, total) in after.items():
+        prior_count, prior_total = before.get(key, (0, 0.0))
+        if count > prior_count:
+            runs, seconds = count - prior_count, total - prior_total
+            deltas[key[0]] = {"count": runs, "mean_ms": round(seconds / runs * 1000, 3), "total_ms": round(seconds * 1000, 3)}
+    return deltas
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+async def _measure_memory(http: httpx.AsyncClient, conversations: int, concurrency: int, scenarios: List[Scenario]) -> Dict[str, Any]:
+    """Heap and RSS growth over a separate pass, so tracemalloc does not skew the timings."""
+    gc.collect()
+    rss_before = _rss_bytes()
+    tracemalloc.start()
+    heap_before, _ = tracemalloc.get_traced_memory()
+    await _replay(http, conversations, concurrency, scenarios)
+    gc.collect()
+    heap_after, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = _rss_bytes()
+
+    memory = {
+        "conversations": conversations,
+        "python_heap_bytes_per_conversation": round((heap_after - heap_before) / conversations),
+        "python_heap_peak_bytes": heap_peak,
+    }
+    if rss_before is not None:
+        # Includes native allocations (e.g. the SQLite checkpointer), but is noisier
+        memory["rss_bytes_per_conversation"] = round((rss_after - rss_before) / conversations)
+    return memory
+
+
+async def run_benchmark(
+    conversations: int = 200,
+    concurrency: int = 16,
+    llm_latency_ms: float = 0.0,
+    price_latency_ms: float = 0.0,
+    memory_conversations: int = 50,
+    llm_cache: bool = False,
+    scenarios: List[Scenario] = SCENARIOS,
+) -> Dict[str, Any]:
+    with offline_app(llm_latency_ms / 1000, price_latency_ms / 1000, llm_cache) as model:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            # Warm imports, caches and connection setup outside the measured pass
+            await _replay(http, len(scenarios), concurrency, scenarios)
+
+            nodes_before, profiles_before, calls_before = NODE_SECONDS.totals(), LLM_SECONDS.totals(), model.calls
+            replay = await _replay(http, conversations, concurrency, scenarios)
+            node_times = _node_deltas(nodes_before, NODE_SECONDS.totals())
+            # Keyed by (profile, outcome); the scripted model never fails, so the profile is enough
+            llm_profiles = {profile: stats["count"] for profile, stats in _node_deltas(profiles_before, LLM_SECONDS.totals()).items()}
+            llm_calls = model.calls - calls_before
+
+            memory = await _measure_memory(http, memory_conversations, concurrency, scenarios) if memory_conversations else {}
+
+    latencies = [latency for values in replay["by_scenario"].values() for latency in values]
+    return {
+        "config": {
+            "conversations": conversations,
+            "concurrency": concurrency,
+            "llm_latency_ms": llm_latency_ms,
+            "price_latency_ms": price_latency_ms,
+            "llm_cache": llm_cache,
+            "python": platform.python_version(),
+        },
+        "turns": len(latencies),
+        "errors": replay["errors"],
+        "llm_calls": llm_calls,
+        "llm_profiles": llm_profiles,
+        "elapsed_seconds": round(replay["elapsed"], 3),
+        "throughput_turns_per_second": round(len(latencies) / replay["elapsed"], 2) if replay["elapsed"] else 0.0,
+        "latency_ms": _summary(latencies),
+        "scenarios": {name: _summary(values) for name, values in replay["by_scenario"].items()},
+        "nodes": node_times,
+        "memory": memory,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Metrics that got worse than the baseline by more than ``tolerance`` (a fraction)."""
+    regressions = []
+    for path, higher_is_better in COMPARED.items():
+        current, previous = report, baseline
+        for key in path:
+            current = (current or {}).get(key)
+            previous = (previous or {}).get(key)
+        if not current or not previous:
+            continue
+        change = (current - previous) / previous
+        worse = -change if higher_is_better else change
+        if worse > tolerance:
+            regressions.append(f"{'.'.join(path)}: {previous} -> {current} ({change:+.0%})")
+    return regressions
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    latency = report["latency_ms"]
+    print(f"{report['turns']} turns in {report['elapsed_seconds']}s "
+          f"({report['throughput_turns_per_second']} turns/s, {report['errors']} errors, {report['llm_calls']} LLM calls)")
+    if report.get("llm_profiles"):
+        print("LLM calls by profile: " + ", ".join(f"{name} {count}" for name, count in sorted(report["llm_profiles"].items())))
+    print(f"latency ms: p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}")
+    for name, summary in report["scenarios"].items():
+        print(f"  {name:<16} p50 {summary['p50']:>9}  p95 {summary['p95']:>9}")
+    print("node time:")
+    for name, stats in sorted(report["nodes"].items(), key=lambda item: -item[1]["total_ms"]):
+        print(f"  {name:<26} {stats['count']:>6} runs  mean {stats['mean_ms']:>8} ms  total {stats['total_ms']:>10} ms")
+    if report["memory"]:
+        memory = report["memory"]
+        line = f"memory: {memory['python_heap_bytes_per_conversation']} B heap/conversation"
+        if "rss_bytes_per_conversation" in memory:
+            line += f", {memory['rss_bytes_per_conversation']} B RSS/conversation"
+        print(line)
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated model latency per call")
+    parser.add_argument("--price-latency-ms", type=float, default=0.0, help="Simulated price source latency per request")
+    parser.add_argument("--memory-conversations", type=int, default=50, help="Conversations in the memory pass (0 to skip)")
+    parser.add_argument("--llm-cache", action="store_true", help="Keep the LLM response cache on")
+    parser.add_argument("--save", help="Write the report as JSON to this path")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression before failing (fraction)")
+    args = parser.parse_args(argv)
+    # Per-turn INFO logs would dominate the measurement
+    logging.getLogger().setLevel(logging.WARNING)
+
+    report = asyncio.run(run_benchmark(
+        conversations=args.conversations,
+        concurrency=args.concurrency,
+        llm_latency_ms=args.llm_latency_ms,
+        price_latency_ms=args.price_latency_ms,
+        memory_conversations=args.memory_conversations,
+        llm_cache=args.llm_cache,
+    ))
+    _print_report(report)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"saved {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("REGRESSIONS:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"no regressions beyond {args.tolerance:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,47 @@
+"""Scripted conversations replayed by the benchmark.
+
+Each turn is the user's message and the tool call the scripted model makes for it
+(``None`` for a plain reply). Turns the fast path recognizes never reach the model,
+exactly as in production.
+"""
+from typing import Any, Dict, List, NamedTuple, Optional
+
+RECIPIENT = "0x1111111111111111111111111111111111111111"
+TX_HASH = "0x" + "ab" * 32
+
+
+class Turn(NamedTuple):
+    message: str
+    tool_call: Optional[Dict[str, Any]] = None
+
+
+class Scenario(NamedTuple):
+    name: str
+    turns: List[Turn]
+
+
+def _call(name: str, **args: Any) -> Dict[str, Any]:
+    return {"name": name, "args": args}
+
+
+SCENARIOS = [
+    Scenario("quote_then_swap", [
+        Turn("How much USDC would I get for 0.5 ETH?", _call("get_swap_quote_tool", from_token="ETH", to_token="USDC", amount=0.5)),
+        Turn("Looks good, do the swap", _call("propose_swap_tool", from_token="ETH", to_token="USDC", amount="0.5", slippage="1.0")),
+    ]),
+    Scenario("send", [
+        Turn(f"Please send 25 USDC to my friend at {RECIPIENT}", _call("propose_send_tool", token="USDC", recipient_address=RECIPIENT, amount="25")),
+    ]),
+    Scenario("status_report", [
+        Turn(f"Transaction {TX_HASH} completed with status failure: user rejected"),
+    ]),
+    Scenario("off_topic", [
+        Turn("Hi! What can you do?"),
+        Turn("Tell me something about Base"),
+    ]),
+]
+
+
+def build_script(scenarios: List[Scenario] = SCENARIOS) -> Dict[str, Optional[Dict[str, Any]]]:
+    """User message -> planned tool call, for ``ScriptedChatModel``."""
+    return {turn.message: turn.tool_call for scenario in scenarios for turn in scenario.turns}
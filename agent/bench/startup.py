@@ -0,0 +1,114 @@
+"""Cold-start profile of the API process.
+
+Imports the module in a fresh interpreter with ``-X importtime`` and prints the import
+cost per module and per top-level package. With ``--warm-up`` it also times the graph
+and model client construction that the server does in the background before /ready
+answers 200.
+
+    cd agent
+    python -m bench.startup                      # import cost of app.main
+    python -m bench.startup --budget-ms 1000     # exit 1 when the import is over budget
+    python -m bench.startup --warm-up --top 40
+
+Run it on the deployment image; times vary with disk cache and CPU.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+
+AGENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_WARM_UP = """
+import json, time
+started = time.perf_counter()
+import app.main as main
+imported = time.perf_counter()
+main._warm_up()
+print(json.dumps({"import_ms": (imported - started) * 1000, "warm_up_ms": (time.perf_counter() - imported) * 1000}))
+"""
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ImportTime]:
+    """Rows of ``python -X importtime`` output, in the order they were printed."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append(ImportTime(name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def by_package(rows: List[ImportTime]) -> Dict[str, int]:
+    """Self time summed per top-level package, in microseconds."""
+    totals: Dict[str, int] = defaultdict(int)
+    for row in rows:
+        totals[row.module.split(".")[0]] += row.self_us
+    return dict(totals)
+
+
+def profile_import(module: str) -> List[ImportTime]:
+    env = {**os.environ, "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "startup-profile")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=AGENT_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def profile_warm_up() -> Dict[str, float]:
+    env = {**os.environ, "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "startup-profile")}
+    result = subprocess.run([sys.executable, "-c", _WARM_UP], cwd=AGENT_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"warm-up failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main", help="Module to import")
+    parser.add_argument("--top", type=int, default=25, help="Modules to list by cumulative time")
+    parser.add_argument("--budget-ms", type=float, help="Fail when importing the module takes longer")
+    parser.add_argument("--warm-up", action="store_true", help="Also time the background warm-up")
+    args = parser.parse_args(argv)
+
+    rows = profile_import(args.module)
+    target = next((row for row in rows if row.module == args.module), None)
+    total_ms = target.cumulative_us / 1000 if target else 0.0
+
+    print(f"import {args.module}: {total_ms:.1f} ms")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for row in sorted(rows, key=lambda row: -row.cumulative_us)[:args.top]:
+        print(f"{row.cumulative_us / 1000:>14.1f} {row.self_us / 1000:>9.1f}  {'  ' * row.depth}{row.module}")
+    print("self time by package:")
+    for package, self_us in sorted(by_package(rows).items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{self_us / 1000:>14.1f} ms  {package}")
+
+    if args.warm_up:
+        timings = profile_warm_up()
+        print(f"warm-up (graph compile + model client): {timings['warm_up_ms']:.1f} ms")
+
+    if args.budget_ms is not None:
+        if total_ms > args.budget_ms:
+            print(f"OVER BUDGET: {total_ms:.1f} ms > {args.budget_ms:.0f} ms")
+            return 1
+        print(f"within the {args.budget_ms:.0f} ms budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Ensure the app module can be found wherever pytest is started from
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
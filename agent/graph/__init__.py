@@ -1,3 +1,15 @@
-from .workflow import app
+"""The agent graph.
+
+``graph.app`` (the compiled workflow) is built on first access: compiling it imports
+LangGraph and the Gemini client, which would otherwise slow every import of a
+``graph`` submodule.
+"""
 
 __all__ = ["app"]
+
+
+def __getattr__(name):
+    if name == "app":
+        from .workflow import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,417 @@
+"""Bounded conversation checkpointers.
+
+LangGraph's ``MemorySaver`` keeps every checkpoint of every thread forever. The
+``SQLCheckpointSaver`` here stores each checkpoint as one self-contained row, keeps
+only the newest ``max_per_thread`` checkpoints of a thread and drops threads that
+have been idle for longer than ``ttl_seconds``. The same code runs on SQLite (in
+memory or on disk) and, experimentally, on Postgres, selected by ``CHECKPOINT_BACKEND``.
+"""
+import asyncio
+import sqlite3
+from contextlib import contextmanager
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Sequence, Tuple
+import logging
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from app.config import (
+    CHECKPOINT_BACKEND,
+    CHECKPOINT_SQLITE_PATH,
+    CHECKPOINT_POSTGRES_URL,
+    CHECKPOINT_MAX_PER_THREAD,
+    CHECKPOINT_THREAD_TTL_SECONDS,
+    CHECKPOINT_SWEEP_INTERVAL_SECONDS,
+)
+from app.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = {
+    "sqlite": [
+        """CREATE TABLE IF NOT EXISTS checkpoints (
+            thread_id TEXT NOT NULL,
+            checkpoint_ns TEXT NOT NULL DEFAULT '',
+            checkpoint_id TEXT NOT NULL,
+            parent_checkpoint_id TEXT,
+            checkpoint_type TEXT NOT NULL,
+            checkpoint BLOB NOT NULL,
+            metadata_type TEXT NOT NULL,
+            metadata BLOB NOT NULL,
+            PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+        )""",
+        """CREATE TABLE IF NOT EXISTS writes (
+            thread_id TEXT NOT NULL,
+            checkpoint_ns TEXT NOT NULL DEFAULT '',
+            checkpoint_id TEXT NOT NULL,
+            task_id TEXT NOT NULL,
+            idx INTEGER NOT NULL,
+            channel TEXT NOT NULL,
+            value_type TEXT NOT NULL,
+            value BLOB NOT NULL,
+            task_path TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+        )""",
+        """CREATE TABLE IF NOT EXISTS threads (
+            thread_id TEXT PRIMARY KEY,
+            last_seen REAL NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS threads_last_seen ON threads (last_seen)",
+    ],
+}
+_SCHEMA["postgres"] = [stmt.replace("BLOB", "BYTEA").replace("REAL", "DOUBLE PRECISION") for stmt in _SCHEMA["sqlite"]]
+
+_PLACEHOLDER = {"sqlite": "?", "postgres": "%s"}
+
+
+class SQLCheckpointSaver(BaseCheckpointSaver):
+    """A LangGraph checkpointer over a DB-API connection with per-thread and idle-TTL bounds.
+
+    Args:
+        connect: Zero-argument callable returning a DB-API connection.
+        dialect: ``"sqlite"`` or ``"postgres"``.
+        max_per_thread: Checkpoints kept per thread and namespace; older ones are pruned on write.
+        ttl_seconds: Threads with no writes for this long are deleted by the periodic sweep.
+        sweep_interval_seconds: Minimum time between idle-thread sweeps, which run on reads as
+            well as writes so idle threads go even when nothing new is saved.
+        offload_async: Run the async methods in a worker thread (for files and network databases,
+            whose commits would otherwise block the event loop).
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        dialect: str = "sqlite",
+        max_per_thread: int = 5,
+        ttl_seconds: float = 86400,
+        sweep_interval_seconds: float = 300,
+        offload_async: bool = False,
+        clock: Callable[[], float] = time.time,
+    ):
+        super().__init__()
+        if dialect not in _SCHEMA:
+            raise ValueError(f"Unsupported checkpoint dialect: {dialect}")
+        self.dialect = dialect
+        self.max_per_thread = max(1, max_per_thread)
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.offload_async = offload_async
+        self._clock = clock
+        self._last_sweep = clock()
+        self._lock = threading.Lock()
+        self._conn = connect()
+        with self._transaction():
+            for stmt in _SCHEMA[dialect]:
+                self._execute(stmt)
+
+    @contextmanager
+    def _transaction(self):
+        """One unit of work on the shared connection, under the lock.
+
+        Reads commit too, so no session sits idle in a transaction; any error rolls back,
+        so one failed statement cannot leave Postgres refusing every later call.
+        """
+        with self._lock:
+            try:
+                yield
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._commit()
+
+    # --- DB helpers (caller is inside _transaction) ---
+
+    def _sql(self, query: str) -> str:
+        return query.replace("?", _PLACEHOLDER[self.dialect])
+
+    def _execute(self, query: str, params: Sequence[Any] = ()):
+        cur = self._conn.cursor()
+        cur.execute(self._sql(query), params)
+        return cur
+
+    def _commit(self) -> None:
+        self._conn.commit()
+
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str):
+        rows = self._execute(
+            "SELECT task_id, channel, value_type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return [(task_id, channel, self.serde.loads_typed((value_type, bytes(value)))) for task_id, channel, value_type, value in rows]
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, row: Tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata = row
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint=self.serde.loads_typed((checkpoint_type, bytes(checkpoint))),
+            metadata=self.serde.loads_typed((metadata_type, bytes(metadata))),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_checkpoint_id}}
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=self._load_writes(thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    def _prune_thread(self, thread_id: str, checkpoint_ns: str) -> None:
+        rows = self._execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC",
+            (thread_id, checkpoint_ns),
+        ).fetchall()
+        if len(rows) <= self.max_per_thread:
+            return
+        oldest_kept = rows[self.max_per_thread - 1][0]
+        for table in ("checkpoints", "writes"):
+            self._execute(
+                f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                (thread_id, checkpoint_ns, oldest_kept),
+            )
+
+    def _delete_threads(self, thread_ids: Sequence[str]) -> None:
+        for thread_id in thread_ids:
+            for table in ("checkpoints", "writes", "threads"):
+                self._execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now - self._last_sweep < self.sweep_interval_seconds:
+            return
+        self._last_sweep = now
+        expired = [row[0] for row in self._execute(
+            "SELECT thread_id FROM threads WHERE last_seen < ?", (now - self.ttl_seconds,)
+        ).fetchall()]
+        if expired:
+            self._delete_threads(expired)
+            logger.info(f"Evicted {len(expired)} idle conversation threads")
+
+    # --- BaseCheckpointSaver API ---
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata"
+        with self._transaction():
+            self._maybe_sweep(self._clock())
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            return self._to_tuple(thread_id, checkpoint_ns, row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint, "
+            "metadata_type, metadata FROM checkpoints"
+        )
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._transaction():
+            self._maybe_sweep(self._clock())
+            rows = self._execute(query, params).fetchall()
+            results = []
+            for thread_id, checkpoint_ns, *row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                item = self._to_tuple(thread_id, checkpoint_ns, tuple(row))
+                if filter and not all(item.metadata.get(key) == value for key, value in filter.items()):
+                    continue
+                results.append(item)
+        yield from results
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_type, checkpoint_blob = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        now = self._clock()
+
+        with self._transaction():
+            self._execute(
+                "INSERT INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+                "checkpoint_type, checkpoint, metadata_type, metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (thread_id, checkpoint_ns, checkpoint_id) DO UPDATE SET "
+                "checkpoint_type = excluded.checkpoint_type, checkpoint = excluded.checkpoint, "
+                "metadata_type = excluded.metadata_type, metadata = excluded.metadata",
+                (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                 checkpoint_type, checkpoint_blob, metadata_type, metadata_blob),
+            )
+            self._execute(
+                "INSERT INTO threads (thread_id, last_seen) VALUES (?, ?) "
+                "ON CONFLICT (thread_id) DO UPDATE SET last_seen = excluded.last_seen",
+                (thread_id, now),
+            )
+            self._prune_thread(thread_id, checkpoint_ns)
+            self._maybe_sweep(now)
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # Special channels (errors, interrupts...) overwrite; regular writes are kept once
+        conflict = "DO UPDATE SET channel = excluded.channel, value_type = excluded.value_type, value = excluded.value"
+
+        with self._transaction():
+            for idx, (channel, value) in enumerate(writes):
+                write_idx = WRITES_IDX_MAP.get(channel, idx)
+                value_type, value_blob = self.serde.dumps_typed(value)
+                self._execute(
+                    "INSERT INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, "
+                    "value_type, value, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    f"ON CONFLICT (thread_id, checkpoint_ns, checkpoint_id, task_id, idx) "
+                    f"{conflict if write_idx < 0 else 'DO NOTHING'}",
+                    (thread_id, checkpoint_ns, checkpoint_id, task_id, write_idx, channel, value_type, value_blob, task_path),
+                )
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._transaction():
+            self._delete_threads([thread_id])
+
+    def thread_count(self) -> int:
+        with self._transaction():
+            self._maybe_sweep(self._clock())
+            return self._execute("SELECT COUNT(*) FROM threads").fetchone()[0]
+
+    # --- Async API ---
+
+    async def _run(self, fn, *args, **kwargs):
+        with tracer.span(f"checkpoint {fn.__name__}"):
+            if self.offload_async:
+                return await asyncio.to_thread(fn, *args, **kwargs)
+            return fn(*args, **kwargs)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await self._run(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        def list_checkpoints():
+            return list(self.list(config, filter=filter, before=before, limit=limit))
+
+        items = await self._run(list_checkpoints)
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await self._run(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return await self._run(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await self._run(self.delete_thread, thread_id)
+
+
+def build_checkpointer(backend: str = CHECKPOINT_BACKEND) -> BaseCheckpointSaver:
+    """Creates the checkpointer selected by ``CHECKPOINT_BACKEND``.
+
+    - ``memory``: bounded SQLite database in process memory (default, lost on restart)
+    - ``sqlite``: SQLite file at ``CHECKPOINT_SQLITE_PATH``, survives restarts
+    - ``postgres``: shared Postgres at ``CHECKPOINT_POSTGRES_URL`` for multiple replicas (needs
+      ``psycopg``, pinned in ``requirements-postgres.txt``). Experimental: covered by an
+      integration test that runs only when ``CHECKPOINT_POSTGRES_URL`` is set.
+    """
+    bounds = dict(
+        max_per_thread=CHECKPOINT_MAX_PER_THREAD,
+        ttl_seconds=CHECKPOINT_THREAD_TTL_SECONDS,
+        sweep_interval_seconds=CHECKPOINT_SWEEP_INTERVAL_SECONDS,
+    )
+    backend = backend.lower()
+
+    if backend in ("memory", "sqlite"):
+        path = ":memory:" if backend == "memory" else CHECKPOINT_SQLITE_PATH
+        logger.info(f"Using SQLite checkpointer ({path})")
+        return SQLCheckpointSaver(
+            lambda: sqlite3.connect(path, check_same_thread=False),
+            dialect="sqlite",
+            # Every file commit fsyncs; keep that off the event loop
+            offload_async=backend == "sqlite",
+            **bounds,
+        )
+
+    if backend == "postgres":
+        if not CHECKPOINT_POSTGRES_URL:
+            raise ValueError("CHECKPOINT_POSTGRES_URL must be set for the postgres checkpoint backend")
+        try:
+            import psycopg
+        except ImportError as e:
+            raise ImportError("The postgres checkpoint backend requires `pip install -r requirements-postgres.txt`") from e
+        logger.warning("Using the experimental Postgres checkpointer")
+        return SQLCheckpointSaver(
+            lambda: psycopg.connect(CHECKPOINT_POSTGRES_URL),
+            dialect="postgres",
+            offload_async=True,
+            **bounds,
+        )
+
+    raise ValueError(f"Unknown CHECKPOINT_BACKEND: {backend}")
@@ -0,0 +1,88 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, RemoveMessage
+from app.config import MAX_CONTEXT, CONTEXT_SUMMARY_ENABLED, CONTEXT_SUMMARY_MAX_CHARS
+
+# Per-line cap when folding a message into the rolling summary
+_SUMMARY_LINE_CHARS = 200
+
+
+class ContextWindow:
+    """Selects the messages sent to the LLM each turn.
+
+    The window holds at most ``max_messages`` and always starts at a user turn, so a
+    ``ToolMessage`` is never separated from the AI message that requested it. Only the
+    tail of the history is touched, so the cost per turn does not grow with the session.
+
+    With ``summarize`` enabled, messages that fall out of the window are folded into a
+    short rolling summary in ``context_memory["summary"]`` and removed from the state,
+    which keeps both the checkpoint and the prompt bounded.
+    """
+
+    def __init__(self, max_messages: int = MAX_CONTEXT, summarize: bool = CONTEXT_SUMMARY_ENABLED, summary_max_chars: int = CONTEXT_SUMMARY_MAX_CHARS):
+        self.max_messages = max_messages
+        self.summarize = summarize
+        self.summary_max_chars = summary_max_chars
+
+    def window_start(self, history: Sequence[BaseMessage]) -> int:
+        """Index of the first message in the window."""
+        n = len(history)
+        start = max(0, n - self.max_messages)
+        for i in range(start, n):
+            if isinstance(history[i], HumanMessage):
+                return i
+        # No user turn in range (e.g. a long tool chain): fall back to the plain tail
+        return start
+
+    def build(self, state: Dict[str, Any]) -> Tuple[List[BaseMessage], Optional[str], Dict[str, Any]]:
+        """Returns the windowed messages, the summary to prepend (if any) and a state update."""
+        history = state["messages"]
+        start = self.window_start(history)
+        window = list(history[start:])
+        memory = dict(state.get("context_memory") or {})
+        summary = memory.get("summary")
+
+        if not self.summarize or start == 0:
+            return window, summary, {}
+
+        dropped = history[:start]
+        summary = self._fold(summary, dropped)
+        memory["summary"] = summary
+        memory["summarized_messages"] = memory.get("summarized_messages", 0) + len(dropped)
+        update = {
+            "messages": [RemoveMessage(id=message.id) for message in dropped if message.id],
+            "context_memory": memory,
+        }
+        return window, summary, update
+
+    def _fold(self, summary: Optional[str], dropped: Sequence[BaseMessage]) -> str:
+        lines = summary.splitlines() if summary else []
+        for message in dropped:
+            line = self._summarize_message(message)
+            if line:
+                lines.append(line)
+
+        # Keep the newest lines within the character budget
+        kept, size = [], 0
+        for line in reversed(lines):
+            size += len(line) + 1
+            if size > self.summary_max_chars:
+                break
+            kept.append(line)
+        return "\n".join(reversed(kept))
+
+    @staticmethod
+    def _summarize_message(message: BaseMessage) -> Optional[str]:
+        if isinstance(message, HumanMessage):
+            text = message.text.strip()
+            return f"User: {text[:_SUMMARY_LINE_CHARS]}" if text else None
+        if isinstance(message, AIMessage):
+            if message.tool_calls:
+                calls = ", ".join(f"{call['name']}({call['args']})" for call in message.tool_calls)
+                return f"Assistant called {calls}"[:_SUMMARY_LINE_CHARS]
+            text = message.text.strip()
+            return f"Assistant: {text[:_SUMMARY_LINE_CHARS]}" if text else None
+        # Tool results are transient (prices, proposals) and are not worth keeping
+        return None
+
+
+context_window = ContextWindow()
@@ -10,6 +10,11 @@ def should_continue(state: AgentState) -> str:
     if not hasattr(last_message, 'tool_calls') or not last_message.tool_calls:
        return "end" 
   
+    # Several calls in one turn (e.g. quotes for two pairs) run together
+    if len(last_message.tool_calls) > 1:
+        logger.info(f"Dispatching {len(last_message.tool_calls)} tool calls")
+        return "dispatch_tools"
+
     tool_name = last_message.tool_calls[0]["name"]
     
     logger.info(f"Routing to tool: {tool_name}")
@@ -24,4 +29,11 @@ def should_continue(state: AgentState) -> str:
       return "return_transaction_status"  
 
     logger.warning(f"Unknown tool call detected: {tool_name}")
-    return "end"
\ No newline at end of file
+    return "end"
+
+def route_intent(state: AgentState) -> str:
+    """After the fast-path parser: go straight to a tool if it produced a call, otherwise ask the LLM."""
+    last_message = state['messages'][-1]
+    if not getattr(last_message, 'tool_calls', None):
+        return "agent"
+    return should_continue(state)
@@ -0,0 +1,93 @@
+"""Rule-based fast path for literal commands.
+
+Messages such as "swap 0.1 ETH for USDC" or "send 5 USDC to 0xabc..." are turned
+straight into tool calls without an LLM round trip. Anything that does not match a
+rule exactly falls through to the agent.
+"""
+import re
+import uuid
+from typing import Any, Dict, Optional
+import logging
+from langchain_core.messages import AIMessage, HumanMessage
+from app.tokens import token_registry
+from graph.state import AgentState
+
+logger = logging.getLogger(__name__)
+
+_AMOUNT = r"(?P<amount>\d+(?:\.\d+)?|\.\d+)"
+_TOKEN = r"\$?(?P<{name}>[a-z]{{2,10}})"
+
+SWAP_RE = re.compile(
+    rf"^(?:please\s+)?(?:swap|convert|trade|exchange)\s+{_AMOUNT}\s*{_TOKEN.format(name='from_token')}"
+    rf"\s+(?:to|for|into)\s+{_TOKEN.format(name='to_token')}\s*[.!]?$",
+    re.IGNORECASE,
+)
+SEND_RE = re.compile(
+    rf"^(?:please\s+)?(?:send|transfer)\s+{_AMOUNT}\s*{_TOKEN.format(name='token')}"
+    r"\s+to\s+(?P<recipient>0x[a-fA-F0-9]{40})\s*[.!]?$",
+    re.IGNORECASE,
+)
+# Frontend feedback, e.g. "Transaction 0xabc... completed with status failure: user rejected"
+STATUS_RE = re.compile(
+    r"^transaction\s+(?P<tx_hash>0x[a-fA-F0-9]{64})\s+completed\s+with\s+status\s+(?P<status>success|failure)"
+    r"(?:\s*[:,\-]\s*(?:error\s*:?\s*)?(?P<error>.+?))?\s*\.?$",
+    re.IGNORECASE,
+)
+
+
+def _known_token(symbol: str) -> Optional[str]:
+    token = token_registry.by_symbol(symbol)
+    return token.symbol if token and token.address else None
+
+
+def _tool_call(name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    return {"name": name, "args": args, "id": f"fastpath_{uuid.uuid4().hex[:12]}", "type": "tool_call"}
+
+
+def parse_intent(text: str) -> Optional[Dict[str, Any]]:
+    """Returns a tool call for an unambiguous command, or ``None`` to defer to the LLM."""
+    text = " ".join(text.split())
+
+    if match := SWAP_RE.match(text):
+        from_token = _known_token(match["from_token"])
+        to_token = _known_token(match["to_token"])
+        amount = float(match["amount"])
+        if from_token and to_token and from_token != to_token and amount > 0:
+            # Same flow the prompt asks of the LLM: quote first, propose after confirmation
+            return _tool_call("get_swap_quote_tool", {"from_token": from_token, "to_token": to_token, "amount": amount})
+        return None
+
+    if match := SEND_RE.match(text):
+        token = _known_token(match["token"])
+        if token and float(match["amount"]) > 0:
+            return _tool_call("propose_send_tool", {"token": token, "recipient_address": match["recipient"], "amount": match["amount"]})
+        return None
+
+    if match := STATUS_RE.match(text):
+        status = match["status"].lower()
+        if status == "failure" and not match["error"]:
+            return None
+        args = {"tx_hash": match["tx_hash"], "status": status}
+        if match["error"]:
+            args["error"] = match["error"]
+        return _tool_call("report_transaction_status_tool", args)
+
+    return None
+
+
+async def intent_parser_node(state: AgentState) -> AgentState:
+    """Fast path: emits a tool call for literal commands, otherwise leaves the state untouched.
+
+    Async although it never awaits: LangGraph runs sync nodes on a worker thread, which
+    costs more than the parsing itself.
+    """
+    last_message = state["messages"][-1]
+    if not isinstance(last_message, HumanMessage):
+        return {}
+
+    tool_call = parse_intent(last_message.text)
+    if tool_call is None:
+        return {}
+
+    logger.info(f"Fast path: {tool_call['name']} {tool_call['args']}")
+    return {"messages": [AIMessage(content="", tool_calls=[tool_call])]}
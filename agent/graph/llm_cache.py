@@ -0,0 +1,114 @@
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from app.config import (
+    GEMINI_MODEL,
+    TEMPERATURE,
+    MAX_OUTPUT_TOKENS,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_MAX_ENTRIES,
+)
+
+# Tool calls whose results depend on live prices must always come from a fresh LLM turn
+PRICE_DEPENDENT_TOOLS = frozenset({"get_swap_quote_tool", "propose_swap_tool"})
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s.]")
+
+
+def normalize_text(text: str) -> str:
+    """Case, whitespace and punctuation-insensitive form used for matching ("Hi!" == "hi")."""
+    text = _PUNCTUATION_RE.sub(" ", text.lower())
+    return " ".join(text.split()).strip(" .")
+
+
+class ResponseCache:
+    """Exact-match TTL + LRU cache of LLM replies keyed on the normalized prompt.
+
+    Only conversations made of plain user/assistant text are cached, so nothing that
+    saw a tool result is reused, and replies calling price-dependent tools are never stored.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        model_config: Optional[Dict] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.model_config = model_config or {"model": GEMINI_MODEL, "temperature": TEMPERATURE, "max_output_tokens": MAX_OUTPUT_TOKENS}
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    def key(self, messages: Sequence[BaseMessage], model_config: Optional[Dict] = None) -> Optional[str]:
+        """Returns the cache key, or ``None`` if this prompt must not be cached."""
+        parts = []
+        for message in messages:
+            if isinstance(message, SystemMessage):
+                parts.append(("system", hashlib.sha256(message.text.encode()).hexdigest()))
+            elif isinstance(message, HumanMessage):
+                parts.append(("user", normalize_text(message.text)))
+            elif isinstance(message, AIMessage) and not message.tool_calls:
+                parts.append(("ai", normalize_text(message.text)))
+            else:
+                # Tool calls/results carry live data
+                return None
+        payload = json.dumps([model_config or self.model_config, parts], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def cacheable(response: AIMessage) -> bool:
+        return not any(call["name"] in PRICE_DEPENDENT_TOOLS for call in response.tool_calls)
+
+    def get(self, key: Optional[str]) -> Optional[AIMessage]:
+        with self._lock:
+            if key is None:
+                self.skipped += 1
+                return None
+            entry = self._entries.get(key)
+            if entry is None or self._clock() - entry[0] >= self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            response = entry[1]
+
+        # Fresh ids so the reply does not overwrite its earlier copy in the state
+        tool_calls = [{**call, "id": f"cached_{uuid.uuid4().hex[:12]}"} for call in response.tool_calls]
+        return response.model_copy(update={"id": None, "tool_calls": tool_calls})
+
+    def put(self, key: Optional[str], response: AIMessage) -> None:
+        if key is None or not self.cacheable(response):
+            return
+        with self._lock:
+            self._entries[key] = (self._clock(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "skipped": self.skipped,
+                "size": len(self._entries),
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+response_cache = ResponseCache() if LLM_CACHE_ENABLED else None
@@ -0,0 +1,146 @@
+"""Per-turn model selection for the agent node.
+
+Each turn is served by one of three profiles (model, temperature, output budget):
+
+- ``summary``: the last message is a tool result the model only has to put into words
+- ``off_topic``: the user's message shows no sign of a swap, send or crypto question
+- ``intent``: everything else, i.e. turns that may have to pick a tool and its arguments
+
+Every profile keeps the tools bound, so a misrouted turn only changes the model, never
+what it can do. Clients are built once and shared by profiles with the same settings.
+"""
+import re
+import threading
+from typing import Any, Callable, Dict, NamedTuple, Sequence, Tuple
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage
+from app.config import (
+    MODEL_ROUTING_ENABLED,
+    MODEL_INTENT,
+    MODEL_INTENT_TEMPERATURE,
+    MODEL_INTENT_MAX_OUTPUT_TOKENS,
+    MODEL_SUMMARY,
+    MODEL_SUMMARY_TEMPERATURE,
+    MODEL_SUMMARY_MAX_OUTPUT_TOKENS,
+    MODEL_OFF_TOPIC,
+    MODEL_OFF_TOPIC_TEMPERATURE,
+    MODEL_OFF_TOPIC_MAX_OUTPUT_TOKENS,
+    MODEL_PRICES,
+)
+from app.metrics import LLM_COST, LLM_SECONDS, LLM_TOKENS
+from app.tokens import token_registry
+
+
+class ModelProfile(NamedTuple):
+    name: str
+    model: str
+    temperature: float
+    max_output_tokens: int
+
+    def config(self) -> Dict[str, Any]:
+        """Generation settings; also what the LLM response cache keys on."""
+        return {"model": self.model, "temperature": self.temperature, "max_output_tokens": self.max_output_tokens}
+
+
+PROFILES = {
+    "intent": ModelProfile("intent", MODEL_INTENT, MODEL_INTENT_TEMPERATURE, MODEL_INTENT_MAX_OUTPUT_TOKENS),
+    "summary": ModelProfile("summary", MODEL_SUMMARY, MODEL_SUMMARY_TEMPERATURE, MODEL_SUMMARY_MAX_OUTPUT_TOKENS),
+    "off_topic": ModelProfile("off_topic", MODEL_OFF_TOPIC, MODEL_OFF_TOPIC_TEMPERATURE, MODEL_OFF_TOPIC_MAX_OUTPUT_TOKENS),
+}
+
+# Any of these (or a token symbol, an amount, an address) keeps a message on the intent profile
+DOMAIN_WORDS = frozenset("""
+    swap send transfer trade exchange convert buy sell bridge quote price prices rate worth cost
+    token tokens coin coins crypto cryptocurrency blockchain chain base network wallet address
+    recipient slippage gas fee fees transaction tx hash approve approval sign confirm confirmed
+    proceed yes yeah yep ok okay sure cancel amount balance liquidity pool uniswap dex defi
+    stablecoin nft ethereum ether bitcoin btc solana sol polygon matic avax contract
+""".split())
+
+_WORD_RE = re.compile(r"[a-z0-9$.]+")
+_SIGNAL_RE = re.compile(r"\d|0x[a-f0-9]{4,}")
+
+
+def is_off_topic(text: str) -> bool:
+    """True when the message has no amount, address, known token or crypto vocabulary."""
+    text = text.lower()
+    if _SIGNAL_RE.search(text):
+        return False
+    for word in _WORD_RE.findall(text):
+        word = word.strip("$.")
+        if word in DOMAIN_WORDS or token_registry.by_symbol(word) or token_registry.by_alias(word):
+            return False
+    return True
+
+
+def classify_turn(messages: Sequence[BaseMessage]) -> str:
+    last = messages[-1] if messages else None
+    if isinstance(last, ToolMessage):
+        return "summary"
+    if isinstance(last, HumanMessage) and is_off_topic(last.text):
+        return "off_topic"
+    return "intent"
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+class ModelRouter:
+    """Picks the profile for a turn and hands out its (unbound, tool-bound) clients."""
+
+    def __init__(
+        self,
+        build: Callable[[ModelProfile], Any],
+        tools: Sequence,
+        profiles: Dict[str, ModelProfile] = PROFILES,
+        enabled: bool = MODEL_ROUTING_ENABLED,
+    ):
+        self.build = build
+        self.tools = list(tools)
+        self.profiles = profiles
+        self.enabled = enabled
+        self._clients: Dict[Tuple, Tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+
+    def route(self, messages: Sequence[BaseMessage]) -> ModelProfile:
+        return self.profiles[classify_turn(messages) if self.enabled else "intent"]
+
+    def clients(self, profile: ModelProfile) -> Tuple[Any, Any]:
+        key = tuple(sorted(profile.config().items()))
+        with self._lock:
+            if key not in self._clients:
+                base = self.build(profile)
+                self._clients[key] = (base, base.bind_tools(self.tools))
+            return self._clients[key]
+
+    def record(self, profile: ModelProfile, seconds: float, outcome: str, usage: Dict[str, Any]) -> None:
+        LLM_SECONDS.observe(seconds, profile=profile.name, outcome=outcome)
+        for direction in ("input", "output"):
+            if usage.get(f"{direction}_tokens") is not None:
+                LLM_TOKENS.observe(usage[f"{direction}_tokens"], profile=profile.name, direction=direction)
+        cache_read = (usage.get("input_token_details") or {}).get("cache_read")
+        if cache_read:
+            LLM_TOKENS.observe(cache_read, profile=profile.name, direction="cache_read")
+        cost = estimate_cost(profile.model, usage.get("input_tokens") or 0, usage.get("output_tokens") or 0)
+        if cost:
+            LLM_COST.inc(cost, profile=profile.name)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per profile: settings, calls, mean latency, token totals and estimated cost."""
+        seconds, tokens = LLM_SECONDS.totals(), LLM_TOKENS.totals()
+        stats = {"enabled": self.enabled, "profiles": {}}
+        for name, profile in self.profiles.items():
+            calls = {outcome: seconds.get((name, outcome), (0, 0.0)) for outcome in ("ok", "error")}
+            count = sum(runs for runs, _ in calls.values())
+            total = sum(elapsed for _, elapsed in calls.values())
+            stats["profiles"][name] = {
+                **profile.config(),
+                "calls": count,
+                "errors": calls["error"][0],
+                "mean_latency_ms": round(total / count * 1000, 3) if count else 0.0,
+                "input_tokens": int(tokens.get((name, "input"), (0, 0.0))[1]),
+                "output_tokens": int(tokens.get((name, "output"), (0, 0.0))[1]),
+                "cost_usd": round(LLM_COST.value(profile=name), 6),
+            }
+        return stats
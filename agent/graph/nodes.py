@@ -1,65 +1,153 @@
+import asyncio
 import json
 import logging
+import time
 from langchain_core.messages import AIMessage, SystemMessage, ToolMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
-from app.config import GEMINI_MODEL, TEMPERATURE, MAX_OUTPUT_TOKENS, MAX_CONTEXT
+from app.config import TOOL_CONCURRENCY, TOOL_TIMEOUT_SECONDS
 from tools import tools, propose_swap_tool, propose_send_tool, report_transaction_status_tool, get_swap_quote_tool
 from graph.state import AgentState
 from graph.system_prompt import DEFAULT_SYSTEM_PROMPT
+from graph.context import context_window
+from graph.llm_cache import response_cache
+from graph.prompt_cache import prompt_cache
+from graph.model_router import ModelProfile, ModelRouter
+from app.quotes import find_quote
+from app.metrics import ERRORS
+from app.tracing import tracer
+from app.tokens import resolve_tradable_token
+from tools.propose_swap import propose_swap_from_quote
 
 # 1. Setup Logger
 logger = logging.getLogger(__name__)
 
-# LLM Initialization
-llm = ChatGoogleGenerativeAI(
-    model=GEMINI_MODEL,
-    temperature=TEMPERATURE,
-    max_output_tokens=MAX_OUTPUT_TOKENS,
-    convert_system_message_to_human=False
-).bind_tools(tools)
+# LLM Initialization: one client per model profile, built on first use
+def _build_llm(profile: ModelProfile) -> ChatGoogleGenerativeAI:
+    return ChatGoogleGenerativeAI(
+        model=profile.model,
+        temperature=profile.temperature,
+        max_output_tokens=profile.max_output_tokens,
+        convert_system_message_to_human=False
+    )
+
+model_router = ModelRouter(_build_llm, tools)
+
+def _set_token_attributes(span, usage: dict) -> None:
+    for direction in ("input", "output"):
+        if usage.get(f"{direction}_tokens") is not None:
+            span.set_attribute(f"llm.{direction}_tokens", usage[f"{direction}_tokens"])
+    cache_read = (usage.get("input_token_details") or {}).get("cache_read")
+    if cache_read:
+        span.set_attribute("llm.cache_read_tokens", cache_read)
+
+def _tool_span(name: str, args: dict):
+    return tracer.span(f"tool {name}", **{"tool.name": name, "tool.args": args})
+
+async def _ainvoke_tool(tool, args: dict):
+    with _tool_span(tool.name, args):
+        return await tool.ainvoke(args)
+
+async def _generate(profile: ModelProfile, messages, messages_with_system, cache_name):
+    base_llm, llm = model_router.clients(profile)
+    if cache_name:
+        try:
+            # The cache already holds the system prompt and tools; Gemini rejects a request that resends them
+            return await base_llm.ainvoke(messages, cached_content=cache_name)
+        except Exception as e:
+            logger.warning(f"Cached prompt request failed, sending the prompt inline: {e}")
+            prompt_cache.invalidate()
+    return await llm.ainvoke(messages_with_system)
 
-def agent_node(state: AgentState) -> AgentState:
+async def agent_node(state: AgentState) -> AgentState:
     """The Brain: Decides what to do next."""
-    messages = list(state["messages"])[-MAX_CONTEXT:]
-    messages_with_system = [SystemMessage(content=DEFAULT_SYSTEM_PROMPT)] + messages
-    
+    messages, summary, context_update = context_window.build(state)
+    system_prompt = DEFAULT_SYSTEM_PROMPT
+    if summary:
+        system_prompt += f"\nEarlier in this conversation:\n{summary}\n"
+    messages_with_system = [SystemMessage(content=system_prompt)] + messages
+
+    # Removals of messages folded into the summary ride along with the reply
+    removed = context_update.pop("messages", [])
+    profile = model_router.route(messages)
+    cache_key = response_cache.key(messages_with_system, profile.config()) if response_cache else None
+    cached = response_cache.get(cache_key) if response_cache else None
+    if cached is not None:
+        logger.info("LLM cache hit")
+        return {**context_update, "messages": removed + [cached]}
+
+    # The prefix cache is tied to one model, and a rolling summary extends the system prompt
+    cache_name = None if summary or profile.model != prompt_cache.model else await prompt_cache.name()
+    started = time.perf_counter()
     try:
-        response = llm.invoke(messages_with_system)
-        return {"messages": [response]}
+        with tracer.span("llm generate", model=profile.model, profile=profile.name, messages=len(messages_with_system), prompt_cached=bool(cache_name)) as span:
+            # Awaited, so a slow Gemini call holds no worker thread
+            response = await _generate(profile, messages, messages_with_system, cache_name)
+            usage = getattr(response, "usage_metadata", None) or {}
+            _set_token_attributes(span, usage)
+        model_router.record(profile, time.perf_counter() - started, "ok", usage)
+        if response_cache:
+            response_cache.put(cache_key, response)
+        return {**context_update, "messages": removed + [response]}
     except Exception as e:
+        model_router.record(profile, time.perf_counter() - started, "error", {})
+        ERRORS.inc(kind="llm")
         logger.error(f"LLM Error: {e}")
-        return {"messages": [AIMessage(content="I'm having trouble thinking right now. Please try again.")]}
+        return {**context_update, "messages": removed + [AIMessage(content="I'm having trouble thinking right now. Please try again.")]}
 
-def get_swap_quote_node(state: AgentState) -> AgentState:
-    """Executes the quote tool and returns raw data to the LLM."""
+async def get_swap_quote_node(state: AgentState) -> AgentState:
+    """Executes the quote tool and returns raw data to the LLM. Awaits the async price client."""
     last_message = state["messages"][-1]
     tool_call = last_message.tool_calls[0]
     call_id = tool_call["id"] # Critical for linking result to call
 
     logger.info(f"Fetching Quote: {tool_call['args']}")
     
+    result = {}
     try:
-        result = get_swap_quote_tool.invoke(tool_call["args"])
+        result = await _ainvoke_tool(get_swap_quote_tool, tool_call["args"])
         # Convert to JSON string so the LLM can read it
         content = json.dumps(result)
     except Exception as e:
+        ERRORS.inc(kind="tool")
         logger.error(f"Quote Tool Error: {e}")
         content = json.dumps({"error": str(e)})
 
     # Return a ToolMessage. The graph goes back to 'agent' after this.
-    return {
+    update = {
         "messages": [ToolMessage(content=content, tool_call_id=call_id, name="get_swap_quote_tool")]
     }
+    # Remember the quote so a confirmed proposal can reuse it
+    if result.get("quote_id"):
+        update["quotes"] = {result["quote_id"]: result}
+    return update
+
+def _canonical_symbol(text: str) -> str:
+    token = resolve_tradable_token(text)
+    return token.symbol if token else text
 
-def propose_swap_node(state: AgentState) -> AgentState:
+async def _propose_swap(args: dict, quotes: dict) -> dict:
+    """Binds to a fresh quote for the same pair and amount; requotes only if there is none."""
+    # Quotes are stored under canonical symbols, so "usdc.e" finds the USDC quote
+    from_token, to_token = (_canonical_symbol(args.get(key, "")) for key in ("from_token", "to_token"))
+    quote = find_quote(quotes, from_token, to_token, args.get("amount"))
+    with _tool_span(propose_swap_tool.name, args) as span:
+        span.set_attribute("quote.reused", quote is not None)
+        if quote:
+            logger.info(f"Reusing quote {quote['quote_id']}")
+            return propose_swap_from_quote(
+                args["from_token"], args["to_token"], args["amount"], args.get("slippage", "1.0"), quote
+            )
+        return await propose_swap_tool.ainvoke(args)
+
+async def propose_swap_node(state: AgentState) -> AgentState:
     """Executes swap proposal logic."""
     last_message = state["messages"][-1]
     tool_call = last_message.tool_calls[0]
     
     logger.info(f"Proposing Swap: {tool_call['args']}")
     
-    # We still use invoke here to get the dict result
-    result = propose_swap_tool.invoke(tool_call["args"])
+    # Reuses the quote the user agreed to; otherwise ainvoke fetches without blocking a worker thread
+    result = await _propose_swap(tool_call["args"], state.get("quotes"))
     
     if result.get("error"):
         return {
@@ -81,13 +169,13 @@ def propose_swap_node(state: AgentState) -> AgentState:
         "proposed_transaction": result # This updates the state for the API to read
     }
 
-def propose_send_node(state: AgentState) -> AgentState:
+async def propose_send_node(state: AgentState) -> AgentState:
     last_message = state["messages"][-1]
     tool_call = last_message.tool_calls[0]
 
     logger.info(f"Proposing Send: {tool_call['args']}")
 
-    result = propose_send_tool.invoke(tool_call['args'])
+    result = await _ainvoke_tool(propose_send_tool, tool_call['args'])
 
     if result.get("error"):
         return {"messages": [AIMessage(content=result["error"])]}
@@ -99,9 +187,61 @@ def propose_send_node(state: AgentState) -> AgentState:
         "proposed_transaction": result
     }
 
-def report_transaction_status_node(state: AgentState) -> AgentState:
+async def report_transaction_status_node(state: AgentState) -> AgentState:
     last_message = state["messages"][-1]
     tool_call = last_message.tool_calls[0]
     
-    result = report_transaction_status_tool.invoke(tool_call["args"])
-    return {"messages": [AIMessage(content=result)]}
\ No newline at end of file
+    result = await _ainvoke_tool(report_transaction_status_tool, tool_call["args"])
+    return {"messages": [AIMessage(content=result)]}
+
+TOOLS_BY_NAME = {t.name: t for t in tools}
+
+async def _run_tool_call(tool_call: dict, semaphore: asyncio.Semaphore, quotes: dict):
+    """Runs one tool call under the concurrency limit and timeout. Errors become result payloads."""
+    tool = TOOLS_BY_NAME.get(tool_call["name"])
+    if tool is None:
+        return {"error": f"Unknown tool: {tool_call['name']}", "action": "error"}
+
+    if tool is propose_swap_tool:
+        call = _propose_swap(tool_call["args"], quotes)
+    else:
+        call = _ainvoke_tool(tool, tool_call["args"])
+
+    async with semaphore:
+        try:
+            return await asyncio.wait_for(call, timeout=TOOL_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            ERRORS.inc(kind="tool_timeout")
+            logger.error(f"Tool {tool_call['name']} timed out after {TOOL_TIMEOUT_SECONDS}s")
+            return {"error": f"{tool_call['name']} timed out. Please try again.", "action": "error"}
+        except Exception as e:
+            ERRORS.inc(kind="tool")
+            logger.error(f"Tool {tool_call['name']} Error: {e}")
+            return {"error": str(e), "action": "error"}
+
+async def dispatch_tools_node(state: AgentState) -> AgentState:
+    """Executes every tool call of the last AI message concurrently.
+
+    Returns one ToolMessage per call id and goes back to the agent, which summarizes all
+    results in a single reply. A successful swap/send proposal is also put in the state.
+    """
+    last_message = state["messages"][-1]
+    tool_calls = last_message.tool_calls
+    logger.info(f"Dispatching tools: {[call['name'] for call in tool_calls]}")
+
+    semaphore = asyncio.Semaphore(TOOL_CONCURRENCY)
+    results = await asyncio.gather(*(_run_tool_call(call, semaphore, state.get("quotes")) for call in tool_calls))
+
+    update = {
+        "messages": [
+            ToolMessage(content=json.dumps(result), tool_call_id=call["id"], name=call["name"])
+            for call, result in zip(tool_calls, results)
+        ]
+    }
+    proposals = [r for r in results if isinstance(r, dict) and r.get("action") in ("swap", "send") and not r.get("error")]
+    if proposals:
+        update["proposed_transaction"] = proposals[-1]
+    quotes = {r["quote_id"]: r for r in results if isinstance(r, dict) and r.get("quote_id")}
+    if quotes:
+        update["quotes"] = quotes
+    return update
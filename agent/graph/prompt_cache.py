@@ -0,0 +1,129 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Callable, Optional, Sequence
+from app.config import (
+    GEMINI_MODEL,
+    GOOGLE_API_KEY,
+    PROMPT_CACHE_ENABLED,
+    PROMPT_CACHE_TTL_SECONDS,
+    PROMPT_CACHE_MIN_TOKENS,
+    PROMPT_CACHE_RETRY_SECONDS,
+)
+from graph.system_prompt import DEFAULT_SYSTEM_PROMPT
+from tools import tools as agent_tools
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough Gemini token count (about four characters per token); no tokenizer download needed."""
+    return (len(text) + 3) // 4
+
+
+def _tool_declarations(tools: Sequence):
+    from langchain_google_genai._function_utils import convert_to_genai_function_declarations
+    return convert_to_genai_function_declarations(tools)
+
+
+class PromptPrefixCache:
+    """Keeps the static prefix (system prompt + tool schemas) in a Gemini explicit context cache.
+
+    A request that names the cache sends only the conversation, and the cached prefix
+    tokens are billed at the reduced cached rate. The cache is created lazily, renewed
+    shortly before it expires, and any failure turns the cache off for ``retry_seconds``
+    so callers fall back to sending the prompt inline.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        tools: Sequence,
+        model: str = GEMINI_MODEL,
+        enabled: bool = PROMPT_CACHE_ENABLED,
+        ttl_seconds: int = PROMPT_CACHE_TTL_SECONDS,
+        min_tokens: int = PROMPT_CACHE_MIN_TOKENS,
+        retry_seconds: float = PROMPT_CACHE_RETRY_SECONDS,
+        create: Optional[Callable[[], tuple]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.system_prompt = system_prompt
+        self.tools = list(tools)
+        self.model = model
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self._create = create or self._create_gemini_cache
+        self._clock = clock
+        self._lock = asyncio.Lock()
+        self._name: Optional[str] = None
+        self._expires_at = 0.0
+        self._retry_at = 0.0
+
+        tool_text = "".join(tool.name + (tool.description or "") + json.dumps(tool.args, separators=(",", ":")) for tool in self.tools)
+        self.system_tokens = estimate_tokens(system_prompt)
+        self.prefix_tokens = self.system_tokens + estimate_tokens(tool_text)
+        self.cached_tokens: Optional[int] = None
+
+        self.enabled = enabled
+        if enabled and self.prefix_tokens < min_tokens:
+            # Gemini rejects explicit caches below its minimum; implicit prefix caching still applies
+            logger.info(f"Prompt prefix is ~{self.prefix_tokens} tokens, below the {min_tokens} token cache minimum; not caching")
+            self.enabled = False
+
+    async def name(self) -> Optional[str]:
+        """The live cache name, creating or renewing it if needed; ``None`` means send the prompt inline."""
+        if not self.enabled:
+            return None
+        now = self._clock()
+        if self._name and now < self._expires_at:
+            return self._name
+        if now < self._retry_at:
+            return None
+
+        async with self._lock:
+            now = self._clock()
+            if self._name and now < self._expires_at:
+                return self._name
+            try:
+                name, tokens = await asyncio.to_thread(self._create)
+            except Exception as e:
+                logger.warning(f"Prompt cache creation failed, sending the prompt inline: {e}")
+                self._name, self._retry_at = None, now + self.retry_seconds
+                return None
+            self._name, self.cached_tokens = name, tokens
+            # Renew at 90% of the TTL so no request names a cache that is about to expire
+            self._expires_at = now + self.ttl_seconds * 0.9
+            logger.info(f"Prompt cache {name} created ({tokens} tokens, ttl {self.ttl_seconds}s)")
+            return name
+
+    def invalidate(self) -> None:
+        """Drops the cache after a request naming it failed; the next call recreates it after the retry delay."""
+        self._name, self._expires_at = None, 0.0
+        self._retry_at = self._clock() + self.retry_seconds
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "name": self._name,
+            "system_prompt_tokens": self.system_tokens,
+            "prefix_tokens_estimate": self.prefix_tokens,
+            "cached_tokens": self.cached_tokens,
+        }
+
+    def _create_gemini_cache(self) -> tuple:
+        from google.ai.generativelanguage_v1beta import CacheServiceClient, CachedContent, Content, Part
+        from google.protobuf import duration_pb2
+
+        client = CacheServiceClient(client_options={"api_key": GOOGLE_API_KEY})
+        cache = client.create_cached_content(cached_content=CachedContent(
+            model=self.model if self.model.startswith("models/") else f"models/{self.model}",
+            display_name="miye-system-prompt",
+            system_instruction=Content(parts=[Part(text=self.system_prompt)]),
+            tools=[_tool_declarations(self.tools)],
+            ttl=duration_pb2.Duration(seconds=int(self.ttl_seconds)),
+        ))
+        return cache.name, cache.usage_metadata.total_token_count
+
+
+prompt_cache = PromptPrefixCache(DEFAULT_SYSTEM_PROMPT, agent_tools)
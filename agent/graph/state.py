@@ -2,9 +2,12 @@ from typing import TypedDict, Annotated, Any, Sequence, Optional, Dict
 from typing_extensions import NotRequired
 from langchain_core.messages import BaseMessage
 from langgraph.graph import add_messages
+from app.quotes import merge_quotes
 
 class AgentState(TypedDict):
     """This represents the state of the agent's workflow."""
     messages: Annotated[Sequence[BaseMessage], add_messages]
     proposed_transaction: NotRequired[Optional[Dict[str, Any]]]
-    context_memory: NotRequired[dict]
\ No newline at end of file
+    context_memory: NotRequired[dict]
+    # quote_id -> quote payload; expired quotes are dropped on every update
+    quotes: NotRequired[Annotated[Dict[str, dict], merge_quotes]]
\ No newline at end of file
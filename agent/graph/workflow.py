@@ -1,22 +1,48 @@
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver # In Prod, use PostgresSaver
-from .nodes import agent_node, propose_send_node, propose_swap_node, report_transaction_status_node, get_swap_quote_node
-from .edges import should_continue
+from .nodes import agent_node, propose_send_node, propose_swap_node, report_transaction_status_node, get_swap_quote_node, dispatch_tools_node
+from .edges import should_continue, route_intent
+from .intent_parser import intent_parser_node
 from .state import AgentState
+from .checkpointer import build_checkpointer
+from app.config import FAST_PATH_ENABLED
+from app.metrics import timed_node
+from app.tracing import traced
 
-# 1. Initialize Memory
-memory = MemorySaver()
+# 1. Initialize Memory (backend and bounds come from app.config)
+memory = build_checkpointer()
 
 graph = StateGraph(AgentState)
 
+def _instrument(name, node):
+    """Times each run for /metrics and records it as a span when tracing is on."""
+    return timed_node(name, traced(f"node {name}")(node))
+
 # Nodes
-graph.add_node("agent", agent_node)
-graph.add_node("propose_swap", propose_swap_node)
-graph.add_node("propose_send", propose_send_node)
-graph.add_node("return_transaction_status", report_transaction_status_node)
-graph.add_node("get_swap_quote", get_swap_quote_node)
+graph.add_node("agent", _instrument("agent", agent_node))
+graph.add_node("propose_swap", _instrument("propose_swap", propose_swap_node))
+graph.add_node("propose_send", _instrument("propose_send", propose_send_node))
+graph.add_node("return_transaction_status", _instrument("return_transaction_status", report_transaction_status_node))
+graph.add_node("get_swap_quote", _instrument("get_swap_quote", get_swap_quote_node))
+graph.add_node("dispatch_tools", _instrument("dispatch_tools", dispatch_tools_node))
 
-graph.set_entry_point("agent")
+if FAST_PATH_ENABLED:
+    # Literal commands skip the first LLM call; everything else falls through to the agent
+    graph.add_node("intent_parser", _instrument("intent_parser", intent_parser_node))
+    graph.set_entry_point("intent_parser")
+    graph.add_conditional_edges(
+        "intent_parser",
+        route_intent,
+        {
+            "get_swap_quote": "get_swap_quote",
+            "propose_swap": "propose_swap",
+            "propose_send": "propose_send",
+            "return_transaction_status": "return_transaction_status",
+            "agent": "agent",
+            "end": "agent"
+        },
+    )
+else:
+    graph.set_entry_point("agent")
 
 # Edges
 graph.add_conditional_edges(
@@ -27,6 +53,7 @@ graph.add_conditional_edges(
         "propose_swap": "propose_swap",
         "propose_send": "propose_send",
         "return_transaction_status": "return_transaction_status",
+        "dispatch_tools": "dispatch_tools",
         "end": END
     },
 )
@@ -34,6 +61,8 @@ graph.add_conditional_edges(
 # 2. Logic Flow Updates
 # Quotes go BACK to the agent so it can summarize the price to the user
 graph.add_edge("get_swap_quote", "agent") 
+# Batched tool results also go back so the agent can answer them in one reply
+graph.add_edge("dispatch_tools", "agent")
 
 # Proposals go to END (The user must confirm/sign on frontend)
 graph.add_edge("propose_swap", END)
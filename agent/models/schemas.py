@@ -1,14 +1,26 @@
 from pydantic import BaseModel, Field
-from typing import Union, Optional
+from typing import List, Union, Optional
 from .transaction import SwapProposal, SendProposal
 
 class ChatRequest(BaseModel):
     message: str = Field(..., description="The user's natural language input.")
-    conversation_id: Optional[str] = Field(None, description="UUID or unique string to maintain chat history.")
+    conversation_id: Optional[str] = Field(None, description="UUID or unique string to maintain chat history. Omit to start a new conversation.")
     user_address: Optional[str] = Field(None, description="The connected wallet address (0x...) for context.")
 
 class ChatResponse(BaseModel):
     message: str = Field(..., description="The agent's conversational text response.")
     proposed_transaction: Optional[Union[SwapProposal, SendProposal]] = Field(None, description="Structured transaction data if an action is proposed.")
     quote_data: Optional[dict] = Field(None, description="Raw price/quote data from the agent's internal tools.")
-    conversation_id: str = Field(..., description="The ID of the session used.")
\ No newline at end of file
+    conversation_id: str = Field(..., description="The ID of the session used.")
+    trace_id: Optional[str] = Field(None, description="Trace id of this turn when tracing is enabled.")
+
+class BatchChatRequest(BaseModel):
+    requests: List[ChatRequest] = Field(..., min_length=1, description="Chat turns to run. Turns sharing a conversation_id run in list order.")
+
+class BatchChatItem(BaseModel):
+    index: int = Field(..., description="Position of the turn in the submitted list.")
+    response: Optional[ChatResponse] = Field(None, description="The turn's response, if it succeeded.")
+    error: Optional[str] = Field(None, description="Why the turn failed, if it did.")
+
+class BatchChatResponse(BaseModel):
+    results: List[BatchChatItem] = Field(..., description="One entry per submitted turn, in the same order.")
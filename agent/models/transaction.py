@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
 import re
 
 class SwapProposal(BaseModel):
@@ -9,9 +10,18 @@ class SwapProposal(BaseModel):
     tokenOutAddress: str = Field(..., description="Contract address of the token to buy.")
     amount: str = Field(..., description="Amount to swap as a string to preserve precision.")
     estimatedOutput: str = Field(..., description="Estimated amount of tokenOut to be received.")
+    minimumOutput: Optional[str] = Field(None, description="Least tokenOut accepted after maxSlippage (amountOutMinimum).")
     maxSlippage: str = Field(..., description="Maximum allowed slippage percentage.")
     chain: str = Field("base", description="The network chain ID or name (default: base).")
     routerAddress: str = Field(..., description="The address of the Uniswap/Router contract to call.")
+    route: Optional[List[str]] = Field(None, description="Token symbols the swap passes through (e.g. DAI, WETH, USDC) when the quote came from pool simulation.")
+    routeFeeTiers: Optional[List[int]] = Field(None, description="Fee tier of the pool used for each hop of route.")
+    feeTier: Optional[int] = Field(None, description="Uniswap V3 fee tier in hundredths of a bip (e.g. 500, 3000) for a single-hop route.")
+    priceImpact: Optional[str] = Field(None, description="Price impact of the trade in percent, excluding the pool fee.")
+    quoteId: Optional[str] = Field(None, description="Id of the quote this proposal was built from, if it reused one.")
+    quoteExpiresAt: Optional[float] = Field(None, description="Unix time after which the reused quote is no longer valid.")
+    stale: Optional[bool] = Field(None, description="True when every price source failed and the estimate uses the last known price.")
+    priceAgeSeconds: Optional[float] = Field(None, description="Age of that last known price in seconds, when stale.")
 
 class SendProposal(BaseModel):
     action: str = Field("send", description="Identifies this as a token send transaction.")
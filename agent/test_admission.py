@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+import app.main as main
+from app.admission import AdmissionController, AdmissionRejected
+
+
+async def _turn(admission, thread_id, log, delay=0.01):
+    async with admission.admit(thread_id):
+        log.append(("start", thread_id))
+        await asyncio.sleep(delay)
+        log.append(("end", thread_id))
+
+
+def test_same_conversation_never_overlaps():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=8, max_queued=8, max_pending_per_conversation=8, queue_timeout=1)
+        log = []
+        await asyncio.gather(*(_turn(admission, "t1", log) for _ in range(3)), _turn(admission, "t2", log))
+        return admission, log
+
+    admission, log = asyncio.run(scenario())
+    t1 = [event for event, thread in log if thread == "t1"]
+    assert t1 == ["start", "end"] * 3
+    # The other conversation ran alongside the first turn of t1
+    assert log.index(("start", "t2")) < log.index(("end", "t1"))
+    assert admission.stats()["admitted"] == 4 and admission.stats()["conversations"] == 0
+
+
+def test_saturation_is_rejected_fast():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queued=1, max_pending_per_conversation=1, queue_timeout=0.05)
+        log = []
+        running = asyncio.create_task(_turn(admission, "a", log, delay=0.2))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(_turn(admission, "b", log))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as conversation_full:
+            await _turn(admission, "a", log)
+        with pytest.raises(AdmissionRejected) as server_full:
+            await _turn(admission, "c", log)
+        # The queued turn gives up once its wait exceeds the timeout
+        with pytest.raises(AdmissionRejected) as timed_out:
+            await queued
+        await running
+        return admission, conversation_full.value, server_full.value, timed_out.value
+
+    admission, conversation_full, server_full, timed_out = asyncio.run(scenario())
+    assert conversation_full.status_code == 429
+    assert server_full.status_code == 503
+    assert timed_out.status_code == 503
+    assert admission.stats()["timed_out"] == 1 and admission.stats()["in_flight"] == 0
+
+
+class EchoGraph:
+    async def ainvoke(self, input_state, config):
+        return {"messages": [AIMessage(content=config["configurable"]["thread_id"])]}
+
+
+class BusyAdmission(AdmissionController):
+    def check(self, thread_id):
+        raise AdmissionRejected(503, "Server busy, retry shortly")
+
+
+def test_anonymous_requests_get_their_own_thread_and_rejections_map_to_status(monkeypatch):
+    monkeypatch.setattr(main, "agent_app", EchoGraph())
+    client = TestClient(main.app)
+
+    first = client.post("/chat", json={"message": "hi"}).json()
+    second = client.post("/chat", json={"message": "hi"}).json()
+    assert first["conversation_id"] != second["conversation_id"]
+    assert first["message"] == first["conversation_id"]
+
+    monkeypatch.setattr(main, "admission", BusyAdmission())
+    response = client.post("/chat", json={"message": "hi", "conversation_id": "c1"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
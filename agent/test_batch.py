@@ -0,0 +1,59 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+import app.main as main
+from app.batch import run_batch
+
+
+def test_conversations_stay_ordered_and_run_concurrently():
+    items = [("a", 1), ("b", 1), ("a", 2), ("c", 1), ("a", 3), ("b", 2)]
+    seen = []
+    active = 0
+    peak = 0
+
+    async def run(item):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        seen.append(item)
+        active -= 1
+        if item == ("c", 1):
+            raise RuntimeError("boom")
+        return f"{item[0]}{item[1]}"
+
+    results = asyncio.run(run_batch(items, key=lambda item: item[0], run=run, concurrency=2))
+
+    assert [result for result, _ in results] == ["a1", "b1", "a2", None, "a3", "b2"]
+    assert str(results[3][1]) == "boom"
+    assert [item for item in seen if item[0] == "a"] == [("a", 1), ("a", 2), ("a", 3)]
+    assert peak == 2
+
+
+class FakeGraph:
+    async def ainvoke(self, input_state, config):
+        text = input_state["messages"][0].content
+        if text == "fail":
+            raise RuntimeError("agent down")
+        return {"messages": [AIMessage(content=f"echo {text}")]}
+
+
+def test_batch_endpoint_reports_per_item_results(monkeypatch):
+    monkeypatch.setattr(main, "agent_app", FakeGraph())
+    client = TestClient(main.app)
+
+    response = client.post("/chat/batch", json={"requests": [
+        {"message": "hi", "conversation_id": "c1"},
+        {"message": "fail", "conversation_id": "c2"},
+        {"message": "  ", "conversation_id": "c3"},
+    ]})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["response"] == {"message": "echo hi", "proposed_transaction": None, "quote_data": None, "conversation_id": "c1", "trace_id": None}
+    assert results[1]["error"] == "agent down"
+    assert results[2]["error"] == "Empty message"
+
+    monkeypatch.setattr(main, "CHAT_BATCH_MAX_ITEMS", 1)
+    assert client.post("/chat/batch", json={"requests": [{"message": "a"}, {"message": "b"}]}).status_code == 400
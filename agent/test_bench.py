@@ -0,0 +1,42 @@
+import asyncio
+import inspect
+
+import graph.nodes as nodes
+from graph.intent_parser import intent_parser_node
+from bench.run import compare, percentile, run_benchmark
+
+
+def test_offline_run_covers_every_scenario_without_errors():
+    original_router = nodes.model_router
+    report = asyncio.run(run_benchmark(conversations=8, concurrency=4, memory_conversations=4))
+
+    assert report["errors"] == 0
+    assert report["turns"] == 12
+    assert set(report["scenarios"]) == {"quote_then_swap", "send", "status_report", "off_topic"}
+    assert {"agent", "get_swap_quote", "propose_swap", "propose_send", "return_transaction_status"} <= set(report["nodes"])
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+    assert "python_heap_bytes_per_conversation" in report["memory"]
+    # The fakes are removed again afterwards
+    assert nodes.model_router is original_router
+
+
+def test_percentiles_and_regression_check():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+
+    baseline = {"latency_ms": {"p50": 100, "p95": 200}, "throughput_turns_per_second": 50}
+    assert compare({"latency_ms": {"p50": 110, "p95": 200}, "throughput_turns_per_second": 48}, baseline, 0.25) == []
+    regressions = compare({"latency_ms": {"p50": 100, "p95": 300}, "throughput_turns_per_second": 30}, baseline, 0.25)
+    assert [line.split(":")[0] for line in regressions] == ["latency_ms.p95", "throughput_turns_per_second"]
+
+
+def test_slow_llm_calls_overlap_instead_of_queueing_on_threads():
+    for node in (nodes.agent_node, nodes.get_swap_quote_node, nodes.propose_swap_node, nodes.propose_send_node,
+                 nodes.report_transaction_status_node, nodes.dispatch_tools_node, intent_parser_node):
+        assert inspect.iscoroutinefunction(node)
+
+    # 120 conversations waiting on a 200ms model at once; sequential calls would take minutes
+    report = asyncio.run(run_benchmark(conversations=120, concurrency=120, llm_latency_ms=200, memory_conversations=0))
+    assert report["errors"] == 0
+    assert report["elapsed_seconds"] < 5
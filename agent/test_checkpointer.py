@@ -0,0 +1,207 @@
+import os
+import sqlite3
+from typing import TypedDict
+
+import asyncio
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.graph import StateGraph, END
+from graph.checkpointer import SQLCheckpointSaver, build_checkpointer
+
+
+class CounterState(TypedDict):
+    count: int
+
+
+def build_graph(saver):
+    graph = StateGraph(CounterState)
+    graph.add_node("step", lambda state: {"count": state.get("count", 0) + 1})
+    graph.set_entry_point("step")
+    graph.add_edge("step", END)
+    return graph.compile(checkpointer=saver)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def sqlite_saver(path=":memory:", **kwargs):
+    return SQLCheckpointSaver(lambda: sqlite3.connect(path, check_same_thread=False), **kwargs)
+
+
+def test_state_survives_and_checkpoints_are_capped():
+    saver = sqlite_saver(max_per_thread=2)
+    app = build_graph(saver)
+    config = {"configurable": {"thread_id": "a"}}
+
+    for _ in range(5):
+        app.invoke({}, config)
+
+    assert app.get_state(config).values["count"] == 5
+    assert len(list(saver.list(config))) == 2
+
+
+def test_idle_threads_are_evicted():
+    clock = FakeClock()
+    saver = sqlite_saver(ttl_seconds=60, sweep_interval_seconds=10, clock=clock)
+    app = build_graph(saver)
+
+    app.invoke({}, {"configurable": {"thread_id": "idle"}})
+    clock.now += 120
+    app.invoke({}, {"configurable": {"thread_id": "active"}})
+
+    assert saver.thread_count() == 1
+    assert saver.get_tuple({"configurable": {"thread_id": "idle"}}) is None
+
+
+def test_idle_threads_are_evicted_by_reads_alone():
+    clock = FakeClock()
+    saver = sqlite_saver(ttl_seconds=60, sweep_interval_seconds=10, clock=clock)
+    build_graph(saver).invoke({}, {"configurable": {"thread_id": "idle"}})
+
+    clock.now += 30
+    assert saver.thread_count() == 1
+    clock.now += 60
+    # No further writes: the next lookup sweeps on its own
+    assert saver.get_tuple({"configurable": {"thread_id": "other"}}) is None
+    with saver._transaction():
+        assert saver._execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0] == 0
+
+
+def test_sqlite_file_persists_across_instances(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    config = {"configurable": {"thread_id": "a"}}
+    build_graph(sqlite_saver(path)).invoke({}, config)
+    build_graph(sqlite_saver(path)).invoke({}, config)
+
+    assert build_graph(sqlite_saver(path)).get_state(config).values["count"] == 2
+
+
+class PostgresLikeConnection:
+    """SQLite behind psycopg's rules: ``%s`` placeholders, every statement (reads too) opens
+    a transaction, and after a failed statement everything fails until ``rollback()``."""
+
+    def __init__(self, fail_on=None):
+        self.db = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+        self.fail_on = fail_on
+        self.in_transaction = False
+        self.aborted = False
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params=()):
+        if self.aborted:
+            raise RuntimeError("current transaction is aborted, commands ignored until end of transaction block")
+        assert "?" not in query
+        if not self.in_transaction:
+            self.db.execute("BEGIN")
+            self.in_transaction = True
+        if self.fail_on and self.fail_on in query:
+            self.fail_on = None
+            self.aborted = True
+            raise RuntimeError("deadlock detected")
+        self._cursor = self.db.execute(query.replace("%s", "?"), params)
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def commit(self):
+        assert not self.aborted
+        if self.in_transaction:
+            self.db.execute("COMMIT")
+        self.in_transaction = False
+
+    def rollback(self):
+        if self.in_transaction:
+            self.db.execute("ROLLBACK")
+        self.in_transaction = self.aborted = False
+
+
+def test_failed_write_is_rolled_back_and_the_connection_recovers():
+    conn = PostgresLikeConnection()
+    saver = SQLCheckpointSaver(lambda: conn, dialect="postgres")
+    config = {"configurable": {"thread_id": "a", "checkpoint_ns": ""}}
+
+    # The checkpoint row goes in first; the rollback has to take it back out
+    conn.fail_on = "INSERT INTO threads"
+    with pytest.raises(RuntimeError, match="deadlock"):
+        saver.put(config, empty_checkpoint(), {}, {})
+
+    assert not conn.aborted and not conn.in_transaction
+    assert saver.get_tuple(config) is None
+    saver.put(config, empty_checkpoint(), {}, {})
+    assert saver.get_tuple(config) is not None
+    assert saver.thread_count() == 1
+
+
+def test_reads_do_not_leave_a_transaction_open():
+    conn = PostgresLikeConnection()
+    saver = SQLCheckpointSaver(lambda: conn, dialect="postgres")
+    config = {"configurable": {"thread_id": "a"}}
+    build_graph(saver).invoke({}, config)
+
+    assert saver.get_tuple(config) is not None
+    assert not conn.in_transaction
+    assert list(saver.list(config))
+    assert not conn.in_transaction
+    assert saver.thread_count() == 1
+    assert not conn.in_transaction
+
+
+def test_file_backend_commits_off_the_event_loop(monkeypatch, tmp_path):
+    import threading
+    import graph.checkpointer as checkpointer
+
+    monkeypatch.setattr(checkpointer, "CHECKPOINT_SQLITE_PATH", str(tmp_path / "checkpoints.sqlite"))
+    assert build_checkpointer("memory").offload_async is False
+    saver = build_checkpointer("sqlite")
+    assert saver.offload_async is True
+
+    commit_threads = []
+    commit = saver._commit
+
+    def recording_commit():
+        commit_threads.append(threading.get_ident())
+        commit()
+
+    monkeypatch.setattr(saver, "_commit", recording_commit)
+
+    async def run():
+        await build_graph(saver).ainvoke({}, {"configurable": {"thread_id": "a"}})
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert commit_threads and loop_thread not in commit_threads
+
+
+@pytest.mark.skipif(not os.getenv("CHECKPOINT_POSTGRES_URL"), reason="CHECKPOINT_POSTGRES_URL not set")
+def test_postgres_backend_against_a_real_server():
+    pytest.importorskip("psycopg")
+    import uuid
+
+    saver = build_checkpointer("postgres")
+    app = build_graph(saver)
+    config = {"configurable": {"thread_id": f"test-{uuid.uuid4().hex}"}}
+    try:
+        for _ in range(saver.max_per_thread + 2):
+            app.invoke({}, config)
+        assert app.get_state(config).values["count"] == saver.max_per_thread + 2
+        assert len(list(saver.list(config))) == saver.max_per_thread
+
+        async def run():
+            await app.ainvoke({}, config)
+            return (await saver.aget_tuple(config)).checkpoint
+
+        assert asyncio.run(run())["channel_values"]["count"] == saver.max_per_thread + 3
+    finally:
+        saver.delete_thread(config["configurable"]["thread_id"])
+    assert saver.get_tuple(config) is None
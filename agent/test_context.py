@@ -0,0 +1,32 @@
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, ToolMessage
+from graph.context import ContextWindow
+
+
+def quote_turn(i):
+    return [
+        HumanMessage(content=f"swap {i} ETH to USDC", id=f"h{i}"),
+        AIMessage(content="", tool_calls=[{"name": "get_swap_quote_tool", "args": {"amount": i}, "id": f"c{i}"}], id=f"a{i}"),
+        ToolMessage(content="{}", tool_call_id=f"c{i}", id=f"t{i}"),
+        AIMessage(content=f"Quote {i}", id=f"r{i}"),
+    ]
+
+
+def test_window_never_starts_with_orphaned_tool_message():
+    history = quote_turn(1) + quote_turn(2) + [HumanMessage(content="yes", id="h3")]
+    # A plain tail of 7 would start at a1 and a tail of 6 at t1
+    for size in (6, 7):
+        window, _, update = ContextWindow(max_messages=size, summarize=False).build({"messages": history})
+        assert window[0].id == "h2"
+        assert update == {}
+
+
+def test_dropped_messages_fold_into_summary():
+    history = quote_turn(1) + quote_turn(2)
+    window, summary, update = ContextWindow(max_messages=4, summarize=True).build({"messages": history})
+
+    assert [m.id for m in window] == ["h2", "a2", "t2", "r2"]
+    assert summary.splitlines()[0] == "User: swap 1 ETH to USDC"
+    assert summary.splitlines()[-1] == "Assistant: Quote 1"
+    assert all(isinstance(m, RemoveMessage) for m in update["messages"])
+    assert [m.id for m in update["messages"]] == ["h1", "a1", "t1", "r1"]
+    assert update["context_memory"]["summarized_messages"] == 4
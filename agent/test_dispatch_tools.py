@@ -0,0 +1,118 @@
+import asyncio
+import json
+
+from langchain_core.messages import AIMessage
+import graph.nodes as nodes
+
+
+class Tracker:
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.finished = []
+
+
+class StubTool:
+    """Async tool that sleeps for ``delay`` and echoes its arguments."""
+
+    def __init__(self, name, tracker, delay=0.0, error=None, result=None):
+        self.name = name
+        self.tracker = tracker
+        self.delay = delay
+        self.error = error
+        self.result = result
+
+    async def ainvoke(self, args):
+        self.tracker.active += 1
+        self.tracker.max_active = max(self.tracker.max_active, self.tracker.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.error:
+                raise self.error
+            self.tracker.finished.append(self.name)
+            return self.result or {"tool": self.name, "args": args}
+        finally:
+            self.tracker.active -= 1
+
+
+def _install(monkeypatch, *stubs):
+    monkeypatch.setattr(nodes, "TOOLS_BY_NAME", {stub.name: stub for stub in stubs})
+
+
+def _dispatch(*calls):
+    tool_calls = [{"name": name, "args": args, "id": f"call-{i}"} for i, (name, args) in enumerate(calls)]
+    state = {"messages": [AIMessage(content="", tool_calls=tool_calls)]}
+    return asyncio.run(nodes.dispatch_tools_node(state))
+
+
+def _payloads(update):
+    return [(message.tool_call_id, message.name, json.loads(message.content)) for message in update["messages"]]
+
+
+def test_tool_calls_run_together_and_results_keep_the_call_order(monkeypatch):
+    tracker = Tracker()
+    # The first call is the slowest, so completion order is the reverse of call order
+    _install(monkeypatch, *(StubTool(name, tracker, delay) for name, delay in (("a", 0.15), ("b", 0.1), ("c", 0.05))))
+
+    update = _dispatch(("a", {"n": 1}), ("b", {"n": 2}), ("c", {"n": 3}))
+
+    assert tracker.max_active == 3
+    assert tracker.finished == ["c", "b", "a"]
+    assert _payloads(update) == [
+        ("call-0", "a", {"tool": "a", "args": {"n": 1}}),
+        ("call-1", "b", {"tool": "b", "args": {"n": 2}}),
+        ("call-2", "c", {"tool": "c", "args": {"n": 3}}),
+    ]
+
+
+def test_slow_tool_times_out_without_holding_back_the_others(monkeypatch):
+    monkeypatch.setattr(nodes, "TOOL_TIMEOUT_SECONDS", 0.05)
+    tracker = Tracker()
+    _install(monkeypatch, StubTool("slow", tracker, delay=5), StubTool("fast", tracker))
+
+    update = _dispatch(("slow", {}), ("fast", {}))
+
+    (_, _, slow), (_, _, fast) = _payloads(update)
+    assert slow == {"error": "slow timed out. Please try again.", "action": "error"}
+    assert fast == {"tool": "fast", "args": {}}
+    assert tracker.active == 0
+
+
+def test_unknown_tool_and_tool_errors_become_error_payloads(monkeypatch):
+    tracker = Tracker()
+    _install(monkeypatch, StubTool("broken", tracker, error=RuntimeError("rpc down")), StubTool("ok", tracker))
+
+    update = _dispatch(("nope", {}), ("broken", {}), ("ok", {}))
+
+    assert [payload for _, _, payload in _payloads(update)] == [
+        {"error": "Unknown tool: nope", "action": "error"},
+        {"error": "rpc down", "action": "error"},
+        {"tool": "ok", "args": {}},
+    ]
+    assert "proposed_transaction" not in update
+
+
+def test_concurrency_is_capped(monkeypatch):
+    monkeypatch.setattr(nodes, "TOOL_CONCURRENCY", 2)
+    tracker = Tracker()
+    _install(monkeypatch, *(StubTool(f"t{i}", tracker, delay=0.02) for i in range(5)))
+
+    update = _dispatch(*((f"t{i}", {}) for i in range(5)))
+
+    assert tracker.max_active == 2
+    assert [name for _, name, _ in _payloads(update)] == [f"t{i}" for i in range(5)]
+    assert sorted(tracker.finished) == [f"t{i}" for i in range(5)]
+
+
+def test_successful_proposal_is_put_in_the_state(monkeypatch):
+    tracker = Tracker()
+    send = {"action": "send", "token": "USDC", "amount": "5", "toAddress": "0x" + "1" * 40}
+    _install(
+        monkeypatch,
+        StubTool("send", tracker, result=send),
+        StubTool("failed_swap", tracker, result={"action": "swap", "error": "no liquidity"}),
+    )
+
+    update = _dispatch(("send", {}), ("failed_swap", {}))
+
+    assert update["proposed_transaction"] == send
@@ -0,0 +1,35 @@
+from graph.intent_parser import parse_intent
+
+RECIPIENT = "0x" + "ab" * 20
+TX_HASH = "0x" + "cd" * 32
+
+
+def test_swap_command_becomes_quote_call():
+    call = parse_intent("Swap 0.1 eth for USDC")
+    assert call["name"] == "get_swap_quote_tool"
+    assert call["args"] == {"from_token": "ETH", "to_token": "USDC", "amount": 0.1}
+
+
+def test_send_command_becomes_send_call():
+    call = parse_intent(f"send 5 USDC to {RECIPIENT}")
+    assert call["name"] == "propose_send_tool"
+    assert call["args"] == {"token": "USDC", "recipient_address": RECIPIENT, "amount": "5"}
+
+
+def test_status_feedback_becomes_status_call():
+    call = parse_intent(f"Transaction {TX_HASH} completed with status failure: user rejected")
+    assert call["name"] == "report_transaction_status_tool"
+    assert call["args"] == {"tx_hash": TX_HASH, "status": "failure", "error": "user rejected"}
+
+
+def test_ambiguous_or_unknown_falls_through():
+    for text in [
+        "swap some ETH for USDC",
+        "swap 1 SOL for USDC",
+        "swap 1 ETH for ETH",
+        "swap 1 ETH for USDC and then send it to mum",
+        "send 5 USDC to mum",
+        f"Transaction {TX_HASH} completed with status failure",
+        "what can you do?",
+    ]:
+        assert parse_intent(text) is None, text
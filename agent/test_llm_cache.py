@@ -0,0 +1,33 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from graph.llm_cache import ResponseCache
+
+SYSTEM = SystemMessage(content="You are Miye.")
+
+
+def test_normalized_prompts_share_a_reply_with_fresh_ids():
+    cache = ResponseCache(ttl_seconds=60, max_entries=8)
+    key = cache.key([SYSTEM, HumanMessage(content="Hi!")])
+    send_call = {"name": "propose_send_tool", "args": {}, "id": "c1", "type": "tool_call"}
+    cache.put(key, AIMessage(content="Hello", id="m1", tool_calls=[send_call]))
+
+    cached = cache.get(cache.key([SYSTEM, HumanMessage(content="  hi ")]))
+    assert cached.content == "Hello"
+    assert cached.id is None
+    assert cached.tool_calls[0]["id"] != "c1"
+
+
+def test_price_dependent_turns_are_never_cached():
+    cache = ResponseCache(ttl_seconds=60, max_entries=8)
+    key = cache.key([SYSTEM, HumanMessage(content="swap 1 eth to usdc")])
+    quote_call = {"name": "get_swap_quote_tool", "args": {}, "id": "c1", "type": "tool_call"}
+    cache.put(key, AIMessage(content="", tool_calls=[quote_call]))
+    assert cache.get(key) is None
+
+    after_tool = [SYSTEM, HumanMessage(content="swap"), AIMessage(content="", tool_calls=[quote_call]), ToolMessage(content="{}", tool_call_id="c1")]
+    assert cache.key(after_tool) is None
+
+
+def test_model_config_is_part_of_the_key():
+    cache = ResponseCache(ttl_seconds=60, max_entries=8)
+    messages = [SYSTEM, HumanMessage(content="hi")]
+    assert cache.key(messages, {"model": "a"}) != cache.key(messages, {"model": "b"})
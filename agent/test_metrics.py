@@ -0,0 +1,59 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+import app.main as main
+from app.metrics import Registry, NODE_SECONDS, timed_node
+
+
+def test_histogram_and_counter_render_in_text_format():
+    registry = Registry()
+    latency = registry.histogram("demo_seconds", "Demo latency.", ("node",), buckets=(0.1, 1.0))
+    errors = registry.counter("demo_errors", "Demo errors.", ("kind",))
+    registry.gauge("demo_cache", "Demo cache.", ("stat",), lambda: {("hit_rate",): 0.75})
+
+    latency.observe(0.05, node="agent")
+    latency.observe(0.5, node="agent")
+    latency.observe(5, node="agent")
+    errors.inc(kind="llm")
+    errors.inc(kind="llm")
+
+    text = registry.render()
+    assert '# TYPE demo_seconds histogram' in text
+    assert 'demo_seconds_bucket{node="agent",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{node="agent",le="1"} 2' in text
+    assert 'demo_seconds_bucket{node="agent",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{node="agent"} 3' in text
+    assert 'demo_errors_total{kind="llm"} 2' in text
+    assert 'demo_cache{stat="hit_rate"} 0.75' in text
+
+
+def test_timed_node_observes_sync_and_async_nodes():
+    def sync_node(state):
+        return {"messages": []}
+
+    async def async_node(state):
+        return {"messages": []}
+
+    before = NODE_SECONDS.count(node="test_sync"), NODE_SECONDS.count(node="test_async")
+    timed_node("test_sync", sync_node)({})
+    asyncio.run(timed_node("test_async", async_node)({}))
+    assert NODE_SECONDS.count(node="test_sync") == before[0] + 1
+    assert NODE_SECONDS.count(node="test_async") == before[1] + 1
+
+
+class EchoGraph:
+    async def ainvoke(self, input_state, config):
+        return {"messages": [AIMessage(content="ok")]}
+
+
+def test_metrics_endpoint_reports_chat_latency(monkeypatch):
+    monkeypatch.setattr(main, "agent_app", EchoGraph())
+    client = TestClient(main.app)
+    client.post("/chat", json={"message": "hi", "conversation_id": "m1"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'miye_http_request_duration_seconds_count{method="POST",route="/chat",status="200"}' in response.text
+    assert 'miye_price_cache{stat="hit_rate"}' in response.text
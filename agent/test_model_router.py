@@ -0,0 +1,62 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from graph.model_router import ModelProfile, ModelRouter, classify_turn, estimate_cost
+
+PROFILES = {
+    "intent": ModelProfile("intent", "gemini-2.5-flash", 0.7, 1008),
+    "summary": ModelProfile("summary", "gemini-2.5-flash-lite", 0.3, 256),
+    "off_topic": ModelProfile("off_topic", "gemini-2.5-flash-lite", 0.3, 256),
+}
+
+
+class FakeModel:
+    def __init__(self, profile):
+        self.profile = profile
+
+    def bind_tools(self, tools):
+        return ("bound", self)
+
+
+def test_turns_are_classified_by_what_the_model_has_to_do():
+    call = {"name": "get_swap_quote_tool", "args": {}, "id": "c1", "type": "tool_call"}
+    after_quote = [HumanMessage(content="swap"), AIMessage(content="", tool_calls=[call]), ToolMessage(content="{}", tool_call_id="c1")]
+    assert classify_turn(after_quote) == "summary"
+
+    for text in ("How much USDC for half an ETH?", "send 5 to 0xabcdef", "yes please", "what's the gas like on base?", "swap my $degen"):
+        assert classify_turn([HumanMessage(content=text)]) == "intent", text
+    for text in ("Hi! What can you do?", "Tell me a joke about cats"):
+        assert classify_turn([HumanMessage(content=text)]) == "off_topic", text
+
+
+def test_profiles_with_the_same_settings_share_one_client():
+    built = []
+
+    def build(profile):
+        built.append(profile.name)
+        return FakeModel(profile)
+
+    router = ModelRouter(build, tools=[], profiles=PROFILES)
+    summary_base, summary_bound = router.clients(PROFILES["summary"])
+    assert router.clients(PROFILES["off_topic"]) == (summary_base, summary_bound)
+    assert summary_bound == ("bound", summary_base)
+    router.clients(PROFILES["intent"])
+    router.clients(PROFILES["intent"])
+    assert built == ["summary", "intent"]
+
+
+def test_disabled_routing_always_uses_the_intent_profile():
+    router = ModelRouter(FakeModel, tools=[], profiles=PROFILES, enabled=False)
+    assert router.route([HumanMessage(content="Tell me a joke")]).name == "intent"
+
+
+def test_latency_tokens_and_cost_are_reported_per_profile():
+    profiles = {name: profile._replace(name=f"test_{name}") for name, profile in PROFILES.items()}
+    router = ModelRouter(FakeModel, tools=[], profiles={profile.name: profile for profile in profiles.values()})
+    router.record(profiles["intent"], 0.5, "ok", {"input_tokens": 1_000_000, "output_tokens": 100_000})
+    router.record(profiles["intent"], 1.5, "error", {})
+
+    stats = router.stats()["profiles"]["test_intent"]
+    assert stats["calls"] == 2 and stats["errors"] == 1
+    assert stats["mean_latency_ms"] == 1000.0
+    assert stats["input_tokens"] == 1_000_000
+    assert stats["cost_usd"] == round(estimate_cost("gemini-2.5-flash", 1_000_000, 100_000), 6) == 0.55
+    assert router.stats()["profiles"]["test_summary"]["calls"] == 0
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+
+from app.price_cache import PriceCache
+from app.price_streamer import PriceSnapshot
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hit_after_load_and_stale_after_ttl():
+    clock = FakeClock()
+    cache = PriceCache(ttl_seconds=10, max_entries=4, clock=clock)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return 2000.0
+
+    key = PriceCache.key("eth", "USD")
+    assert cache.get_or_load(key, loader) == 2000.0
+    assert cache.get_or_load(key, loader) == 2000.0
+    assert len(calls) == 1
+
+    clock.now = 11
+    assert cache.get_or_load(key, loader) == 2000.0
+    assert len(calls) == 2
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stale"]) == (1, 1, 1)
+
+
+def test_failed_loads_are_not_cached():
+    cache = PriceCache(ttl_seconds=10)
+    key = PriceCache.key("ETH")
+    assert cache.get_or_load(key, lambda: None) is None
+    assert cache.get_or_load(key, lambda: 1.0) == 1.0
+
+
+def test_lru_eviction():
+    cache = PriceCache(ttl_seconds=10, max_entries=2)
+    for symbol in ["ETH", "USDC", "DAI"]:
+        cache.get_or_load(PriceCache.key(symbol), lambda: 1.0)
+    assert cache.peek(PriceCache.key("ETH")) is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = PriceCache(ttl_seconds=10)
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        # Hold the flight open until every other caller is waiting on it
+        deadline = time.monotonic() + 2
+        while cache.coalesced < 19 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        return 3000.0
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load(PriceCache.key("ETH"), slow_loader))) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [3000.0] * 20
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 19
+
+
+def test_bulk_load_only_fetches_missing_keys():
+    cache = PriceCache(ttl_seconds=10)
+    cache.get_or_load(PriceCache.key("ETH"), lambda: 3000.0)
+    requested = []
+
+    def loader(keys):
+        requested.append(list(keys))
+        return {key: 1.0 for key in keys}
+
+    keys = [PriceCache.key(s) for s in ["ETH", "USDC", "DAI", "USDC"]]
+    result = cache.get_many_or_load(keys, loader)
+
+    assert requested == [[PriceCache.key("USDC"), PriceCache.key("DAI")]]
+    assert result == {PriceCache.key("ETH"): 3000.0, PriceCache.key("USDC"): 1.0, PriceCache.key("DAI"): 1.0}
+
+
+def test_async_concurrent_misses_share_one_fetch():
+    cache = PriceCache(ttl_seconds=10)
+    calls = []
+
+    async def loader(keys):
+        calls.append(list(keys))
+        await asyncio.sleep(0.01)
+        return {key: 3000.0 for key in keys}
+
+    async def run():
+        return await asyncio.gather(*[cache.aget_many_or_load([PriceCache.key("ETH")], loader) for _ in range(10)])
+
+    results = asyncio.run(run())
+    assert all(result == {PriceCache.key("ETH"): 3000.0} for result in results)
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 9
+
+
+def test_snapshot_serves_fresh_prices_and_expires():
+    clock = FakeClock()
+    snapshot = PriceSnapshot(max_staleness_seconds=30, clock=clock)
+    assert snapshot.get_many(["ETH"]) is None
+
+    snapshot.publish({"eth": 3000.0, "usdc": 1.0, "dai": None})
+    assert snapshot.get_many(["ETH", "USDC"]) == {"ETH": 3000.0, "USDC": 1.0}
+    # Missing or failed prices fall back to a live fetch
+    assert snapshot.get_many(["ETH", "DAI"]) is None
+
+    clock.now = 31
+    assert snapshot.get_many(["ETH"]) is None
+    assert (snapshot.hits, snapshot.fallbacks) == (1, 2)
@@ -0,0 +1,204 @@
+import asyncio
+
+from app.price_cache import PriceCache
+from app.price_client import PriceClient, AsyncPriceClient
+from app.price_providers import CircuitBreaker, PriceSourceChain, StubPriceProvider, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _chain(*providers, clock=None, **kwargs):
+    options = {"rate_per_second": 100, "burst": 100, "retry_attempts": 1, "retry_base_delay": 0, "failure_threshold": 2, "reset_seconds": 30}
+    options.update(kwargs)
+    return PriceSourceChain(providers, clock=clock or FakeClock(), **options)
+
+
+def test_fails_over_to_next_source():
+    primary = StubPriceProvider({"ETH": 3000.0}, name="primary", fail_times=1)
+    backup = StubPriceProvider({"ETH": 2990.0, "USDC": 1.0}, name="backup")
+    chain = _chain(primary, backup)
+
+    assert chain.fetch(["ETH", "USDC"], "usd", session=None) == {"ETH": 2990.0, "USDC": 1.0}
+    # Healthy again: the primary answers what it can and the backup fills the rest
+    assert chain.fetch(["ETH", "USDC"], "usd", session=None) == {"ETH": 3000.0, "USDC": 1.0}
+
+
+def test_retries_before_giving_up_on_a_source():
+    flaky = StubPriceProvider({"ETH": 3000.0}, fail_times=1)
+    chain = _chain(flaky, retry_attempts=2)
+
+    assert chain.fetch(["ETH"], "usd", session=None) == {"ETH": 3000.0}
+    assert flaky.calls == 2
+
+
+def test_breaker_opens_and_half_opens():
+    clock = FakeClock()
+    down = StubPriceProvider({"ETH": 3000.0}, name="down", fail_times=2)
+    chain = _chain(down, clock=clock)
+
+    assert chain.fetch(["ETH"], "usd", session=None) == {}
+    assert chain.fetch(["ETH"], "usd", session=None) == {}
+    assert chain.stats()["providers"][0]["circuit"] == CircuitBreaker.OPEN
+
+    # Open: the source is not called at all
+    assert chain.fetch(["ETH"], "usd", session=None) == {}
+    assert down.calls == 2
+
+    # After the reset period a single trial call closes it again
+    clock.now = 31
+    assert chain.fetch(["ETH"], "usd", session=None) == {"ETH": 3000.0}
+    assert chain.stats()["providers"][0]["circuit"] == CircuitBreaker.CLOSED
+
+
+def test_half_open_breaker_recovers_after_a_rate_limited_skip():
+    clock = FakeClock()
+    down = StubPriceProvider({"ETH": 3000.0}, name="down", fail_times=2)
+    chain = _chain(down, clock=clock, rate_per_second=0.01, burst=2)
+    chain.fetch(["ETH"], "usd", session=None)
+    chain.fetch(["ETH"], "usd", session=None)
+    assert chain.stats()["providers"][0]["circuit"] == CircuitBreaker.OPEN
+
+    # Half-open but the bucket is empty: skipped without claiming the trial call
+    clock.now = 31
+    assert chain.fetch(["ETH"], "usd", session=None) == {}
+    assert down.calls == 2
+
+    clock.now = 10000
+    assert chain.fetch(["ETH"], "usd", session=None) == {"ETH": 3000.0}
+    assert chain.stats()["providers"][0]["circuit"] == CircuitBreaker.CLOSED
+
+
+def test_cancelled_trial_call_is_released():
+    class HangingProvider(StubPriceProvider):
+        async def afetch(self, symbols, vs_currency, http=None):
+            self.calls += 1
+            await asyncio.sleep(10)
+
+    clock = FakeClock()
+    hanging = HangingProvider({"ETH": 3000.0}, name="hanging")
+    chain = _chain(hanging, clock=clock, failure_threshold=1)
+    chain.sources[0].breaker.record_failure()
+    clock.now = 31
+
+    async def cancelled_trial():
+        try:
+            await asyncio.wait_for(chain.afetch(["ETH"], "usd", http=None), timeout=0.01)
+        except asyncio.TimeoutError:
+            pass
+
+    asyncio.run(cancelled_trial())
+    assert hanging.calls == 1
+    # The trial slot is free again, so the next call is let through
+    assert chain.sources[0].breaker.allow()
+
+
+def test_token_bucket_skips_throttled_source():
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_second=1, capacity=2, clock=clock)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    clock.now = 1
+    assert bucket.try_acquire()
+
+    primary = StubPriceProvider({"ETH": 3000.0}, name="primary")
+    backup = StubPriceProvider({"ETH": 2990.0}, name="backup")
+    chain = _chain(primary, backup, clock=clock, rate_per_second=0, burst=1)
+    assert chain.fetch(["ETH"], "usd", session=None) == {"ETH": 3000.0}
+    assert chain.fetch(["ETH"], "usd", session=None) == {"ETH": 2990.0}
+    assert chain.fetch(["ETH"], "usd", session=None) == {}
+
+
+def test_retries_are_charged_to_the_rate_limit():
+    for burst, expected_calls in ((1, 1), (2, 2), (5, 3)):
+        flaky = StubPriceProvider({"ETH": 3000.0}, fail_times=5)
+        chain = _chain(flaky, rate_per_second=0, burst=burst, retry_attempts=3)
+
+        assert chain.fetch(["ETH"], "usd", session=None) == {}
+        assert flaky.calls == expected_calls
+
+
+def test_client_serves_last_known_good_when_all_sources_fail():
+    clock = FakeClock()
+    cache = PriceCache(ttl_seconds=10, max_entries=8, clock=clock)
+    stub = StubPriceProvider({"ETH": 3000.0})
+    client = PriceClient(cache=cache, sources=_chain(stub))
+
+    assert client.get_token_price("ETH") == 3000.0
+
+    clock.now = 60
+    stub.fail_times = 1
+    assert client.get_token_price("ETH") == 3000.0
+    assert client.sources.stats()["last_known_good"] == 1
+    assert client.estimate_swap_output("ETH", "USDC", 2)["estimated_output"] == 6000.0
+
+
+def test_async_client_uses_the_same_chain():
+    stub = StubPriceProvider({"ETH": 3000.0, "USDC": 1.0})
+    client = AsyncPriceClient(cache=PriceCache(ttl_seconds=10, max_entries=8), sources=_chain(stub))
+
+    async def run():
+        try:
+            return await client.get_token_prices(["ETH", "USDC", "PEPE"])
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) == {"ETH": 3000.0, "USDC": 1.0, "PEPE": None}
+    assert stub.calls == 1
+
+
+def _stale_client(max_age):
+    clock = FakeClock()
+    stub = StubPriceProvider({"ETH": 3000.0, "USDC": 1.0})
+    client = PriceClient(cache=PriceCache(ttl_seconds=10, max_entries=8, clock=clock), sources=_chain(stub), last_known_good_max_age_seconds=max_age)
+    assert client.estimate_swap_output("ETH", "USDC", 2)["stale"] is False
+    stub.fail_times = 100
+    return client, clock
+
+
+def test_last_known_good_is_flagged_stale_and_expires():
+    client, clock = _stale_client(max_age=120)
+
+    clock.now = 60
+    quote = client.estimate_swap_output("ETH", "USDC", 2)
+    assert quote["estimated_output"] == 6000.0
+    assert (quote["source"], quote["stale"], quote["price_age_seconds"]) == ("last_known_good", True, 60.0)
+
+    # Too old to put in a proposal: no price at all
+    clock.now = 121
+    assert client.get_token_price("ETH") is None
+    assert client.estimate_swap_output("ETH", "USDC", 2)["success"] is False
+    assert client.sources.stats()["last_known_good"] == 1
+
+
+def test_stale_price_is_flagged_in_quotes_and_proposals(monkeypatch):
+    import importlib
+    from models.transaction import SwapProposal
+
+    client, clock = _stale_client(max_age=300)
+    clock.now = 90
+    for name in ("tools.get_swap_quote", "tools.propose_swap"):
+        monkeypatch.setattr(importlib.import_module(name), "price_client", client)
+
+    quote = importlib.import_module("tools.get_swap_quote").get_swap_quote("ETH", "USDC", 2)
+    assert (quote["source"], quote["stale"], quote["price_age_seconds"]) == ("last_known_good", True, 90.0)
+
+    proposal = importlib.import_module("tools.propose_swap").propose_swap("ETH", "USDC", "2")
+    assert proposal["stale"] is True and proposal["priceAgeSeconds"] == 90.0
+    assert SwapProposal(**proposal).stale is True
+
+
+def test_quote_source_names_the_provider_that_priced_it():
+    primary = StubPriceProvider({"ETH": 3000.0}, name="coingecko", fail_times=1)
+    backup = StubPriceProvider({"ETH": 2990.0}, name="defillama")
+    client = PriceClient(cache=PriceCache(ttl_seconds=10, max_entries=8), sources=_chain(primary, backup))
+
+    assert client.estimate_swap_output("ETH", "USDC", 1)["source"] == "defillama"
+    # Served from the cache: still the provider that supplied it
+    assert client.estimate_swap_output("ETH", "USDC", 1)["source"] == "defillama"
+    assert client.sources.origin("eth") == "defillama"
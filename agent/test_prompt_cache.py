@@ -0,0 +1,110 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+import graph.nodes as nodes
+from graph.model_router import ModelRouter
+from graph.prompt_cache import PromptPrefixCache
+from graph.system_prompt import DEFAULT_SYSTEM_PROMPT, OFF_TOPIC_REPLY, build_system_prompt
+from tools import tools
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_runtime_prompt_keeps_the_rules_and_stays_small():
+    assert OFF_TOPIC_REPLY in DEFAULT_SYSTEM_PROMPT
+    for tool in ("get_swap_quote_tool", "propose_swap_tool", "propose_send_tool", "report_transaction_status_tool"):
+        assert tool in DEFAULT_SYSTEM_PROMPT
+    assert "private keys" in DEFAULT_SYSTEM_PROMPT
+    # Built in a fixed order, so the prefix is byte-identical across requests
+    assert build_system_prompt() == DEFAULT_SYSTEM_PROMPT
+    assert PromptPrefixCache(DEFAULT_SYSTEM_PROMPT, tools, enabled=False).system_tokens < 1000
+
+
+def test_cache_is_created_once_and_renewed_before_expiry():
+    clock, created = Clock(), []
+
+    def create():
+        created.append(clock.now)
+        return f"cachedContents/{len(created)}", 1500
+
+    cache = PromptPrefixCache("x" * 8000, tools, enabled=True, ttl_seconds=100, create=create, clock=clock)
+    assert asyncio.run(cache.name()) == "cachedContents/1"
+    clock.now = 80
+    assert asyncio.run(cache.name()) == "cachedContents/1"
+    clock.now = 95
+    assert asyncio.run(cache.name()) == "cachedContents/2"
+    assert cache.stats()["cached_tokens"] == 1500
+
+
+def test_failures_fall_back_inline_until_the_retry_delay():
+    clock, attempts = Clock(), []
+
+    def create():
+        attempts.append(clock.now)
+        raise RuntimeError("quota")
+
+    cache = PromptPrefixCache("x" * 8000, tools, enabled=True, retry_seconds=60, create=create, clock=clock)
+    assert asyncio.run(cache.name()) is None
+    assert asyncio.run(cache.name()) is None
+    clock.now = 61
+    asyncio.run(cache.name())
+    assert attempts == [0.0, 61]
+
+
+def test_small_prefix_is_not_cached():
+    cache = PromptPrefixCache("short", [], enabled=True, min_tokens=1024, create=lambda: ("never", 0))
+    assert cache.enabled is False
+    assert asyncio.run(cache.name()) is None
+
+
+class FakeModel:
+    def __init__(self, fail=False, bound=None):
+        self.fail = fail
+        self.bound = bound
+        self.calls = []
+
+    def bind_tools(self, tools):
+        return self.bound or self
+
+    async def ainvoke(self, messages, **kwargs):
+        self.calls.append((messages, kwargs))
+        if self.fail:
+            raise RuntimeError("cache not found")
+        return AIMessage(content="Hello")
+
+
+def _run_agent(monkeypatch, cached_model):
+    inline_model = FakeModel()
+    cached_model.bound = inline_model
+    cache = PromptPrefixCache("x" * 8000, tools, model=nodes.model_router.profiles["intent"].model, enabled=True, create=lambda: ("cachedContents/abc", 2000))
+    monkeypatch.setattr(nodes, "prompt_cache", cache)
+    monkeypatch.setattr(nodes, "model_router", ModelRouter(lambda profile: cached_model, tools))
+    monkeypatch.setattr(nodes, "response_cache", None)
+    result = asyncio.run(nodes.agent_node({"messages": [HumanMessage(content="swap 1 eth")]}))
+    return result, inline_model, cache
+
+
+def test_agent_sends_only_the_conversation_with_a_cached_prefix(monkeypatch):
+    cached_model = FakeModel()
+    result, inline_model, _ = _run_agent(monkeypatch, cached_model)
+
+    messages, kwargs = cached_model.calls[0]
+    assert kwargs == {"cached_content": "cachedContents/abc"}
+    assert not any(isinstance(m, SystemMessage) for m in messages)
+    assert inline_model.calls == []
+    assert result["messages"][-1].content == "Hello"
+
+
+def test_agent_retries_inline_when_the_cache_is_rejected(monkeypatch):
+    result, inline_model, cache = _run_agent(monkeypatch, FakeModel(fail=True))
+
+    messages, _ = inline_model.calls[0]
+    assert isinstance(messages[0], SystemMessage)
+    assert result["messages"][-1].content == "Hello"
+    assert cache.stats()["name"] is None
@@ -0,0 +1,118 @@
+import asyncio
+import importlib
+import time
+
+from langchain_core.messages import AIMessage
+from app.quotes import find_quote, is_fresh, merge_quotes, stamp_quote
+import graph.nodes as nodes
+
+propose_swap_module = importlib.import_module("tools.propose_swap")
+
+
+def quote(from_token="ETH", to_token="USDC", amount_in="0.1", expires_in=60.0, output="250.000000"):
+    payload = {
+        "action": "quote", "success": True, "from_token": from_token, "to_token": to_token,
+        "amount_in": amount_in, "estimated_output": output, "price": "2500.0000",
+    }
+    stamped = stamp_quote(payload, ttl_seconds=expires_in)
+    return {stamped["quote_id"]: stamped}
+
+
+def only(quotes):
+    (value,) = quotes.values()
+    return value
+
+
+def test_stamp_quote_adds_an_id_and_expiry():
+    before = time.time()
+    stamped = only(quote(expires_in=30))
+
+    assert stamped["quote_id"].startswith("q_")
+    # expires_at is rounded to the millisecond
+    assert before + 30 - 0.001 <= stamped["expires_at"] <= time.time() + 30 + 0.001
+    assert stamped["quote_id"] != only(quote())["quote_id"]
+    assert is_fresh(stamped) and not is_fresh(stamped, now=stamped["expires_at"])
+
+
+def test_reducer_adds_by_id_and_drops_expired_quotes():
+    first, second, expired = quote(), quote(to_token="DAI"), quote(expires_in=-1)
+
+    merged = merge_quotes({**first, **expired}, second)
+
+    assert set(merged) == set(first) | set(second)
+    assert merge_quotes(None, None) == {}
+    assert merge_quotes(merged, None) == merged
+
+
+def test_find_quote_matches_pair_and_amount_exactly():
+    quotes = quote(amount_in="0.1")
+    cached = only(quotes)
+
+    # Same pair in any case and an equal amount in another notation reuse the quote
+    assert find_quote(quotes, "eth", "usdc", "0.10") is cached
+    assert find_quote(quotes, "ETH", "USDC", 0.1) is cached
+    # A different amount, a reversed or different pair, or junk never does
+    assert find_quote(quotes, "ETH", "USDC", "0.2") is None
+    assert find_quote(quotes, "USDC", "ETH", "0.1") is None
+    assert find_quote(quotes, "ETH", "DAI", "0.1") is None
+    assert find_quote(quotes, "ETH", "USDC", "a lot") is None
+    assert find_quote(None, "ETH", "USDC", "0.1") is None
+
+
+def test_find_quote_ignores_expired_and_prefers_the_newest():
+    expired = quote(expires_in=-1)
+    assert find_quote(expired, "ETH", "USDC", "0.1") is None
+
+    older, newer = quote(expires_in=30), quote(expires_in=60)
+    assert find_quote({**expired, **older, **newer}, "ETH", "USDC", "0.1") is only(newer)
+
+
+class CountingPriceClient:
+    def __init__(self):
+        self.calls = []
+
+    async def estimate_swap_output(self, from_token, to_token, amount):
+        self.calls.append((from_token, to_token, amount))
+        return {"success": True, "estimated_output": 300.0, "price": 3000.0}
+
+
+def _propose(monkeypatch, args, quotes):
+    client = CountingPriceClient()
+    monkeypatch.setattr(propose_swap_module, "async_price_client", client)
+    return asyncio.run(nodes._propose_swap(args, quotes)), client
+
+
+def test_propose_swap_reuses_the_quote_the_user_saw(monkeypatch):
+    quotes = quote(output="250.000000")
+    result, client = _propose(monkeypatch, {"from_token": "eth", "to_token": "usdc", "amount": "0.1"}, quotes)
+
+    assert client.calls == []
+    assert result["estimatedOutput"] == "250.000000"
+    assert result["quoteId"] == only(quotes)["quote_id"]
+    assert result["quoteExpiresAt"] == only(quotes)["expires_at"]
+
+
+def test_propose_swap_requotes_when_expired_or_different(monkeypatch):
+    for quotes, args in (
+        (quote(expires_in=-1), {"from_token": "ETH", "to_token": "USDC", "amount": "0.1"}),
+        (quote(), {"from_token": "ETH", "to_token": "USDC", "amount": "0.2"}),
+        (quote(), {"from_token": "ETH", "to_token": "DAI", "amount": "0.1"}),
+    ):
+        result, client = _propose(monkeypatch, args, quotes)
+
+        assert len(client.calls) == 1
+        assert result["estimatedOutput"] == "300.000000"
+        assert "quoteId" not in result
+
+
+def test_propose_swap_node_stores_the_quoted_proposal(monkeypatch):
+    quotes = quote()
+    call = {"name": "propose_swap_tool", "args": {"from_token": "ETH", "to_token": "USDC", "amount": "0.1"}, "id": "call-1"}
+    client = CountingPriceClient()
+    monkeypatch.setattr(propose_swap_module, "async_price_client", client)
+
+    update = asyncio.run(nodes.propose_swap_node({"messages": [AIMessage(content="", tool_calls=[call])], "quotes": quotes}))
+
+    assert client.calls == []
+    assert update["proposed_transaction"]["quoteId"] == only(quotes)["quote_id"]
+    assert "~250.000000 USDC" in update["messages"][-1].content
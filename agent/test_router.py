@@ -0,0 +1,83 @@
+import time
+
+from app.pool_quoter import PoolQuoter, StaticPoolSource
+from app.router import RouteFinder
+from app.uniswap_v3 import Q96, PoolState
+
+FULL_RANGE = 887220
+
+
+def address(n: int) -> str:
+    return f"0x{n:040x}"
+
+
+def full_range_pool(token_a: str, token_b: str, liquidity: int, fee: int = 3000) -> PoolState:
+    token0, token1 = sorted((token_a, token_b))
+    return PoolState(
+        token0=token0, token1=token1, fee=fee, tick_spacing=60,
+        sqrt_price_x96=Q96, liquidity=liquidity, tick=0,
+        ticks={-FULL_RANGE: liquidity, FULL_RANGE: -liquidity},
+    )
+
+
+def test_multi_hop_beats_thin_direct_pool():
+    tokens = {symbol: {"address": address(i + 1), "decimals": 18, "name": symbol} for i, symbol in enumerate(["DAI", "WETH", "USDC"])}
+    dai, weth, usdc = (tokens[symbol]["address"] for symbol in ("DAI", "WETH", "USDC"))
+    quoter = PoolQuoter(StaticPoolSource([
+        full_range_pool(dai, usdc, 10**20, fee=100),
+        full_range_pool(dai, weth, 10**24, fee=500),
+        full_range_pool(weth, usdc, 10**24, fee=500),
+    ]), tokens=tokens)
+
+    # Small trades stay on the cheap direct pool
+    small = quoter.quote("DAI", "USDC", 0.01)
+    assert small["route"] == ["DAI", "USDC"] and small["fee_tier"] == 100
+
+    # Large trades would drain it, so they route through WETH
+    large = quoter.quote("DAI", "USDC", 10_000)
+    assert large["route"] == ["DAI", "WETH", "USDC"]
+    assert large["route_fee_tiers"] == [500, 500]
+    assert "fee_tier" not in large
+
+
+def test_candidate_paths_are_bounded_and_cached():
+    a, b, c, d, e = (address(i) for i in range(1, 6))
+    finder = RouteFinder([
+        full_range_pool(a, b, 10**18),
+        full_range_pool(b, c, 10**18),
+        full_range_pool(c, d, 10**18),
+        full_range_pool(d, e, 10**18),
+        full_range_pool(a, d, 10**18),
+    ], max_hops=3)
+
+    assert finder.candidate_paths(a, d) == ((a, d), (a, b, c, d))
+    # a -> e needs 4 hops via b/c, or 2 via d
+    assert finder.candidate_paths(a, e) == ((a, d, e),)
+    assert finder.candidate_paths(a, address(99)) == ()
+
+    finder.candidate_paths(a, d)
+    assert finder.stats()["hits"] == 1
+
+
+def test_route_search_is_fast_on_large_registry():
+    # 300 tokens, each paired with two hubs, plus a ring between neighbours
+    hubs = [address(1), address(2)]
+    tokens = [address(i) for i in range(3, 303)]
+    pools = [full_range_pool(hubs[0], hubs[1], 10**24)]
+    for i, token in enumerate(tokens):
+        pools += [full_range_pool(token, hub, 10**22) for hub in hubs]
+        pools.append(full_range_pool(token, tokens[(i + 1) % len(tokens)], 10**20))
+    finder = RouteFinder(pools, max_hops=3, max_candidates=8)
+
+    started = time.perf_counter()
+    paths = finder.candidate_paths(tokens[0], tokens[150])
+    first = time.perf_counter() - started
+    assert paths and all(len(path) <= 4 for path in paths)
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        finder.candidate_paths(tokens[0], tokens[150])
+    cached = (time.perf_counter() - started) / 1000
+
+    assert first < 0.05
+    assert cached < 0.001
@@ -0,0 +1,75 @@
+import sys
+import os
+import asyncio
+import subprocess
+import time
+
+import httpx
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+from app import main
+from bench.startup import by_package, parse_importtime
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     langgraph.types
+import time:       300 |        420 |   langgraph.graph
+import time:        50 |         50 |   app.config
+import time:       900 |       1370 | app.main
+"""
+
+
+def test_importtime_output_is_parsed_per_module_and_package():
+    rows = parse_importtime(IMPORTTIME)
+    assert [(row.module, row.depth) for row in rows] == [("langgraph.types", 2), ("langgraph.graph", 1), ("app.config", 1), ("app.main", 0)]
+    assert rows[-1].cumulative_us == 1370
+    assert by_package(rows) == {"langgraph": 420, "app": 950}
+
+
+def test_importing_the_api_does_not_build_the_graph():
+    code = "import sys, app.main; print(sorted(m for m in ('graph.workflow', 'graph.nodes', 'langgraph', 'langchain_google_genai') if m in sys.modules))"
+    env = {**os.environ, "GOOGLE_API_KEY": "test-key"}
+    result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)), env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+
+def test_ready_answers_503_until_the_warm_up_finishes(monkeypatch):
+    client = TestClient(main.app)
+    monkeypatch.setattr(main, "readiness", {"ready": False, "error": None, "warmup_seconds": None})
+    assert client.get("/health").status_code == 200
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["detail"] == "starting"
+
+    monkeypatch.setattr(main, "readiness", {"ready": True, "error": None, "warmup_seconds": 0.8})
+    assert client.get("/ready").json() == {"status": "ready", "warmup_seconds": 0.8}
+
+
+class EchoGraph:
+    async def ainvoke(self, input_state, config):
+        return {"messages": [AIMessage(content="ok")]}
+
+
+def test_chat_before_warm_up_builds_the_graph_off_the_event_loop(monkeypatch):
+    def slow_build():
+        time.sleep(0.5)
+        main.agent_app = EchoGraph()
+        return main.agent_app
+
+    monkeypatch.setattr(main, "agent_app", None)
+    monkeypatch.setattr(main, "_agent", slow_build)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            chat = asyncio.create_task(http.post("/chat", json={"message": "hi", "conversation_id": "early"}))
+            await asyncio.sleep(0.05)
+            health = await http.get("/health")
+            health_done = chat.done()
+            return health, health_done, await chat
+
+    health, chat_done, chat = asyncio.run(scenario())
+    # /health answered while the graph was still being built
+    assert health.status_code == 200
+    assert not chat_done
+    assert chat.json()["message"] == "ok"
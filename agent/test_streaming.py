@@ -0,0 +1,188 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+import app.main as main
+from app.streaming import format_sse, stream_chat_events
+from bench.run import offline_app
+from bench.scenarios import RECIPIENT
+
+QUOTE = "How much USDC would I get for 0.5 ETH?"
+SWAP = "Looks good, do the swap"
+SEND = f"Please send 25 USDC to my friend at {RECIPIENT}"
+HELLO = "Hi! What can you do?"
+
+
+@pytest.fixture
+def client():
+    """The API with the scripted model and fixed prices in place of Gemini and the price sources."""
+    with offline_app(), TestClient(main.app) as client:
+        yield client
+
+
+def parse_sse(body):
+    events = []
+    for frame in body.strip().split("\n\n"):
+        event_line, data_line = frame.split("\n")
+        event = json.loads(data_line[len("data: "):])
+        assert event_line == f"event: {event['event']}"
+        events.append(event)
+    return events
+
+
+def stream(client, message, conversation_id):
+    response = client.post("/chat/stream", json={"message": message, "conversation_id": conversation_id})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return parse_sse(response.text)
+
+
+def test_sse_events_follow_the_graph_and_end_with_done(client):
+    conversation_id = uuid.uuid4().hex
+    events = stream(client, QUOTE, conversation_id)
+
+    assert [(e["event"], e.get("node")) for e in events] == [
+        ("node_start", "intent_parser"),
+        ("node_start", "agent"),
+        ("node_start", "get_swap_quote"),
+        ("tool_result", "get_swap_quote"),
+        ("node_start", "agent"),
+        ("done", None),
+    ]
+    quote = json.loads(events[3]["content"])
+    assert events[3]["tool"] == "get_swap_quote_tool"
+    assert quote["estimated_output"] == "1500.000000"
+
+    done = events[-1]
+    assert done["conversation_id"] == conversation_id
+    assert done["message"].startswith("Here is what I found")
+    assert done["proposed_transaction"] is None
+
+
+def test_sse_done_carries_the_proposal(client):
+    conversation_id = uuid.uuid4().hex
+    quote = json.loads(stream(client, QUOTE, conversation_id)[3]["content"])
+    events = stream(client, SWAP, conversation_id)
+
+    assert [e["event"] for e in events] == ["node_start", "node_start", "node_start", "proposal", "done"]
+    proposal, done = events[-2], events[-1]
+    assert proposal["node"] == "propose_swap"
+    assert proposal["proposed_transaction"]["quoteId"] == quote["quote_id"]
+    assert done["proposed_transaction"] == proposal["proposed_transaction"]
+    assert "I've prepared your swap" in done["message"]
+    assert done["conversation_id"] == conversation_id
+
+
+def test_sse_failure_becomes_an_error_frame(client, monkeypatch):
+    async def failing(agent_app, input_state, config):
+        yield {"event": "node_start", "node": "agent"}
+        raise RuntimeError("graph exploded")
+
+    monkeypatch.setattr(main, "stream_chat_events", failing)
+    events = stream(client, HELLO, "c-error")
+
+    assert events == [{"event": "node_start", "node": "agent"}, {"event": "error", "detail": "graph exploded"}]
+
+
+def test_sse_rejects_an_empty_message(client):
+    response = client.post("/chat/stream", json={"message": "   ", "conversation_id": "c-empty"})
+    assert response.status_code == 400
+
+
+def receive_turn(ws):
+    events = []
+    while not events or events[-1]["event"] not in ("done", "error"):
+        events.append(ws.receive_json())
+    return events
+
+
+def test_websocket_answers_each_message_and_keeps_one_conversation(client):
+    with client.websocket_connect("/ws/chat") as ws:
+        ws.send_json({"message": HELLO})
+        first = receive_turn(ws)
+        ws.send_json({"message": SEND})
+        second = receive_turn(ws)
+
+    assert [e["event"] for e in first] == ["node_start", "node_start", "done"]
+    assert first[-1]["message"] == "I can help you swap or send tokens on Base."
+    assert [e["event"] for e in second] == ["node_start", "node_start", "node_start", "proposal", "done"]
+    assert second[-1]["proposed_transaction"]["toAddress"] == RECIPIENT
+    # Messages without a conversation_id continue the socket's conversation
+    assert first[-1]["conversation_id"] == second[-1]["conversation_id"]
+
+
+def test_websocket_reports_bad_messages_and_stays_open(client):
+    conversation_id = uuid.uuid4().hex
+    with client.websocket_connect("/ws/chat") as ws:
+        ws.send_json({"text": "no message field"})
+        invalid = ws.receive_json()
+        ws.send_json({"message": "  "})
+        empty = ws.receive_json()
+        ws.send_json({"message": HELLO, "conversation_id": conversation_id})
+        turn = receive_turn(ws)
+
+    assert invalid["event"] == "error" and invalid["detail"][0]["loc"] == ["message"]
+    assert empty == {"event": "error", "detail": "Empty message"}
+    assert turn[-1]["event"] == "done" and turn[-1]["conversation_id"] == conversation_id
+
+
+def test_websocket_failure_becomes_an_error_frame(client, monkeypatch):
+    async def failing(agent_app, input_state, config):
+        raise RuntimeError("graph exploded")
+        yield
+
+    monkeypatch.setattr(main, "stream_chat_events", failing)
+    with client.websocket_connect("/ws/chat") as ws:
+        ws.send_json({"message": HELLO})
+        assert ws.receive_json() == {"event": "error", "detail": "graph exploded"}
+
+
+class FakeGraph:
+    """Replays fixed ``astream`` output, for the event mapping on its own."""
+
+    def __init__(self, chunks, final_messages):
+        self.chunks = chunks
+        self.final_messages = final_messages
+
+    async def astream(self, input_state, config, stream_mode):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def aget_state(self, config):
+        return type("Snapshot", (), {"values": {"messages": self.final_messages}})()
+
+
+def test_stream_chat_events_maps_tokens_tasks_and_skips_failed_tasks():
+    meta = {"langgraph_node": "agent"}
+    graph = FakeGraph([
+        ("tasks", {"name": "agent"}),
+        ("messages", (AIMessageChunk(content="Hel"), meta)),
+        ("messages", (AIMessageChunk(content=""), meta)),
+        ("messages", (AIMessage(content="whole message"), meta)),
+        ("messages", (AIMessageChunk(content="lo"), meta)),
+        ("tasks", {"name": "agent", "result": {"messages": [AIMessage(content="Hello")]}}),
+        ("tasks", {"name": "propose_send", "error": "boom", "result": {"proposed_transaction": {"action": "send"}}}),
+        ("tasks", {"name": "get_swap_quote", "result": {
+            "messages": [ToolMessage(content="{}", tool_call_id="1", name="get_swap_quote_tool")],
+        }}),
+        ("tasks", {"name": "propose_swap", "result": {"proposed_transaction": {"action": "swap"}}}),
+    ], [AIMessage(content="Hello")])
+
+    async def collect():
+        return [event async for event in stream_chat_events(graph, {}, {"configurable": {"thread_id": "t"}})]
+
+    assert asyncio.run(collect()) == [
+        {"event": "node_start", "node": "agent"},
+        {"event": "token", "node": "agent", "content": "Hel"},
+        {"event": "token", "node": "agent", "content": "lo"},
+        {"event": "tool_result", "node": "get_swap_quote", "tool": "get_swap_quote_tool", "content": "{}"},
+        {"event": "proposal", "node": "propose_swap", "proposed_transaction": {"action": "swap"}},
+        {"event": "done", "message": "Hello", "proposed_transaction": None, "conversation_id": "t"},
+    ]
+
+
+def test_format_sse_frames_one_event():
+    assert format_sse({"event": "token", "content": "hi"}) == 'event: token\ndata: {"event": "token", "content": "hi"}\n\n'
@@ -88,7 +88,7 @@ def main():
     swap_params = (
         token_in,           # tokenIn
         token_out,          # tokenOut
-        3000,               # fee (0.3% - standard pool)
+        proposal.get('feeTier') or 3000, # fee tier picked by the quote (0.3% standard pool otherwise)
         account.address,    # recipient
         int(time.time()) + 600, # deadline (10 mins)
         amount_in_wei,      # amountIn
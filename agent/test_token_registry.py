@@ -0,0 +1,60 @@
+import time
+
+from app.config import TOKEN_LIST_PATH
+from app.token_registry import TokenRegistry
+from app.tokens import BASE_TOKENS, COINGECKO_IDS, get_token_address
+
+
+def test_bundled_list_lookups():
+    registry = TokenRegistry.from_file(TOKEN_LIST_PATH, chain_id=8453)
+
+    usdc = registry.by_symbol("usdc")
+    assert usdc.address == "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+    assert registry.by_address(usdc.address.lower()) is usdc
+    assert registry.by_alias("Wrapped Ether").symbol == "WETH"
+    assert registry.by_price_id("dai").symbol == "DAI"
+    assert registry.get("ether").symbol == "ETH"
+
+    # Price-only entries can be priced but have nothing to swap
+    usdt = registry.by_symbol("USDT")
+    assert usdt.price_id == "tether" and usdt.address is None
+    assert "USDT" not in registry.tradable()
+
+
+def test_compatibility_views():
+    assert set(BASE_TOKENS) == {"ETH", "WETH", "USDC", "DAI"}
+    assert BASE_TOKENS["USDC"] == {"address": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913", "decimals": 6, "name": "USD Coin"}
+    assert COINGECKO_IDS["USDT"] == "tether"
+    assert get_token_address("dai") == "0x50c5725949A6F0c72E6C4a641F24049A917DB0Cb"
+    assert get_token_address("USDT") is None
+
+
+def test_parse_filters_chain_and_keeps_first_symbol():
+    data = {"tokens": [
+        {"chainId": 8453, "address": "0x" + "ab" * 20, "symbol": "FOO", "name": "Foo", "decimals": 18},
+        {"chainId": 8453, "address": "0x" + "cd" * 20, "symbol": "foo", "name": "Foo Clone", "decimals": 6},
+        {"chainId": 1, "address": "0x" + "ef" * 20, "symbol": "BAR", "name": "Bar", "decimals": 18},
+    ]}
+    registry = TokenRegistry(TokenRegistry.parse(data, chain_id=8453))
+
+    assert registry.by_symbol("FOO").name == "Foo"
+    assert registry.by_address("0x" + "CD" * 20).name == "Foo Clone"
+    # Addresses are stored checksummed
+    assert registry.by_symbol("FOO").address == "0xABaBaBaBABabABabAbAbABAbABabababaBaBABaB"
+    assert registry.by_symbol("BAR") is None
+
+
+def test_large_list_lookups_stay_constant_time():
+    data = {"tokens": [
+        {"chainId": 8453, "address": f"0x{i:040x}", "symbol": f"TK{i}", "name": f"Token {i}", "decimals": 18,
+         "extensions": {"coingeckoId": f"token-{i}", "aliases": [f"token {i}"]}}
+        for i in range(1, 5001)
+    ]}
+    registry = TokenRegistry(TokenRegistry.parse(data))
+    assert len(registry) == 5000
+
+    started = time.perf_counter()
+    for i in range(1, 5001):
+        assert registry.get(f"TK{i}").price_id == f"token-{i}"
+    per_lookup = (time.perf_counter() - started) / 5000
+    assert per_lookup < 0.0001
@@ -0,0 +1,67 @@
+import time
+
+from app.token_registry import TokenRegistry
+from app.tokens import token_resolver, describe_unknown_token, resolve_tradable_token
+from app.token_resolver import TokenResolver
+
+
+def test_resolves_decorated_and_misspelled_symbols():
+    assert token_resolver.lookup("USDC").symbol == "USDC"
+    assert token_resolver.lookup("usdc.e").symbol == "USDC"
+    assert token_resolver.lookup("weth9").symbol == "WETH"
+    assert token_resolver.lookup("etherium").symbol == "ETH"
+    assert token_resolver.lookup("dai stable").symbol == "DAI"
+    assert token_resolver.lookup("Wrapped Eth").symbol == "WETH"
+
+
+def test_ambiguous_or_unknown_input_is_not_guessed():
+    # Distinct tokens that merely look like a known one stay unresolved
+    assert token_resolver.lookup("usdbc") is None
+    assert token_resolver.lookup("usd") is None
+    assert token_resolver.lookup("bitcoin") is None
+    assert token_resolver.lookup("") is None
+
+    assert "did you mean" in describe_unknown_token("usd")
+    assert describe_unknown_token("bitcoin") == "bitcoin"
+
+
+def test_unrelated_tickers_sharing_a_prefix_are_not_resolved():
+    # Each of these is (or could be) a different asset; guessing would move the wrong funds
+    for text in ("ethfi", "ethx", "eth2", "ethe", "dai2", "daii", "wethx", "usdcc"):
+        assert token_resolver.lookup(text) is None, text
+        assert resolve_tradable_token(text) is None, text
+    # ...but the near miss is still offered back to the user
+    assert token_resolver.suggest("usdcc") == ["USDC"]
+    assert token_resolver.lookup("usdc.axl").symbol == "USDC"
+
+
+def test_contract_addresses_resolve_to_their_token():
+    usdc = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+    for text in (usdc, usdc.lower(), "0X" + usdc[2:].upper(), f"  {usdc} "):
+        assert resolve_tradable_token(text).symbol == "USDC", text
+    assert resolve_tradable_token("0x" + "12" * 20) is None
+
+
+def test_price_only_tokens_are_not_tradable():
+    assert token_resolver.lookup("tether").symbol == "USDT"
+    assert resolve_tradable_token("tether") is None
+
+
+def test_large_registry_resolution_is_fast():
+    data = {"tokens": [
+        {"chainId": 8453, "address": f"0x{i:040x}", "symbol": f"TK{i}", "name": f"Token Number {i}", "decimals": 18}
+        for i in range(1, 5001)
+    ]}
+    resolver = TokenResolver(TokenRegistry(TokenRegistry.parse(data)))
+
+    started = time.perf_counter()
+    assert resolver.lookup("token number 4242").symbol == "TK4242"
+    first = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        resolver.lookup("token number 4242")
+    cached = (time.perf_counter() - started) / 1000
+
+    assert first < 0.05
+    assert cached < 0.0001
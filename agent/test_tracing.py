@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+import app.main as main
+from app.tracing import FileSpanExporter, SpanExporter, Tracer, NOOP_SPAN
+
+
+class MemoryExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+def test_spans_nest_across_awaits_and_threads():
+    exporter = MemoryExporter()
+    tracer = Tracer(exporter, export_interval=60)
+
+    def checkpoint_io():
+        with tracer.span("checkpoint put"):
+            pass
+
+    async def turn():
+        with tracer.span("chat") as root:
+            with tracer.span("tool get_swap_quote_tool", **{"tool.args": {"amount": 1}}):
+                await asyncio.sleep(0)
+            await asyncio.to_thread(checkpoint_io)
+            with pytest.raises(RuntimeError):
+                with tracer.span("llm generate"):
+                    raise RuntimeError("quota")
+        return root
+
+    root = asyncio.run(turn())
+    tracer.flush()
+
+    by_name = {span.name: span for span in exporter.spans}
+    assert set(by_name) == {"chat", "tool get_swap_quote_tool", "checkpoint put", "llm generate"}
+    assert all(span.trace_id == root.trace_id for span in exporter.spans)
+    assert by_name["chat"].parent_span_id is None
+    assert by_name["checkpoint put"].parent_span_id == root.span_id
+    assert by_name["llm generate"].status == 2
+    assert tracer.current_span() is None
+
+
+def test_file_exporter_writes_otlp_json(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(FileSpanExporter(str(path), service_name="test"), export_interval=60)
+    with tracer.span("chat", conversation_id="c1", attempt=2):
+        pass
+    tracer.flush()
+
+    request = json.loads(path.read_text().splitlines()[0])
+    span = request["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert len(span["traceId"]) == 32 and len(span["spanId"]) == 16
+    assert {"key": "attempt", "value": {"intValue": "2"}} in span["attributes"]
+    assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
+
+
+def test_disabled_tracer_is_a_noop():
+    tracer = Tracer()
+    with tracer.span("chat") as span:
+        assert span is NOOP_SPAN
+    assert tracer.current_trace_id() is None
+
+
+class EchoGraph:
+    async def ainvoke(self, input_state, config):
+        return {"messages": [AIMessage(content="ok")]}
+
+
+def test_chat_response_carries_trace_id(monkeypatch):
+    exporter = MemoryExporter()
+    monkeypatch.setattr(main, "tracer", Tracer(exporter, export_interval=60))
+    monkeypatch.setattr(main, "agent_app", EchoGraph())
+
+    body = TestClient(main.app).post("/chat", json={"message": "hi", "conversation_id": "t1"}).json()
+    main.tracer.flush()
+    assert body["trace_id"] == exporter.spans[0].trace_id
+    assert exporter.spans[0].attributes["conversation_id"] == "t1"
@@ -0,0 +1,103 @@
+from math import isqrt
+
+from app.config import POOL_FIXTURE_PATH
+from app.pool_quoter import FixturePoolSource, PoolQuoter, StaticPoolSource
+from app.price_cache import PriceCache
+from app.price_client import PriceClient
+from app.price_providers import PriceSourceChain, StubPriceProvider
+from app.uniswap_v3 import (
+    MAX_SQRT_RATIO,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MIN_TICK,
+    Q96,
+    PoolState,
+    compute_swap_step,
+    get_sqrt_ratio_at_tick,
+    get_tick_at_sqrt_ratio,
+    simulate_exact_input,
+)
+
+
+def encode_price_sqrt(reserve1: int, reserve0: int) -> int:
+    return isqrt((reserve1 << 192) // reserve0)
+
+
+def test_tick_math_bounds_and_round_trip():
+    assert get_sqrt_ratio_at_tick(MIN_TICK) == MIN_SQRT_RATIO
+    assert get_sqrt_ratio_at_tick(MAX_TICK) == MAX_SQRT_RATIO
+    assert get_sqrt_ratio_at_tick(0) == Q96
+    assert get_tick_at_sqrt_ratio(MIN_SQRT_RATIO) == MIN_TICK
+    assert get_tick_at_sqrt_ratio(MAX_SQRT_RATIO - 1) == MAX_TICK - 1
+
+    for tick in (-196257, -50, -1, 1, 50, 196257):
+        sqrt_price = get_sqrt_ratio_at_tick(tick)
+        assert get_tick_at_sqrt_ratio(sqrt_price) == tick
+        assert get_tick_at_sqrt_ratio(sqrt_price - 1) == tick - 1
+
+
+def test_swap_step_matches_v3_core_vectors():
+    # From v3-core SwapMath.spec.ts, exact input one for zero, fee 600
+    price, liquidity, amount = encode_price_sqrt(1, 1), 2 * 10**18, 10**18
+
+    target = encode_price_sqrt(101, 100)
+    assert compute_swap_step(price, target, liquidity, amount, 600) == (target, 9975124224178055, 9925619580021728, 5988667735148)
+
+    sqrt_next, amount_in, amount_out, fee = compute_swap_step(price, encode_price_sqrt(1000, 100), liquidity, amount, 600)
+    assert (amount_in, amount_out, fee) == (999400000000000000, 666399946655997866, 600000000000000)
+    assert sqrt_next < encode_price_sqrt(1000, 100)
+
+
+def test_swap_crosses_initialized_ticks():
+    liquidity = 10**18
+    pool = PoolState(
+        token0="a", token1="b", fee=3000, tick_spacing=60,
+        sqrt_price_x96=Q96, liquidity=2 * liquidity, tick=0,
+        ticks={-120: liquidity, 120: -liquidity, -600: liquidity, 600: -liquidity},
+    )
+    small = simulate_exact_input(pool, True, 10**15)
+    assert small.ticks_crossed == 0 and small.amount_in == 10**15
+
+    large = simulate_exact_input(pool, True, 2 * 10**16)
+    assert large.ticks_crossed == 1
+    assert large.tick_after < -120
+    assert -600 < large.tick_after and large.amount_out < 2 * 10**16
+
+    # Far beyond the liquidity: only part of the input can be spent
+    assert simulate_exact_input(pool, True, 10**20).amount_in < 10**20
+
+
+def test_quoter_picks_best_fee_tier():
+    quoter = PoolQuoter(FixturePoolSource(POOL_FIXTURE_PATH))
+
+    small = quoter.quote("ETH", "USDC", 0.5)
+    assert small["success"] and small["fee_tier"] == 100
+
+    # The 0.01% pool is shallow, so a large trade routes to the deeper 0.05% pool
+    large = quoter.quote("ETH", "USDC", 50)
+    assert large["success"] and large["fee_tier"] == 500
+    assert large["estimated_output"] < 50 * 3000
+    assert large["price_impact"] > small["price_impact"]
+
+    assert quoter.quote("USDC", "ETH", 3000)["estimated_output"] < 1
+    assert not quoter.quote("ETH", "WETH", 1)["success"]
+
+
+def test_price_client_prefers_pool_quote_and_falls_back():
+    fixture = FixturePoolSource(POOL_FIXTURE_PATH)
+    usdc = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+    weth_usdc_only = StaticPoolSource(fixture.get_pools("0x4200000000000000000000000000000000000006", usdc))
+
+    stub = StubPriceProvider({"ETH": 3000.0, "DAI": 1.0, "USDC": 1.0})
+    client = PriceClient(
+        cache=PriceCache(ttl_seconds=10, max_entries=8),
+        sources=PriceSourceChain([stub], rate_per_second=100, burst=100, retry_attempts=1),
+        pool_quoter=PoolQuoter(weth_usdc_only),
+    )
+
+    assert client.estimate_swap_output("ETH", "USDC", 1)["source"] == "uniswap_v3"
+    assert stub.calls == 0
+
+    # No DAI pool: market prices are used instead
+    fallback = client.estimate_swap_output("DAI", "USDC", 1000)
+    assert fallback["source"] == "stub" and fallback["estimated_output"] == 1000
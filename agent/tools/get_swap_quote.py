@@ -1,33 +1,36 @@
-from langchain_core.tools import tool
-from app.tokens import get_token_address
-from app.price_client import price_client
+from typing import Optional, Tuple
+from langchain_core.tools import StructuredTool
+from app.tokens import resolve_tradable_token, describe_unknown_token
+from app.price_client import price_client, async_price_client
+from app.quotes import stamp_quote
 
-@tool
-def get_swap_quote_tool(from_token: str, to_token: str, amount: float) -> dict:
-    """Get a price quote for swapping tokens using market prices (CoinGecko)."""
-    from_address = get_token_address(from_token)
-    to_address = get_token_address(to_token)
 
-    if not from_address or not to_address:
+def _resolve_pair(from_token: str, to_token: str) -> Tuple[Optional[str], Optional[str], Optional[dict]]:
+    """Resolves both tokens to canonical symbols, or returns an error payload."""
+    resolved_from = resolve_tradable_token(from_token)
+    resolved_to = resolve_tradable_token(to_token)
+
+    if not resolved_from or not resolved_to:
         unknown = []
-        if not from_address:
-            unknown.append(from_token)
-        if not to_address:
-            unknown.append(to_token)
-        return {
+        if not resolved_from:
+            unknown.append(describe_unknown_token(from_token))
+        if not resolved_to:
+            unknown.append(describe_unknown_token(to_token))
+        return None, None, {
             "error": f"Unknown tokens: {', '.join(unknown)}",
             "action": "error",
         }
+    return resolved_from.symbol, resolved_to.symbol, None
 
-    quote = price_client.estimate_swap_output(from_token, to_token, amount)
 
+def _format_quote(from_token: str, to_token: str, amount: float, quote: dict) -> dict:
     if not quote.get("success"):
         return {
             "error": "Unable to fetch current prices. Please try again.",
             "action": "error",
         }
 
-    return {
+    payload = {
         "action": "quote",
         "success": True,
         "from_token": from_token,
@@ -35,6 +38,44 @@ def get_swap_quote_tool(from_token: str, to_token: str, amount: float) -> dict:
         "amount_in": str(amount),
         "estimated_output": f"{quote['estimated_output']:.6f}",
         "price": f"{quote['price']:.4f}",
-        "source": "coingecko",
+        "source": quote.get("source", "coingecko"),
         "note": "Price from market data. Actual swap may vary slightly.",
     }
+    if "route" in quote:
+        payload["route"] = quote["route"]
+        payload["route_fee_tiers"] = quote["route_fee_tiers"]
+        if "fee_tier" in quote:
+            payload["fee_tier"] = quote["fee_tier"]
+        payload["price_impact"] = f"{quote['price_impact']:.4f}"
+        payload["note"] = f"Simulated on Uniswap V3 via {' -> '.join(quote['route'])}, fees and price impact included."
+    if quote.get("stale"):
+        payload["stale"] = True
+        payload["price_age_seconds"] = quote["price_age_seconds"]
+        payload["note"] = f"Live prices are unavailable; this uses the last known price from {quote['price_age_seconds']:.0f}s ago."
+    return stamp_quote(payload)
+
+
+def get_swap_quote(from_token: str, to_token: str, amount: float) -> dict:
+    """Get a price quote for swapping tokens, from Uniswap V3 pools when available or market prices (CoinGecko)."""
+    from_token, to_token, error = _resolve_pair(from_token, to_token)
+    if error:
+        return error
+
+    quote = price_client.estimate_swap_output(from_token, to_token, amount)
+    return _format_quote(from_token, to_token, amount, quote)
+
+
+async def aget_swap_quote(from_token: str, to_token: str, amount: float) -> dict:
+    from_token, to_token, error = _resolve_pair(from_token, to_token)
+    if error:
+        return error
+
+    quote = await async_price_client.estimate_swap_output(from_token, to_token, amount)
+    return _format_quote(from_token, to_token, amount, quote)
+
+
+get_swap_quote_tool = StructuredTool.from_function(
+    func=get_swap_quote,
+    coroutine=aget_swap_quote,
+    name="get_swap_quote_tool",
+)
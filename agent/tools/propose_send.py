@@ -1,10 +1,9 @@
-from langchain_core.tools import tool
-from app.tokens import get_token_address
+from langchain_core.tools import StructuredTool
+from app.tokens import resolve_tradable_token, describe_unknown_token
 from decimal import Decimal, InvalidOperation
 import re
 
-@tool 
-def propose_send_tool(token: str, recipient_address: str, amount: str):
+def propose_send(token: str, recipient_address: str, amount: str) -> dict:
     """Propose a token send transaction on base.
     
     Args:
@@ -24,16 +23,28 @@ def propose_send_tool(token: str, recipient_address: str, amount: str):
     except InvalidOperation:
         return {"error": f"Invalid amount format: {amount}", "action": "error"}
 
-    # 3. Resolve Token
-    token_address = get_token_address(token)
-    if not token_address:
-        return {"error": f"Unknown token: {token}", "action": "error"}
+    # 3. Resolve Token (fuzzy: "ether" -> ETH)
+    resolved = resolve_tradable_token(token)
+    if not resolved:
+        return {"error": f"Unknown token: {describe_unknown_token(token)}", "action": "error"}
     
     return {
         "action": "send",
         "toAddress": recipient_address,
-        "token": token,
-        "tokenAddress": token_address,
+        "token": resolved.symbol,
+        "tokenAddress": resolved.address,
         "amount": str(amount_d),
         "chain": "base"
-    }
\ No newline at end of file
+    }
+
+
+async def apropose_send(token: str, recipient_address: str, amount: str) -> dict:
+    # Validation only, no I/O: run inline rather than on a worker thread
+    return propose_send(token, recipient_address, amount)
+
+
+propose_send_tool = StructuredTool.from_function(
+    func=propose_send,
+    coroutine=apropose_send,
+    name="propose_send_tool",
+)
@@ -1,19 +1,12 @@
-from langchain_core.tools import tool
-from app.tokens import get_token_address
-from app.price_client import price_client
+from langchain_core.tools import StructuredTool
+from app.tokens import resolve_tradable_token, describe_unknown_token
+from app.price_client import price_client, async_price_client
 from app.config import UNISWAP_ROUTER_ADDRESS
 from decimal import Decimal, InvalidOperation
 
-@tool
-def propose_swap_tool(from_token: str, to_token: str, amount: str, slippage: str = "1.0") -> dict:
-    """Propose a token swap transaction.
-    
-    Args:
-        from_token: Token symbol to swap from (e.g., ETH).
-        to_token: Token symbol to swap to (e.g., USDC).
-        amount: Amount to swap as a STRING (e.g., "0.1", "100").
-        slippage: Max slippage tolerance percentage as a string (default "1.0").
-    """
+
+def _validate_swap(from_token: str, to_token: str, amount: str, slippage: str) -> dict:
+    """Validates the inputs and resolves addresses. Returns an error payload or the parsed values."""
     # 1. Validate Input Math
     try:
         amount_d = Decimal(amount)
@@ -23,38 +16,106 @@ def propose_swap_tool(from_token: str, to_token: str, amount: str, slippage: str
     except InvalidOperation:
         return {"error": f"Invalid number format for amount: {amount}", "action": "error"}
 
-    # 2. Resolve Addresses
-    from_address = get_token_address(from_token)
-    to_address = get_token_address(to_token)
-    
-    if not from_address or not to_address:
+    # 2. Resolve Tokens (fuzzy: "usdc.e" -> USDC)
+    from_resolved = resolve_tradable_token(from_token)
+    to_resolved = resolve_tradable_token(to_token)
+
+    if not from_resolved or not to_resolved:
         unknown = []
-        if not from_address: unknown.append(from_token)
-        if not to_address: unknown.append(to_token)
+        if not from_resolved: unknown.append(describe_unknown_token(from_token))
+        if not to_resolved: unknown.append(describe_unknown_token(to_token))
         return {
             "error": f"Unknown tokens: {', '.join(unknown)}",
             "action": "error"
         }
-    
-    # 3. Get Quote (using float for estimation only, not transaction data)
-    quote = price_client.estimate_swap_output(from_token, to_token, float(amount_d))
-    
+
+    return {
+        "amount": amount_d,
+        "slippage": slippage_d,
+        "from_token": from_resolved.symbol,
+        "to_token": to_resolved.symbol,
+        "from_address": from_resolved.address,
+        "to_address": to_resolved.address,
+    }
+
+
+def _build_proposal(from_token: str, to_token: str, parsed: dict, quote: dict) -> dict:
     if not quote.get("success"):
         return {
             "error": "Unable to fetch current price quote. Please try again.",
             "action": "error"
         }
-    
-    return {
+
+    estimated_output = Decimal(str(quote["estimated_output"]))
+    proposal = {
         "action": "swap",
-        "tokenIn": from_token,
-        "tokenInAddress": from_address,
-        "tokenOut": to_token,
-        "tokenOutAddress": to_address,
-        "amount": str(amount_d), # Return normalized string
-        "estimatedOutput": f"{quote['estimated_output']:.6f}",
-        "maxSlippage": str(slippage_d),
+        "tokenIn": parsed["from_token"],
+        "tokenInAddress": parsed["from_address"],
+        "tokenOut": parsed["to_token"],
+        "tokenOutAddress": parsed["to_address"],
+        "amount": str(parsed["amount"]), # Return normalized string
+        "estimatedOutput": f"{estimated_output:.6f}",
+        "minimumOutput": f"{estimated_output * (1 - parsed['slippage'] / 100):.6f}",
+        "maxSlippage": str(parsed["slippage"]),
         "chain": "base",
-        "routerAddress": UNISWAP_ROUTER_ADDRESS, 
-        "note": "Quote from CoinGecko market data."
-    }
\ No newline at end of file
+        "routerAddress": UNISWAP_ROUTER_ADDRESS,
+        "note": f"Quote from {quote.get('source', 'market')} market data."
+    }
+    if quote.get("route"):
+        proposal["route"] = list(quote["route"])
+        proposal["routeFeeTiers"] = [int(fee) for fee in quote["route_fee_tiers"]]
+        if quote.get("fee_tier"):
+            proposal["feeTier"] = int(quote["fee_tier"])
+        proposal["priceImpact"] = f"{Decimal(str(quote['price_impact'])):.4f}"
+        proposal["note"] = "Quote simulated on Uniswap V3 pool state."
+    if quote.get("stale"):
+        proposal["stale"] = True
+        proposal["priceAgeSeconds"] = float(quote["price_age_seconds"])
+        proposal["note"] = f"Live prices are unavailable; estimated from the last known price, {float(quote['price_age_seconds']):.0f}s old."
+    return proposal
+
+
+def propose_swap(from_token: str, to_token: str, amount: str, slippage: str = "1.0") -> dict:
+    """Propose a token swap transaction.
+
+    Args:
+        from_token: Token symbol to swap from (e.g., ETH).
+        to_token: Token symbol to swap to (e.g., USDC).
+        amount: Amount to swap as a STRING (e.g., "0.1", "100").
+        slippage: Max slippage tolerance percentage as a string (default "1.0").
+    """
+    parsed = _validate_swap(from_token, to_token, amount, slippage)
+    if parsed.get("error"):
+        return parsed
+
+    # 3. Get Quote (using float for estimation only, not transaction data)
+    quote = price_client.estimate_swap_output(parsed["from_token"], parsed["to_token"], float(parsed["amount"]))
+    return _build_proposal(from_token, to_token, parsed, quote)
+
+
+async def apropose_swap(from_token: str, to_token: str, amount: str, slippage: str = "1.0") -> dict:
+    parsed = _validate_swap(from_token, to_token, amount, slippage)
+    if parsed.get("error"):
+        return parsed
+
+    quote = await async_price_client.estimate_swap_output(parsed["from_token"], parsed["to_token"], float(parsed["amount"]))
+    return _build_proposal(from_token, to_token, parsed, quote)
+
+
+def propose_swap_from_quote(from_token: str, to_token: str, amount: str, slippage: str, quote: dict) -> dict:
+    """Builds the proposal from a quote the user already saw, without fetching prices again."""
+    parsed = _validate_swap(from_token, to_token, amount, slippage)
+    if parsed.get("error"):
+        return parsed
+
+    proposal = _build_proposal(from_token, to_token, parsed, {**quote, "success": True})
+    proposal["quoteId"] = quote["quote_id"]
+    proposal["quoteExpiresAt"] = quote["expires_at"]
+    return proposal
+
+
+propose_swap_tool = StructuredTool.from_function(
+    func=propose_swap,
+    coroutine=apropose_swap,
+    name="propose_swap_tool",
+)
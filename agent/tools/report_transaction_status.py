@@ -1,7 +1,6 @@
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 
-@tool
-def report_transaction_status_tool(tx_hash: str, status: str, error: str = None) -> str:
+def report_transaction_status(tx_hash: str, status: str, error: str = None) -> str:
     """Report the final status of a transaction to the user.
 
     Args:
@@ -30,4 +29,15 @@ def report_transaction_status_tool(tx_hash: str, status: str, error: str = None)
                 guidance = msg
                 break
 
-        return f"X Transaction failed: {error}\n\n{guidance}"
\ No newline at end of file
+        return f"X Transaction failed: {error}\n\n{guidance}"
+
+
+async def areport_transaction_status(tx_hash: str, status: str, error: str = None) -> str:
+    return report_transaction_status(tx_hash, status, error)
+
+
+report_transaction_status_tool = StructuredTool.from_function(
+    func=report_transaction_status,
+    coroutine=areport_transaction_status,
+    name="report_transaction_status_tool",
+)